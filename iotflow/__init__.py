@@ -1,14 +1,34 @@
-from pathlib import Path
+# Loaded on first use so that running models from JSON never imports textX,
+# and so that the daemon client (iotflow.client) starts without the model.
+_PARSER_NAMES = ("parse_file", "parse_str")
+JSON_SUFFIXES = (".json", ".ndjson")
 
-from .parser.parse import parse_file, parse_str
-from .model import Model
 
-
-def load_model(model_path: str) -> Model:
+def load_model(model_path: str) -> "Model":
     """
     Load and parse an IoTFlow model file with semantic validation.
+
+    Files ending in .json or .ndjson are read by the JSON loader, anything
+    else is parsed as DSL source.
     """
-    return parse_file(Path(model_path))
+    from pathlib import Path
+
+    path = Path(model_path)
+    if path.suffix.lower() in JSON_SUFFIXES:
+        from .parser.json_loader import load_json_file
+        return load_json_file(path)
+    from .parser.parse import parse_file
+    return parse_file(path)
+
+
+def __getattr__(name):
+    if name in _PARSER_NAMES:
+        from .parser import parse
+        return getattr(parse, name)
+    if name == "Model":
+        from .model import Model
+        return Model
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 __version__ = "0.1.0"
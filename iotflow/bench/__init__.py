@@ -0,0 +1,7 @@
+# This file marks the benchmark package for IoTFlow DSL.
+
+from .synthetic import ModelShape, generate_model
+from .suite import run_suite, compare, write_results, load_results
+
+__all__ = ["ModelShape", "generate_model", "run_suite", "compare",
+           "write_results", "load_results"]
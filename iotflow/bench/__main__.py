@@ -0,0 +1,15 @@
+import argparse
+
+from .suite import add_arguments, run_from_args
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='python -m iotflow.bench',
+                                     description='IoTFlow DSL benchmark suite')
+    add_arguments(parser)
+    args = parser.parse_args()
+    exit(0 if run_from_args(args) else 1)
+
+
+if __name__ == "__main__":
+    main()
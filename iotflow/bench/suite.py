@@ -0,0 +1,224 @@
+"""
+Benchmark suite for IoTFlow DSL.
+
+Times each stage of the pipeline on a synthetic model: parsing (with all
+model processors), loading the generated JSON and NDJSON instead, every
+validator on its own, context building, per-cycle
+rule evaluation and report rendering. Results are plain JSON so they can be
+stored as a baseline and compared on later runs.
+"""
+
+import io
+import json
+import platform
+import random
+import time
+import warnings
+from dataclasses import asdict
+from pathlib import Path
+from typing import Callable, Optional
+
+from ..generators.json_generator import model_to_json_string
+from ..parser.json_loader import load_json_str
+from ..parser.metamodel import build_metamodel
+from ..parser.parse import parse_str
+from ..runtime.columnar import RuleTable
+from ..runtime.context import build_context
+from ..runtime.runner import run_simulation
+from ..runtime.sensor_sim import generate_readings
+from ..validators.device_reference_validator import validate_device_references
+from ..validators.rule_validator import (
+    validate_rule_logic,
+    validate_duplicate_rule_names,
+    validate_conflicting_rules,
+)
+from .synthetic import ModelShape, generate_model
+
+# Bumped when benchmarks change in a way that makes old results incomparable.
+SUITE_VERSION = 1
+
+DEFAULT_TOLERANCE = 0.25
+
+VALIDATORS = {
+    "device_references": validate_device_references,
+    "rule_logic": validate_rule_logic,
+    "duplicate_rule_names": validate_duplicate_rule_names,
+    "conflicting_rules": validate_conflicting_rules,
+}
+
+
+def _best_of(func: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _entry(seconds: float, ops: int) -> dict:
+    return {"seconds": seconds, "ops": ops, "seconds_per_op": seconds / ops if ops else seconds}
+
+
+def run_suite(shape: ModelShape, cycles: int = 1000, repeat: int = 5) -> dict:
+    """
+    Run every benchmark on a model generated from `shape`.
+
+    Args:
+        shape: Shape of the synthetic model to benchmark
+        cycles: Simulation cycles timed by the evaluation and rendering benchmarks
+        repeat: Times each benchmark runs; the fastest run is reported
+
+    Returns:
+        dict: JSON-serializable results with the shape, environment and one
+        entry per benchmark (best wall time, operations, time per operation)
+    """
+    source = generate_model(shape)
+    benchmarks: dict[str, dict] = {}
+    with warnings.catch_warnings():
+        # Conflict and unused-device warnings are expected on synthetic models.
+        warnings.simplefilter("ignore")
+        metamodel = build_metamodel()
+        benchmarks["parse"] = _entry(_best_of(lambda: metamodel.model_from_str(source), repeat), 1)
+        model = parse_str(source)
+        for name, compact in (("json", False), ("ndjson", True)):
+            text = model_to_json_string(model, compact=compact)
+            benchmarks[f"load.{name}"] = _entry(_best_of(lambda: load_json_str(text), repeat), 1)
+        for name, validator in VALIDATORS.items():
+            seconds = _best_of(lambda: validator(model, metamodel), repeat)
+            benchmarks[f"validate.{name}"] = _entry(seconds, 1)
+
+    benchmarks["context"] = _entry(_best_of(lambda: build_context(model), repeat), 1)
+
+    ctx = build_context(model)
+    rng_state = random.getstate()
+    random.seed(shape.seed)
+    try:
+        samples = [generate_readings(ctx.sensors) for _ in range(cycles)]
+    finally:
+        random.setstate(rng_state)
+
+    for engine in ("compiled", "network"):
+        def evaluate():
+            table = RuleTable(ctx, engine=engine)
+            for readings in samples:
+                table.evaluate(readings)
+        benchmarks[f"evaluate.{engine}"] = _entry(_best_of(evaluate, repeat), cycles)
+
+    result = run_simulation(model, cycles=cycles)
+
+    def render():
+        result.render(io.StringIO(), color=False)
+    benchmarks["render"] = _entry(_best_of(render, repeat), cycles)
+
+    return {
+        "suite_version": SUITE_VERSION,
+        "shape": asdict(shape),
+        "cycles": cycles,
+        "repeat": repeat,
+        "python": platform.python_version(),
+        "benchmarks": benchmarks,
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float = DEFAULT_TOLERANCE) -> list[dict]:
+    """
+    Compare results against a stored baseline.
+
+    Args:
+        results: Output of `run_suite`
+        baseline: Earlier output of `run_suite` on the same shape
+        tolerance: Allowed slowdown as a fraction of the baseline time
+
+    Returns:
+        list[dict]: One entry per benchmark present in both, with the ratio of
+        current to baseline time per operation and whether it regressed
+    """
+    if baseline.get("shape") != results.get("shape") or baseline.get("cycles") != results.get("cycles"):
+        raise ValueError("Baseline was recorded for a different model shape or cycle count")
+    if baseline.get("suite_version") != results.get("suite_version"):
+        raise ValueError("Baseline was recorded by a different version of the benchmark suite")
+    rows = []
+    for name, current in results["benchmarks"].items():
+        previous = baseline["benchmarks"].get(name)
+        if previous is None:
+            continue
+        ratio = current["seconds_per_op"] / previous["seconds_per_op"] if previous["seconds_per_op"] else 1.0
+        rows.append({
+            "name": name,
+            "baseline": previous["seconds_per_op"],
+            "current": current["seconds_per_op"],
+            "ratio": ratio,
+            "regressed": ratio > 1.0 + tolerance,
+        })
+    return rows
+
+
+def format_results(results: dict, comparison: Optional[list[dict]] = None) -> str:
+    ratios = {row["name"]: row for row in comparison or []}
+    lines = []
+    for name, entry in results["benchmarks"].items():
+        line = f"  {name:<32} {entry['seconds'] * 1000:>10.3f} ms"
+        if entry["ops"] > 1:
+            line += f"  ({entry['seconds_per_op'] * 1e6:.2f} us/op)"
+        row = ratios.get(name)
+        if row is not None:
+            line += f"  x{row['ratio']:.2f}" + ("  REGRESSED" if row["regressed"] else "")
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def write_results(results: dict, path) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+
+def load_results(path) -> dict:
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+def add_arguments(parser) -> None:
+    """Add the benchmark options to an argparse parser."""
+    parser.add_argument('--sensors', type=int, default=20, help='Sensors in the synthetic model')
+    parser.add_argument('--actuators', type=int, default=10, help='Actuators in the synthetic model')
+    parser.add_argument('--rules', type=int, default=500, help='Rules in the synthetic model')
+    parser.add_argument('--thresholds', choices=['uniform', 'clustered', 'repeated'], default='uniform',
+                        help='How rule thresholds are distributed over each sensor range')
+    parser.add_argument('--conflict-density', type=float, default=0.1,
+                        help='Fraction of rules generated as potentially conflicting pairs')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the model and the readings')
+    parser.add_argument('--cycles', type=int, default=1000, help='Cycles timed by evaluation and rendering')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per benchmark; the fastest is kept')
+    parser.add_argument('--output', metavar='FILE', help='Write the results as JSON')
+    parser.add_argument('--baseline', metavar='FILE', help='Compare against results stored earlier')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='Allowed slowdown against the baseline, as a fraction')
+    parser.add_argument('--save-model', metavar='FILE', help='Also write the generated model source')
+
+
+def run_from_args(args) -> bool:
+    """Run the suite as configured by `add_arguments`; False if anything regressed."""
+    shape = ModelShape(
+        sensors=args.sensors,
+        actuators=args.actuators,
+        rules=args.rules,
+        thresholds=args.thresholds,
+        conflict_density=args.conflict_density,
+        seed=args.seed,
+    )
+    if args.save_model:
+        Path(args.save_model).write_text(generate_model(shape), encoding="utf-8")
+    results = run_suite(shape, cycles=args.cycles, repeat=args.repeat)
+    comparison = None
+    if args.baseline:
+        comparison = compare(results, load_results(args.baseline), args.tolerance)
+    print(f"Benchmarks ({shape.sensors} sensors, {shape.actuators} actuators, {shape.rules} rules, "
+          f"{args.cycles} cycles, best of {args.repeat}):")
+    print(format_results(results, comparison))
+    if args.output:
+        write_results(results, args.output)
+    regressed = [row["name"] for row in comparison or [] if row["regressed"]]
+    if regressed:
+        print(f"Regressed beyond {args.tolerance:.0%}: {', '.join(regressed)}")
+    return not regressed
@@ -0,0 +1,135 @@
+"""
+Synthetic model generator for IoTFlow DSL benchmarks.
+
+Produces syntactically and semantically valid models of a configurable
+size and shape, so parsing, validation and simulation can be measured on
+rule bases far larger than the examples.
+"""
+
+import random
+from dataclasses import dataclass
+
+from ..runtime.sensor_sim import DEFAULT_RANGES
+
+THRESHOLD_DISTRIBUTIONS = ("uniform", "clustered", "repeated")
+
+# Sensor type and unit pairs cycled through when generating sensors.
+SENSOR_KINDS = [
+    ("DHT22", "celsius"),
+    ("DHT22", "percent"),
+    ("BH1750", "lux"),
+    ("MQ135", "ppm"),
+    ("BMP280", "hPa"),
+    ("PIR", "boolean"),
+]
+
+ACTUATOR_TYPES = ["relay", "servo", "buzzer", "led", "valve"]
+
+# Actions without an opposite never make two rules conflict.
+NEUTRAL_ACTIONS = ["set", "adjust", "reset", "alert", "adjust_brightness", "reduce_power"]
+CONFLICTING_PAIRS = [("turn_on", "turn_off"), ("activate", "deactivate"), ("open", "close")]
+
+# Number of distinct thresholds per sensor in the "repeated" distribution.
+REPEATED_POOL_SIZE = 8
+
+
+@dataclass
+class ModelShape:
+    sensors: int = 10
+    actuators: int = 5
+    rules: int = 100
+    # How thresholds are drawn from each sensor's simulated range.
+    thresholds: str = "uniform"
+    # Fraction of rules that belong to a pair of potentially conflicting rules.
+    conflict_density: float = 0.0
+    seed: int = 0
+
+    def validate(self) -> None:
+        if self.sensors < 1 or self.actuators < 1:
+            raise ValueError("A model needs at least one sensor and one actuator")
+        if self.rules < 0:
+            raise ValueError("Rule count cannot be negative")
+        if self.thresholds not in THRESHOLD_DISTRIBUTIONS:
+            raise ValueError(
+                f"Unknown threshold distribution '{self.thresholds}'. "
+                f"Supported: {list(THRESHOLD_DISTRIBUTIONS)}"
+            )
+        if not 0.0 <= self.conflict_density <= 1.0:
+            raise ValueError("Conflict density must be between 0 and 1")
+
+
+class _ThresholdSource:
+    def __init__(self, shape: ModelShape, rng: random.Random, units: list[str]) -> None:
+        self.shape = shape
+        self.rng = rng
+        self.pools = {}
+        for index, unit in enumerate(units):
+            if unit != "boolean" and shape.thresholds == "repeated":
+                self.pools[index] = [self._uniform(unit) for _ in range(REPEATED_POOL_SIZE)]
+
+    def _uniform(self, unit: str) -> float:
+        lo, hi = DEFAULT_RANGES[unit]
+        return round(self.rng.uniform(lo, hi), 1)
+
+    def draw(self, sensor_index: int, unit: str) -> float:
+        if unit == "boolean":
+            return float(self.rng.choice([0, 1]))
+        if self.shape.thresholds == "repeated":
+            return self.rng.choice(self.pools[sensor_index])
+        if self.shape.thresholds == "clustered":
+            lo, hi = DEFAULT_RANGES[unit]
+            value = self.rng.gauss((lo + hi) / 2, (hi - lo) * 0.05)
+            return round(min(max(value, lo), hi), 1)
+        return self._uniform(unit)
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else str(value)
+
+
+def generate_model(shape: ModelShape) -> str:
+    """
+    Generate the DSL source of a synthetic model.
+
+    Args:
+        shape: Sizes, threshold distribution and conflict density to generate
+
+    Returns:
+        str: Model source text; the same shape and seed always give the same text
+    """
+    shape.validate()
+    rng = random.Random(shape.seed)
+    kinds = [SENSOR_KINDS[i % len(SENSOR_KINDS)] for i in range(shape.sensors)]
+    units = [unit for _, unit in kinds]
+    thresholds = _ThresholdSource(shape, rng, units)
+
+    lines = []
+    for i, (sensor_type, unit) in enumerate(kinds):
+        lines.append(f"sensor S{i} {{ type: {sensor_type} unit: {unit} }}")
+    for i in range(shape.actuators):
+        lines.append(f"actuator A{i} {{ type: {ACTUATOR_TYPES[i % len(ACTUATOR_TYPES)]} }}")
+
+    def condition(sensor: int, operator: str) -> str:
+        if units[sensor] == "boolean":
+            operator = "=="
+        return f"S{sensor}.value {operator} {_number(thresholds.draw(sensor, units[sensor]))}"
+
+    conflicting = int(shape.rules * shape.conflict_density) // 2 * 2
+    index = 0
+    while index < conflicting:
+        sensor = rng.randrange(shape.sensors)
+        actuator = rng.randrange(shape.actuators)
+        on, off = rng.choice(CONFLICTING_PAIRS)
+        # Two ">" comparisons on the same sensor always overlap.
+        lines.append(f"rule R{index} {{ when {condition(sensor, '>')} then A{actuator}.{on} }}")
+        lines.append(f"rule R{index + 1} {{ when {condition(sensor, '>')} then A{actuator}.{off} }}")
+        index += 2
+    while index < shape.rules:
+        sensor = rng.randrange(shape.sensors)
+        operator = rng.choice([">", ">=", "<", "<="])
+        action = rng.choice(NEUTRAL_ACTIONS)
+        lines.append(
+            f"rule R{index} {{ when {condition(sensor, operator)} then A{rng.randrange(shape.actuators)}.{action} }}"
+        )
+        index += 1
+    return "\n".join(lines) + "\n"
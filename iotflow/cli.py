@@ -1,15 +1,31 @@
 import argparse
+import sys
 from pathlib import Path
 
-from .parser.parse import parse_file
+from . import JSON_SUFFIXES, load_model
 from .model import Sensor, Actuator, Rule
+from .profiling import DEFAULT_PROFILE_OUTPUT, DEFAULT_TOP, Profiler
+from .runtime.actuation import RulePolicy
+from .runtime.checkpoint import DEFAULT_CHECKPOINT_EVERY
+from .runtime.metrics import MetricsRegistry
 from .runtime.runner import run_simulation
+from .runtime.sinks import make_sink
 
+# Above this many cycles `run` stops keeping every cycle in memory.
+STREAMING_CYCLE_THRESHOLD = 10_000
 
-def validate_model(model_file):
+
+def _load(model_file, warm=None):
+    """Load a model, from the daemon's cache when running in one."""
+    return warm.load(model_file) if warm is not None else load_model(model_file)
+
+
+def validate_model(model_file, profiler=None, warm=None):
     """Validate an IoTFlow model file."""
     try:
-        model = parse_file(Path(model_file))
+        model = _load(model_file, warm)
+        if profiler:
+            profiler.watch(model)
 
         sensors = [el for el in model.elements if isinstance(el, Sensor)]
         actuators = [el for el in model.elements if isinstance(el, Actuator)]
@@ -27,10 +43,12 @@ def validate_model(model_file):
         return False
 
 
-def parse_command(args):
+def parse_command(args, profiler=None, warm=None):
     """Parse a model file and show basic info."""
     try:
-        model = parse_file(Path(args.model))
+        model = _load(args.model, warm)
+        if profiler:
+            profiler.watch(model)
         print(f"Model loaded successfully from: {args.model}")
         print(f"Total elements: {len(model.elements)}")
 
@@ -45,44 +63,356 @@ def parse_command(args):
         return False
 
 
-def run_command(args):
+def _parse_column_map(pairs):
+    """Turn repeated COLUMN=SENSOR options into a column mapping."""
+    mapping = {}
+    for pair in pairs or []:
+        column, sep, sensor = pair.partition('=')
+        if not sep or not column or not sensor:
+            raise ValueError(f"Invalid column mapping '{pair}', expected COLUMN=SENSOR")
+        mapping[column] = sensor
+    return mapping
+
+
+def _parse_rule_policies(args):
+    """Build per-rule edge policies from repeated RULE=VALUE options."""
+    policies = {}
+    for pair in args.hysteresis or []:
+        rule, sep, value = pair.partition('=')
+        if not sep:
+            raise ValueError(f"Invalid hysteresis '{pair}', expected RULE=DELTA")
+        policies.setdefault(rule, RulePolicy()).hysteresis = float(value)
+    for pair in args.min_hold or []:
+        rule, sep, value = pair.partition('=')
+        if not sep:
+            raise ValueError(f"Invalid minimum hold '{pair}', expected RULE=CYCLES")
+        policies.setdefault(rule, RulePolicy()).min_hold = int(value)
+    return policies
+
+
+def _choose_sink(args):
+    """Pick a result sink, switching to a bounded one for large runs."""
+    kind = args.sink
+    if kind == 'auto':
+        if args.cycles is None:
+            large = args.trace is not None
+        else:
+            large = args.cycles > STREAMING_CYCLE_THRESHOLD
+        if not large:
+            kind = 'memory'
+        else:
+            kind = 'stream' if args.sink_output else 'sampled'
+    return make_sink(kind, output=args.sink_output, sample_size=args.sample_size)
+
+
+def run_command(args, profiler=None, warm=None):
     """Run IoT simulation on a model file."""
+    server = None
     try:
-        model = parse_file(Path(args.model))
-        result = run_simulation(model, cycles=args.cycles)
-        print(result)
+        if args.watch and Path(args.model).suffix.lower() in JSON_SUFFIXES:
+            raise ValueError("--watch reloads DSL source; it cannot watch a JSON model")
+        model = _load(args.model, warm)
+        if profiler:
+            profiler.watch(model)
+        metrics = None
+        if args.metrics_json or args.metrics_prom or args.metrics_port is not None:
+            metrics = MetricsRegistry()
+        if args.metrics_port is not None:
+            server = metrics.serve(args.metrics_port)
+            host, port = server.server_address[:2]
+            print(f"Serving metrics on http://{host}:{port}/metrics")
+        result = run_simulation(
+            model,
+            cycles=args.cycles,
+            trace=args.trace,
+            trace_columns=_parse_column_map(args.trace_column),
+            missing=args.missing,
+            sink=_choose_sink(args),
+            export=args.export,
+            edge_triggered=args.edge_triggered,
+            rule_policies=_parse_rule_policies(args),
+            engine=args.engine,
+            metrics=metrics,
+            period=args.period,
+            watch=args.model if args.watch else None,
+            checkpoint=args.checkpoint,
+            checkpoint_every=args.checkpoint_every,
+            resume_from=args.resume,
+            table=warm.table(model, args.engine) if warm is not None else None,
+        )
+        if profiler:
+            profiler.watch(result)
+        if args.metrics_json:
+            metrics.write_json(args.metrics_json)
+        if args.metrics_prom:
+            metrics.write_prometheus(args.metrics_prom)
+        result.render(
+            sys.stdout,
+            summary_only=args.summary_only,
+            fired_only=args.fired_only,
+            max_cycles=args.max_cycles,
+            color={'auto': None, 'always': True, 'never': False}[args.color],
+        )
+        print()
         return True
     except Exception as e:
         print(f"Error running simulation: {e}")
         return False
+    finally:
+        if server is not None:
+            server.shutdown()
+
+
+def montecarlo_command(args):
+    """Estimate rule and actuator firing probabilities by Monte Carlo simulation."""
+    from .runtime.montecarlo import run_monte_carlo
+
+    try:
+        result = run_monte_carlo(
+            path=Path(args.model),
+            samples=args.samples,
+            workers=args.workers,
+            batch_size=args.batch_size,
+            precision=args.precision,
+            confidence=args.confidence,
+            seed=args.seed,
+            engine=args.engine,
+        )
+        result.render(sys.stdout)
+        return True
+    except Exception as e:
+        print(f"Error running Monte Carlo simulation: {e}")
+        return False
+
+
+def analyze_command(args):
+    """Compute rule and actuator firing probabilities in closed form."""
+    from .runtime.analytic import analyze_model
+
+    try:
+        model = load_model(args.model)
+        analyze_model(model).render(sys.stdout)
+        return True
+    except Exception as e:
+        print(f"Error analyzing model: {e}")
+        return False
+
+
+def generate_command(args):
+    """Generate outputs for a directory of models, skipping unchanged ones."""
+    from .generators.batch import generate_tree
 
+    try:
+        report = generate_tree(
+            args.source,
+            output=args.output,
+            targets=args.target,
+            workers=args.workers,
+            force=args.force,
+        )
+        print(report.summary())
+        return report.ok
+    except Exception as e:
+        print(f"Error generating outputs: {e}")
+        return False
 
-def main():
-    """Main CLI entry point."""
-    parser = argparse.ArgumentParser(description="IoTFlow DSL CLI")
+
+def bench_command(args):
+    """Benchmark the pipeline; False if anything regressed against the baseline."""
+    from .bench.suite import run_from_args
+
+    return run_from_args(args)
+
+
+def serve_command(args):
+    """Serve validate, parse and run from a warm process on a Unix socket."""
+    from .daemon import serve
+
+    try:
+        serve(args.socket, cache_size=args.cache_size)
+        return True
+    except Exception as e:
+        print(f"Error serving: {e}")
+        return False
+
+
+def _add_montecarlo_arguments(parser):
+    from .runtime.montecarlo import DEFAULT_BATCH_SIZE, DEFAULT_CONFIDENCE
+
+    parser.add_argument('model', help='Path to .iot model file')
+    parser.add_argument('--samples', type=int, default=100_000,
+                        help='Maximum number of simulated cycles')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Worker processes (default: one per CPU)')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help='Cycles per independently seeded batch')
+    parser.add_argument('--precision', type=float, default=None,
+                        help='Stop once every confidence interval is at most this wide on each side')
+    parser.add_argument('--confidence', type=float, default=DEFAULT_CONFIDENCE,
+                        help='Confidence level of the intervals')
+    parser.add_argument('--seed', type=int, default=0, help='Base random seed')
+    parser.add_argument('--engine', choices=['compiled', 'network'], default='compiled',
+                        help='Rule matcher used by the simulation')
+
+
+def _add_generate_arguments(parser):
+    from .generators.batch import TARGETS
+
+    parser.add_argument('source', help='Directory to search for .iot models, or one model file')
+    parser.add_argument('--target', action='append', choices=sorted(TARGETS),
+                        help='Output to generate (repeatable, default: json)')
+    parser.add_argument('--output', metavar='DIR',
+                        help='Directory for the outputs and manifest (default: beside the models)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Worker processes (default: one per CPU)')
+    parser.add_argument('--force', action='store_true',
+                        help='Regenerate every model, ignoring the manifest')
+
+
+def _add_profile_arguments(parser):
+    parser.add_argument('--profile', nargs='?', const=DEFAULT_PROFILE_OUTPUT, metavar='FILE',
+                        help=f'Capture a CPU profile (pstats format, default {DEFAULT_PROFILE_OUTPUT})')
+    parser.add_argument('--profile-memory', action='store_true',
+                        help='Trace memory and report it by model element type and allocation site')
+    parser.add_argument('--profile-top', type=int, default=DEFAULT_TOP,
+                        help='Entries shown in the profiling summary')
+
+
+def _profiled(command, args, *command_args, **command_kwargs):
+    profiler = Profiler(args.profile, args.profile_memory, args.profile_top)
+    if not profiler.enabled:
+        return command(*command_args, **command_kwargs)
+    with profiler:
+        success = command(*command_args, profiler=profiler, **command_kwargs)
+    profiler.report()
+    return success
+
+
+def main(argv=None, warm=None, prog=None):
+    """
+    Main CLI entry point.
+
+    `warm` is the daemon state when the command line was forwarded by
+    `iotflow.client`; `prog` is then the client's program name.
+    """
+    parser = argparse.ArgumentParser(prog=prog, description="IoTFlow DSL CLI")
     subparsers = parser.add_subparsers(dest='command', help='Available commands')
 
     validate_parser = subparsers.add_parser('validate', help='Validate an IoTFlow model')
     validate_parser.add_argument('model', help='Path to the model file to validate')
+    _add_profile_arguments(validate_parser)
 
     parse_parser = subparsers.add_parser('parse', help='Parse and display IoTFlow model info')
     parse_parser.add_argument('model', help='Path to the model file to parse')
+    _add_profile_arguments(parse_parser)
 
     run_parser = subparsers.add_parser('run', help='Run IoT simulation')
     run_parser.add_argument('model', help='Path to the model file to simulate')
-    run_parser.add_argument('--cycles', type=int, default=1, help='Number of simulation cycles')
+    run_parser.add_argument('--cycles', type=int, default=None,
+                            help='Number of simulation cycles (default: 1, or the whole trace)')
+    run_parser.add_argument('--trace', help='Replay sensor readings from a CSV, NDJSON or binary trace file')
+    run_parser.add_argument('--trace-column', action='append', metavar='COLUMN=SENSOR',
+                            help='Map a trace column to a sensor name (repeatable)')
+    run_parser.add_argument('--missing', choices=['simulate', 'hold'], default='simulate',
+                            help='How to fill sensors missing from a trace row')
+    run_parser.add_argument('--sink', choices=['auto', 'memory', 'aggregate', 'sampled', 'stream'],
+                            default='auto',
+                            help='Which cycles to keep (auto: all for small runs, bounded for large ones)')
+    run_parser.add_argument('--sink-output', help='NDJSON file written by the stream sink')
+    run_parser.add_argument('--sample-size', type=int, default=100,
+                            help='Cycles kept by the sampled sink')
+    run_parser.add_argument('--export', metavar='FILE',
+                            help='Also write all cycles to a columnar .npz, .arrow or .parquet file')
+    run_parser.add_argument('--edge-triggered', action='store_true',
+                            help='Emit actuator commands only on state transitions')
+    run_parser.add_argument('--hysteresis', action='append', metavar='RULE=DELTA',
+                            help='Hysteresis band for a rule in edge-triggered mode (repeatable)')
+    run_parser.add_argument('--min-hold', action='append', metavar='RULE=CYCLES',
+                            help='Minimum hold time for a rule in edge-triggered mode (repeatable)')
+    run_parser.add_argument('--engine', choices=['compiled', 'network'], default='compiled',
+                            help='Rule matcher; network shares identical conditions across large rule bases')
+    run_parser.add_argument('--period', type=float, default=None, metavar='SECONDS',
+                            help='Run cycles at this fixed period and report deadline misses and jitter')
+    run_parser.add_argument('--watch', action='store_true',
+                            help='Reload the model file between cycles whenever it changes')
+    run_parser.add_argument('--checkpoint', metavar='FILE',
+                            help='Periodically save the run state to this file')
+    run_parser.add_argument('--checkpoint-every', type=int, default=DEFAULT_CHECKPOINT_EVERY, metavar='CYCLES',
+                            help='Cycles between checkpoints')
+    run_parser.add_argument('--resume', metavar='FILE',
+                            help='Continue a run from a checkpoint file (same model and options)')
+    run_parser.add_argument('--metrics-json', metavar='FILE',
+                            help='Write a JSON snapshot of the runtime metrics after the run')
+    run_parser.add_argument('--metrics-prom', metavar='FILE',
+                            help='Write the runtime metrics in Prometheus text format after the run')
+    run_parser.add_argument('--metrics-port', type=int, default=None,
+                            help='Serve Prometheus metrics on this local port while the run is in progress')
+    run_parser.add_argument('--summary-only', action='store_true',
+                            help='Print only the report header and summary')
+    run_parser.add_argument('--fired-only', action='store_true',
+                            help='Print only cycles in which at least one rule fired')
+    run_parser.add_argument('--max-cycles', type=int, default=None,
+                            help='Print at most this many cycles')
+    run_parser.add_argument('--color', choices=['auto', 'always', 'never'], default='auto',
+                            help='Use ANSI colors (auto: only when stdout is a terminal)')
+    _add_profile_arguments(run_parser)
+
+    mc_parser = subparsers.add_parser('montecarlo', help='Estimate rule firing probabilities by simulation')
+    analyze_parser = subparsers.add_parser('analyze',
+                                           help='Compute rule firing probabilities without simulating')
+    analyze_parser.add_argument('model', help='Path to .iot model file')
+
+    generate_parser = subparsers.add_parser('generate',
+                                            help='Generate outputs for a directory of models incrementally')
+    bench_parser = subparsers.add_parser('bench', help='Benchmark the pipeline on a synthetic model')
+
+    serve_parser = subparsers.add_parser('serve', help='Keep models warm and answer validate, parse and run '
+                                                       'from other iotflow-dsl invocations')
+    serve_parser.add_argument('--socket', metavar='PATH', default=None,
+                              help='Unix socket to listen on (default: $IOTFLOW_SOCKET, or '
+                                   'iotflow-<uid>.sock in $XDG_RUNTIME_DIR or /tmp)')
+    serve_parser.add_argument('--cache-size', type=int, default=None,
+                              help='Number of parsed models to keep (default: 64)')
+
+    # The options of these commands come from their own modules, some of which
+    # import textX; they are only added when the command line selects them.
+    argv = sys.argv[1:] if argv is None else list(argv)
+    command = argv[0] if argv else None
+    if command == 'montecarlo':
+        _add_montecarlo_arguments(mc_parser)
+    elif command == 'generate':
+        _add_generate_arguments(generate_parser)
+    elif command == 'bench':
+        from .bench.suite import add_arguments
+
+        add_arguments(bench_parser)
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     if args.command == 'validate':
-        success = validate_model(args.model)
-        exit(0 if success else 1)
+        success = _profiled(validate_model, args, args.model, warm=warm)
+        sys.exit(0 if success else 1)
     elif args.command == 'parse':
-        success = parse_command(args)
-        exit(0 if success else 1)
+        success = _profiled(parse_command, args, args, warm=warm)
+        sys.exit(0 if success else 1)
     elif args.command == 'run':
-        success = run_command(args)
-        exit(0 if success else 1)
+        success = _profiled(run_command, args, args, warm=warm)
+        sys.exit(0 if success else 1)
+    elif args.command == 'montecarlo':
+        success = montecarlo_command(args)
+        sys.exit(0 if success else 1)
+    elif args.command == 'analyze':
+        success = analyze_command(args)
+        sys.exit(0 if success else 1)
+    elif args.command == 'generate':
+        success = generate_command(args)
+        sys.exit(0 if success else 1)
+    elif args.command == 'bench':
+        success = bench_command(args)
+        sys.exit(0 if success else 1)
+    elif args.command == 'serve':
+        success = serve_command(args)
+        sys.exit(0 if success else 1)
     else:
         parser.print_help()
 
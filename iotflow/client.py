@@ -0,0 +1,146 @@
+"""
+Thin command-line client for the IoTFlow daemon.
+
+`iotflow-dsl` starts here. When a daemon started with `iotflow-dsl serve`
+is listening, validate, parse and run are forwarded to it and skip
+interpreter warm-up, the textX import and metamodel construction. Every
+other command, and every command when no daemon is running, runs
+in-process. Only the standard library is imported before forwarding.
+"""
+
+import json
+import os
+import socket
+import stat
+import sys
+from typing import List, Optional
+
+DAEMON_COMMANDS = ("validate", "parse", "run")
+# Options that need the client's own process: watching the file it runs,
+# serving a local port, profiling the process that does the work, or pacing
+# a run in real time (the daemon answers one command at a time and sends
+# output only at the end).
+LOCAL_OPTIONS = ("--watch", "--metrics-port", "--profile", "--profile-memory", "--period")
+SOCKET_ENV = "IOTFLOW_SOCKET"
+# Set to a non-empty value to always run in-process.
+NO_DAEMON_ENV = "IOTFLOW_NO_DAEMON"
+
+
+def default_socket_path() -> str:
+    """$IOTFLOW_SOCKET, else a per-user socket in $XDG_RUNTIME_DIR or /tmp."""
+    path = os.environ.get(SOCKET_ENV)
+    if path:
+        return path
+    directory = os.environ.get("XDG_RUNTIME_DIR") or "/tmp"
+    name = f"iotflow-{os.getuid()}.sock" if hasattr(os, "getuid") else "iotflow.sock"
+    return os.path.join(directory, name)
+
+
+def check_socket(path: str) -> None:
+    """
+    Refuse a socket path that is not a socket owned by the current user.
+
+    The default path is predictable, so another local user could bind it
+    first to read command lines and send back forged answers.
+
+    Raises:
+        FileNotFoundError: If nothing exists at the path
+        PermissionError: If it is not a socket or belongs to another user
+    """
+    st = os.stat(path)
+    if not stat.S_ISSOCK(st.st_mode):
+        raise PermissionError(f"{path} is not a socket")
+    if hasattr(os, "getuid") and st.st_uid != os.getuid():
+        raise PermissionError(f"{path} belongs to another user")
+
+
+def _given(argv: List[str], options) -> bool:
+    for arg in argv:
+        name = arg.split("=", 1)[0]
+        # argparse also accepts unambiguous prefixes of long options.
+        if name.startswith("--") and len(name) > 2 and any(option.startswith(name) for option in options):
+            return True
+    return False
+
+
+def forwardable(argv: List[str]) -> bool:
+    """Whether the daemon can run this command line for the client."""
+    if not argv or argv[0] not in DAEMON_COMMANDS or _given(argv[1:], LOCAL_OPTIONS):
+        return False
+    # Replaying a whole trace may take long enough to hold up other commands.
+    return not (argv[0] == "run" and _given(argv[1:], ("--trace",)) and not _given(argv[1:], ("--cycles",)))
+
+
+def request(argv: List[str], socket_path: Optional[str] = None) -> Optional[dict]:
+    """
+    Run a command line on the daemon.
+
+    Args:
+        argv: Command-line arguments, without the program name
+        socket_path: Daemon socket (default: `default_socket_path()`)
+
+    Returns:
+        The daemon's {"exit", "stdout", "stderr"} response, or None if no
+        daemon is listening on the socket
+
+    Raises:
+        PermissionError: If the socket is not one the current user owns;
+            nothing has been sent then
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+    socket_path = socket_path or default_socket_path()
+    try:
+        check_socket(socket_path)
+    except FileNotFoundError:
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        try:
+            sock.connect(socket_path)
+        except OSError:
+            return None
+        isatty = getattr(sys.stdout, "isatty", None)
+        payload = {
+            "argv": list(argv),
+            "cwd": os.getcwd(),
+            "prog": os.path.basename(sys.argv[0]) if sys.argv and sys.argv[0] else None,
+            "isatty": bool(isatty and isatty()),
+        }
+        sock.sendall(json.dumps(payload).encode("utf-8") + b"\n")
+        sock.shutdown(socket.SHUT_WR)
+        with sock.makefile("rb") as f:
+            data = f.read()
+    finally:
+        sock.close()
+    if not data:
+        # The command may have had side effects, so it is not rerun locally.
+        raise ConnectionError("The iotflow daemon closed the connection without answering")
+    return json.loads(data)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """CLI entry point: forward to the daemon when possible, else run in-process."""
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if forwardable(argv) and not os.environ.get(NO_DAEMON_ENV):
+        try:
+            response = request(argv)
+        except PermissionError as e:
+            # Nothing was sent, so the command can still run here.
+            print(f"Not using the iotflow daemon: {e}", file=sys.stderr)
+            response = None
+        except (OSError, ValueError) as e:
+            print(f"Error talking to the iotflow daemon: {e}", file=sys.stderr)
+            sys.exit(1)
+        if response is not None:
+            sys.stdout.write(response["stdout"])
+            sys.stdout.flush()
+            sys.stderr.write(response["stderr"])
+            sys.exit(response["exit"])
+    from .cli import main as cli_main
+
+    cli_main(argv)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+"""
+Long-running IoTFlow daemon answering CLI commands over a Unix socket.
+
+`iotflow-dsl serve` builds the metamodel once and keeps recently used
+models parsed and their rule tables compiled. `iotflow.client` forwards
+validate, parse and run to it; each command runs through the same CLI code
+as in-process, with the client's arguments, working directory and terminal
+flag, and its output and exit status are sent back.
+
+Protocol: one request per connection, a JSON line
+{"argv", "cwd", "prog", "isatty"} answered by one JSON document
+{"exit", "stdout", "stderr"}. Requests are handled one at a time, since a
+command runs with the daemon's working directory and standard streams.
+"""
+
+import io
+import json
+import os
+import socket
+import socketserver
+import sys
+import traceback
+import warnings
+from collections import OrderedDict
+from contextlib import redirect_stderr, redirect_stdout
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from . import JSON_SUFFIXES
+from .client import DAEMON_COMMANDS, check_socket, default_socket_path
+from .model import Model
+from .parser import imports
+from .parser.json_loader import load_json_file
+from .parser.metamodel import build_metamodel
+from .runtime.columnar import RuleTable
+from .runtime.context import build_context
+
+# Parsed models kept by a daemon, least recently used dropped first.
+DEFAULT_CACHE_SIZE = 64
+
+
+@dataclass
+class _CachedModel:
+    # (size, mtime_ns) of the file when it was loaded.
+    stat: Tuple[int, int]
+    model: Model
+    # Validation warnings of the load, shown again on every cache hit.
+    caught: List[warnings.WarningMessage]
+    # Engine -> (table, its state before any cycle).
+    tables: Dict[str, Tuple[RuleTable, dict]] = field(default_factory=dict)
+
+
+class WarmState:
+    """
+    The metamodel, parsed models and compiled rule tables a daemon keeps.
+
+    Models are cached by resolved path and reloaded when the size or
+    modification time of the file, or of a file it imports, changes.
+    """
+
+    def __init__(self, cache_size: int = DEFAULT_CACHE_SIZE) -> None:
+        if cache_size < 1:
+            raise ValueError("cache_size must be at least 1")
+        self.cache_size = cache_size
+        self.metamodel = build_metamodel()
+        self._models: "OrderedDict[Path, _CachedModel]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def load(self, model_path) -> Model:
+        """Like `iotflow.load_model`, reusing the parsed model while the file is unchanged."""
+        path = Path(model_path).resolve()
+        st = path.stat()
+        key = (st.st_size, st.st_mtime_ns)
+        cached = self._models.get(path)
+        if cached is not None and cached.stat == key and imports.MODULES.current(cached.model, self.metamodel):
+            self.hits += 1
+            self._models.move_to_end(path)
+            for w in cached.caught:
+                warnings.warn_explicit(w.message, w.category, w.filename, w.lineno)
+            return cached.model
+
+        self.misses += 1
+        self._models.pop(path, None)
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            if path.suffix.lower() in JSON_SUFFIXES:
+                model = load_json_file(path)
+            else:
+                model = self.metamodel.model_from_file(str(path))
+        for w in caught:
+            warnings.warn_explicit(w.message, w.category, w.filename, w.lineno)
+        self._models[path] = _CachedModel(key, model, caught)
+        while len(self._models) > self.cache_size:
+            self._models.popitem(last=False)
+        return model
+
+    def table(self, model: Model, engine: str = "compiled") -> RuleTable:
+        """
+        Rule table for a model returned by `load`, in its initial state.
+
+        The table is compiled once per cached model and engine and reset to
+        its initial state on reuse, so a command must be done with the
+        previous table before asking for the next one.
+        """
+        cached = next((entry for entry in self._models.values() if entry.model is model), None)
+        if cached is None:
+            return RuleTable(build_context(model), engine=engine)
+        if engine in cached.tables:
+            table, initial = cached.tables[engine]
+            table.restore(initial)
+            return table
+        table = RuleTable(build_context(model), engine=engine)
+        cached.tables[engine] = (table, table.snapshot())
+        return table
+
+
+class _Capture(io.StringIO):
+    """Captured output stream that reports the client's terminal flag."""
+
+    def __init__(self, isatty: bool) -> None:
+        super().__init__()
+        self._isatty = isatty
+
+    def isatty(self) -> bool:
+        return self._isatty
+
+
+def _exit_status(code, stderr: io.StringIO) -> int:
+    # Mirrors how the interpreter turns SystemExit into a process status.
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+    print(code, file=stderr)
+    return 1
+
+
+def handle_request(state: WarmState, request: dict) -> dict:
+    """
+    Run one forwarded command line on the warm state.
+
+    Args:
+        state: Warm state of the daemon
+        request: Decoded request with the client's argv, cwd, prog and isatty
+
+    Returns:
+        Response with the command's exit status and captured output
+    """
+    from .cli import main as cli_main
+
+    argv = request.get("argv") or []
+    if not argv or argv[0] not in DAEMON_COMMANDS:
+        return {"exit": 2, "stdout": "", "stderr": f"The daemon only runs {', '.join(DAEMON_COMMANDS)}\n"}
+    stdout = _Capture(bool(request.get("isatty")))
+    stderr = _Capture(False)
+    status = 0
+    previous_cwd = os.getcwd()
+    try:
+        os.chdir(request["cwd"])
+        # A fresh filter context also resets "shown once" bookkeeping, so
+        # each command prints the warnings a new process would.
+        with redirect_stdout(stdout), redirect_stderr(stderr), warnings.catch_warnings():
+            try:
+                cli_main(argv, warm=state, prog=request.get("prog"))
+            except SystemExit as e:
+                status = _exit_status(e.code, stderr)
+    except Exception:
+        traceback.print_exc(file=stderr)
+        status = 1
+    finally:
+        os.chdir(previous_cwd)
+    return {"exit": status, "stdout": stdout.getvalue(), "stderr": stderr.getvalue()}
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        try:
+            request = json.loads(self.rfile.readline())
+        except ValueError:
+            response = {"exit": 2, "stdout": "", "stderr": "Malformed request\n"}
+        else:
+            response = handle_request(self.server.state, request)
+        self.wfile.write(json.dumps(response).encode("utf-8"))
+
+
+class DaemonServer(socketserver.UnixStreamServer):
+    """Serial Unix socket server over one `WarmState`."""
+
+    def __init__(self, socket_path: str, state: WarmState) -> None:
+        self.state = state
+        _claim_socket(socket_path)
+        # Only the owner may connect: requests run with the owner's rights.
+        umask = os.umask(0o177)
+        try:
+            super().__init__(socket_path, _Handler)
+        finally:
+            os.umask(umask)
+
+    def server_close(self) -> None:
+        super().server_close()
+        try:
+            os.unlink(self.server_address)
+        except OSError:
+            pass
+
+
+def _claim_socket(socket_path: str) -> None:
+    """
+    Remove a socket left behind by a daemon that is gone; refuse a live one,
+    and anything that is not a socket of the current user.
+    """
+    try:
+        check_socket(socket_path)
+    except FileNotFoundError:
+        return
+    except PermissionError as e:
+        raise FileExistsError(f"Cannot serve on {socket_path}: {e}") from None
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(socket_path)
+    except ConnectionRefusedError:
+        os.unlink(socket_path)
+        return
+    finally:
+        probe.close()
+    raise RuntimeError(f"An iotflow daemon is already serving on {socket_path}")
+
+
+def serve(socket_path: Optional[str] = None, cache_size: Optional[int] = None) -> None:
+    """
+    Serve CLI commands on a Unix socket until interrupted.
+
+    Args:
+        socket_path: Socket to listen on (default: `default_socket_path()`)
+        cache_size: Number of parsed models to keep (default: DEFAULT_CACHE_SIZE)
+    """
+    socket_path = socket_path or default_socket_path()
+    server = DaemonServer(socket_path, WarmState(cache_size or DEFAULT_CACHE_SIZE))
+    print(f"Serving iotflow commands on {socket_path}")
+    sys.stdout.flush()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
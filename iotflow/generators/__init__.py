@@ -1,8 +1,10 @@
 # This file marks the generators package for IoTFlow DSL.
 
-from .json_generator import generate_json, model_to_json_string
+from .json_generator import generate_json, model_to_json_string, write_json
+from .python_generator import generate_python, model_to_python_string, write_python
 
 # textX generator is automatically registered via entry points
 # and does not need to be imported directly
 
-__all__ = ["generate_json", "model_to_json_string"]
+__all__ = ["generate_json", "model_to_json_string", "write_json",
+           "generate_python", "model_to_python_string", "write_python"]
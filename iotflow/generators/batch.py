@@ -0,0 +1,287 @@
+"""
+Incremental batch generation for directories of IoTFlow DSL models.
+
+Walks a directory tree for .iot models and regenerates only the outputs
+that are out of date. A manifest beside the outputs records, per model, the
+source hash, the hashes of the files it imports and the version of every
+generator that produced its outputs; models whose entry still matches are
+skipped without being parsed. The rest
+are parsed and generated across a process pool, each worker building the
+metamodel once. Every output file and the manifest are written atomically.
+"""
+
+import hashlib
+import json
+import os
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .. import __version__
+from .json_generator import JSON_GENERATOR_VERSION, write_json
+from .python_generator import PYTHON_GENERATOR_VERSION, write_python
+
+MANIFEST_NAME = ".iotflow-manifest.json"
+MANIFEST_VERSION = 1
+MODEL_SUFFIX = ".iot"
+
+
+@dataclass(frozen=True)
+class Target:
+    # Appended to the model's stem to name the output file.
+    suffix: str
+    version: int
+    write: Callable
+
+
+TARGETS: Dict[str, Target] = {
+    "json": Target(".json", JSON_GENERATOR_VERSION, lambda model, out, name: write_json(model, out)),
+    "ndjson": Target(".ndjson", JSON_GENERATOR_VERSION, lambda model, out, name: write_json(model, out, compact=True)),
+    "python": Target("_rules.py", PYTHON_GENERATOR_VERSION, write_python),
+}
+
+# Metamodel of a worker process, built once by `_init_worker`.
+_worker_metamodel = None
+
+# (path, size, mtime_ns) -> sha256 of imported files, so a catalog imported
+# by many models is hashed once per process.
+_import_hashes: Dict[Tuple[str, int, int], str] = {}
+
+
+@dataclass
+class BatchReport:
+    generated: List[str] = field(default_factory=list)
+    skipped: List[str] = field(default_factory=list)
+    # Model path -> error message; failed models keep their previous outputs.
+    failed: Dict[str, str] = field(default_factory=dict)
+    seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return not self.failed
+
+    def summary(self) -> str:
+        text = (
+            f"Generated {len(self.generated)} model(s), skipped {len(self.skipped)} unchanged"
+            f"{f', {len(self.failed)} failed' if self.failed else ''} in {self.seconds:.2f} s"
+        )
+        for path, error in sorted(self.failed.items()):
+            text += f"\n  {path}: {error}"
+        return text
+
+
+def generator_version(target: str) -> str:
+    """Version string recorded in the manifest for a target's outputs."""
+    return f"{__version__}/{target}/{TARGETS[target].version}"
+
+
+def output_paths(model_path: Path, source_root: Path, output_root: Path, targets: List[str]) -> List[Path]:
+    """
+    Output files of one model, mirroring its place under the source root.
+
+    Args:
+        model_path: Path of the .iot model
+        source_root: Directory the batch walks
+        output_root: Directory the outputs go to
+        targets: Names of the targets to generate
+
+    Returns:
+        One path per target, in the order of `targets`
+    """
+    relative = model_path.relative_to(source_root)
+    base = output_root / relative.parent
+    return [base / (relative.stem + TARGETS[target].suffix) for target in targets]
+
+
+def _write_atomic(path: Path, write: Callable) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            write(f)
+        os.replace(tmp, path)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+
+def _source_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _file_hash(path: str) -> Optional[str]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    key = (path, stat.st_size, stat.st_mtime_ns)
+    if key not in _import_hashes:
+        _import_hashes[key] = _source_hash(Path(path).read_bytes())
+    return _import_hashes[key]
+
+
+def _generate_one(metamodel, model_path: str,
+                  outputs: List[Tuple[str, str]]) -> Tuple[str, Optional[str], Dict[str, str]]:
+    """Parse one model and write its outputs; returns (source hash, error, imported file hashes)."""
+    from ..parser.imports import imported_files
+
+    data = Path(model_path).read_bytes()
+    try:
+        model = metamodel.model_from_str(data.decode("utf-8"), file_name=model_path)
+        imports = {path: _file_hash(path) for path in imported_files(model)}
+        for target, output in outputs:
+            write = TARGETS[target].write
+            _write_atomic(Path(output), lambda f: write(model, f, Path(model_path).name))
+    except Exception as e:
+        return _source_hash(data), f"{type(e).__name__}: {e}", {}
+    return _source_hash(data), None, imports
+
+
+def _init_worker() -> None:
+    global _worker_metamodel
+    from ..parser.metamodel import build_metamodel
+
+    # Validation warnings would repeat for every model; the report lists failures.
+    warnings.simplefilter("ignore")
+    _worker_metamodel = build_metamodel()
+
+
+def _run_job(job: Tuple[str, List[Tuple[str, str]]]) -> Tuple[str, Optional[str], Dict[str, str]]:
+    return _generate_one(_worker_metamodel, *job)
+
+
+def load_manifest(output_root: Path) -> dict:
+    path = output_root / MANIFEST_NAME
+    try:
+        manifest = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if manifest.get("version") != MANIFEST_VERSION:
+        return {}
+    return manifest.get("models", {})
+
+
+def _write_manifest(output_root: Path, models: dict) -> None:
+    data = {"version": MANIFEST_VERSION, "models": dict(sorted(models.items()))}
+    _write_atomic(output_root / MANIFEST_NAME, lambda f: json.dump(data, f, indent=1))
+
+
+def _current_entry(entry: Optional[dict], stat: os.stat_result, model_path: Path,
+                   versions: Dict[str, str], outputs: List[Path], source_root: Path) -> Optional[dict]:
+    """The model's manifest entry if its outputs are up to date, else None."""
+    if not entry:
+        return None
+    generators = entry.get("generators", {})
+    if any(generators.get(target) != version for target, version in versions.items()):
+        return None
+    if not all(output.exists() for output in outputs):
+        return None
+    for path, digest in entry.get("imports", {}).items():
+        if _file_hash(os.path.normpath(source_root / path)) != digest:
+            return None
+    if entry.get("size") == stat.st_size and entry.get("mtime_ns") == stat.st_mtime_ns:
+        return entry
+    # Touched but possibly unchanged (checkout, copy): compare contents.
+    if entry.get("sha256") == _source_hash(model_path.read_bytes()):
+        return {**entry, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    return None
+
+
+def generate_tree(
+    source,
+    output=None,
+    targets: Optional[List[str]] = None,
+    workers: Optional[int] = None,
+    force: bool = False,
+) -> BatchReport:
+    """
+    Generate outputs for every model under a directory, skipping unchanged ones.
+
+    Args:
+        source: Directory to walk for .iot models (or a single model file)
+        output: Directory for the outputs and manifest (default: beside the models)
+        targets: Target names from TARGETS (default: ["json"])
+        workers: Worker processes (default: one per CPU); 1 runs in-process
+        force: Regenerate every model regardless of the manifest
+
+    Returns:
+        BatchReport listing generated, skipped and failed models (paths
+        relative to the source directory)
+    """
+    started = time.perf_counter()
+    targets = list(dict.fromkeys(targets or ["json"]))
+    unknown = [t for t in targets if t not in TARGETS]
+    if unknown:
+        raise ValueError(f"Unknown targets {unknown}, expected some of {sorted(TARGETS)}")
+    source = Path(source)
+    if source.is_file():
+        source_root, models = source.parent, [source]
+    else:
+        source_root, models = source, sorted(source.rglob("*" + MODEL_SUFFIX))
+    output_root = Path(output) if output is not None else source_root
+    versions = {target: generator_version(target) for target in targets}
+
+    manifest = load_manifest(output_root)
+    report = BatchReport()
+    # Entries of models outside this run survive; a walked tree prunes deleted models.
+    entries: dict = {key: entry for key, entry in manifest.items() if source.is_file()}
+    jobs: List[Tuple[str, List[Tuple[str, str]]]] = []
+    # Stat taken before generating, so a model edited meanwhile is seen as changed next time.
+    stats: Dict[str, os.stat_result] = {}
+    for model_path in models:
+        key = model_path.relative_to(source_root).as_posix()
+        stat = model_path.stat()
+        outputs = output_paths(model_path, source_root, output_root, targets)
+        entry = None if force else _current_entry(manifest.get(key), stat, model_path, versions, outputs,
+                                                  source_root.resolve())
+        if entry is not None:
+            entries[key] = entry
+            report.skipped.append(key)
+        else:
+            stats[key] = stat
+            jobs.append((str(model_path), [(t, str(o)) for t, o in zip(targets, outputs)]))
+
+    if jobs:
+        workers = min(workers or os.cpu_count() or 1, len(jobs))
+        if workers == 1:
+            from ..parser.metamodel import build_metamodel
+
+            metamodel = build_metamodel()
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                results = [_generate_one(metamodel, *job) for job in jobs]
+        else:
+            chunksize = max(1, len(jobs) // (workers * 4))
+            with ProcessPoolExecutor(workers, initializer=_init_worker) as pool:
+                results = list(pool.map(_run_job, jobs, chunksize=chunksize))
+        for (model_path, _), (digest, error, imports) in zip(jobs, results):
+            key = Path(model_path).relative_to(source_root).as_posix()
+            if error is not None:
+                report.failed[key] = error
+                entries.pop(key, None)
+                continue
+            previous = manifest.get(key, {})
+            # Outputs of other targets stay valid while the source is unchanged.
+            generators = previous.get("generators", {}) if previous.get("sha256") == digest else {}
+            entries[key] = {
+                "sha256": digest,
+                "size": stats[key].st_size,
+                "mtime_ns": stats[key].st_mtime_ns,
+                "generators": {**generators, **versions},
+            }
+            if imports:
+                # Relative to the source directory, like the model keys.
+                root = source_root.resolve()
+                entries[key]["imports"] = {
+                    Path(os.path.relpath(path, root)).as_posix(): file_digest
+                    for path, file_digest in imports.items()
+                }
+            report.generated.append(key)
+
+    if entries != manifest:
+        _write_manifest(output_root, entries)
+    report.seconds = time.perf_counter() - started
+    return report
@@ -4,9 +4,18 @@ JSON generator for IoTFlow DSL models.
 This module transforms validated IoTFlow DSL models into structured JSON representation.
 """
 
+import io
 import json
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, Iterator, List, Any, TextIO, Tuple
+
+# Bumped whenever the generated JSON changes, so batch builds regenerate it.
+JSON_GENERATOR_VERSION = 1
+
+# Top-level sections of the pretty document, in output order. In compact
+# output each line carries its section's singular name under "kind".
+SECTIONS = ("sensors", "actuators", "rules")
+KINDS = {"sensors": "sensor", "actuators": "actuator", "rules": "rule"}
 
 
 def extract_properties(properties: List) -> Dict[str, str]:
@@ -31,127 +40,166 @@ def extract_properties(properties: List) -> Dict[str, str]:
     return result
 
 
-def generate_json(model, output_path: str) -> None:
+def extract_condition(condition) -> Dict[str, Any]:
     """
-    Generate JSON representation of an IoTFlow DSL model.
+    Convert a rule condition into its JSON representation.
     
     Args:
-        model: Parsed and validated IoTFlow model object
-        output_path: Path where the JSON file will be saved
+        condition: Condition object from a rule's when clause
+        
+    Returns:
+        Dictionary with sensor, attribute, operator and value keys, plus
+        aggregate/window and duration when the condition uses them. Compound
+        conditions become {"and": [...]}, {"or": [...]} or {"not": {...}}.
     """
-    # Initialize JSON structure
-    data = {
-        "sensors": [],
-        "actuators": [],
-        "rules": []
+    condition_type = condition.__class__.__name__
+    if condition_type == 'AndCondition':
+        return {"and": [extract_condition(op) for op in condition.operands]}
+    if condition_type == 'OrCondition':
+        return {"or": [extract_condition(op) for op in condition.operands]}
+    if condition_type == 'NotCondition':
+        inner = extract_condition(condition.operand)
+        return {"not": inner} if condition.negated else inner
+    
+    result = {
+        "sensor": condition.sensor_ref.sensor_name,
+        "attribute": "value",  # Currently fixed in grammar
+        "operator": condition.operator.value if hasattr(condition.operator, 'value') else condition.operator,
+        "value": condition.value
     }
     
-    # Process all elements in the model
-    for element in model.elements:
-        element_type = element.__class__.__name__
+    if getattr(condition, 'aggregate', None):
+        result["aggregate"] = condition.aggregate
+        result["window"] = condition.window
+    if getattr(condition, 'duration', 0):
+        result["duration"] = condition.duration
+    
+    return result
+
+
+def element_record(element) -> Tuple[str, Dict[str, Any]]:
+    """
+    Convert one model element into its JSON record.
+    
+    Args:
+        element: Sensor, Actuator or Rule from the model
         
-        if element_type == 'Sensor':
-            # Extract sensor properties
-            props = extract_properties(element.properties)
-            sensor_data = {
-                "name": element.name,
-                "type": props.get('type'),
-                "unit": props.get('unit')
-            }
-            data["sensors"].append(sensor_data)
-            
-        elif element_type == 'Actuator':
-            # Extract actuator properties
-            props = extract_properties(element.properties)
-            actuator_data = {
-                "name": element.name,
-                "type": props.get('type')
-            }
-            data["actuators"].append(actuator_data)
-            
-        elif element_type == 'Rule':
-            # Extract rule condition and action
-            condition = element.when_clause.condition
-            action = element.then_clause.action
-            
-            rule_data = {
-                "name": element.name,
-                "condition": {
-                    "sensor": condition.sensor_ref.sensor_name,
-                    "attribute": "value",  # Currently fixed in grammar
-                    "operator": condition.operator.value if hasattr(condition.operator, 'value') else condition.operator,
-                    "value": condition.value
-                },
-                "action": {
-                    "actuator": action.actuator_ref.actuator_name,
-                    "command": action.action_name
-                }
+    Returns:
+        Tuple of the section name ("sensors", "actuators" or "rules") and
+        the element's dictionary, or (None, None) for other elements
+    """
+    element_type = element.__class__.__name__
+    
+    if element_type == 'Sensor':
+        props = extract_properties(element.properties)
+        return "sensors", {
+            "name": element.name,
+            "type": props.get('type'),
+            "unit": props.get('unit')
+        }
+    
+    if element_type == 'Actuator':
+        props = extract_properties(element.properties)
+        return "actuators", {
+            "name": element.name,
+            "type": props.get('type')
+        }
+    
+    if element_type == 'Rule':
+        action = element.then_clause.action
+        return "rules", {
+            "name": element.name,
+            "condition": extract_condition(element.when_clause.condition),
+            "action": {
+                "actuator": action.actuator_ref.actuator_name,
+                "command": action.action_name
             }
-            data["rules"].append(rule_data)
+        }
     
+    return None, None
+
+
+def iter_section(model, section: str) -> Iterator[Dict[str, Any]]:
+    """
+    Yield the records of one section, one element at a time.
+    
+    Args:
+        model: Parsed and validated IoTFlow model object
+        section: One of SECTIONS
+        
+    Returns:
+        Iterator over the section's element dictionaries, in model order
+    """
+    for element in model.elements:
+        name, record = element_record(element)
+        if name == section:
+            yield record
+
+
+def write_json(model, out: TextIO, compact: bool = False) -> None:
+    """
+    Write the JSON representation of a model to a file-like object.
+    
+    Elements are converted and written one at a time, so memory use does
+    not grow with the size of the model.
+    
+    Args:
+        model: Parsed and validated IoTFlow model object
+        out: Text stream to write to
+        compact: Write NDJSON, one element per line with a "kind" key,
+            instead of the indented document
+    """
+    if compact:
+        for section in SECTIONS:
+            kind = KINDS[section]
+            for record in iter_section(model, section):
+                out.write(json.dumps({"kind": kind, **record}, ensure_ascii=False, separators=(",", ":")))
+                out.write("\n")
+        return
+    
+    # Same layout as json.dump(data, indent=4) of the whole document.
+    out.write("{")
+    for i, section in enumerate(SECTIONS):
+        out.write(',\n    "' if i else '\n    "')
+        out.write(section + '": [')
+        empty = True
+        for record in iter_section(model, section):
+            text = json.dumps(record, indent=4, ensure_ascii=False)
+            out.write("\n        " if empty else ",\n        ")
+            out.write(text.replace("\n", "\n        "))
+            empty = False
+        out.write("]" if empty else "\n    ]")
+    out.write("\n}")
+
+
+def generate_json(model, output_path: str, compact: bool = False) -> None:
+    """
+    Generate JSON representation of an IoTFlow DSL model.
+    
+    Args:
+        model: Parsed and validated IoTFlow model object
+        output_path: Path where the JSON file will be saved
+        compact: Write NDJSON, one element per line, instead of indented JSON
+    """
     # Ensure output directory exists
     output_path = Path(output_path)
     output_path.parent.mkdir(parents=True, exist_ok=True)
     
-    # Write JSON to file
     with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=4, ensure_ascii=False)
+        write_json(model, f, compact)
 
 
-def model_to_json_string(model) -> str:
+def model_to_json_string(model, compact: bool = False) -> str:
     """
     Convert IoTFlow model to JSON string (for in-memory use).
     
     Args:
         model: Parsed and validated IoTFlow model object
+        compact: Return NDJSON, one element per line, instead of indented JSON
         
     Returns:
         JSON string representation of the model
     """
-    # Initialize JSON structure
-    data = {
-        "sensors": [],
-        "actuators": [],
-        "rules": []
-    }
-    
-    # Process all elements in the model
-    for element in model.elements:
-        element_type = element.__class__.__name__
-        
-        if element_type == 'Sensor':
-            props = extract_properties(element.properties)
-            sensor_data = {
-                "name": element.name,
-                "type": props.get('type'),
-                "unit": props.get('unit')
-            }
-            data["sensors"].append(sensor_data)
-            
-        elif element_type == 'Actuator':
-            props = extract_properties(element.properties)
-            actuator_data = {
-                "name": element.name,
-                "type": props.get('type')
-            }
-            data["actuators"].append(actuator_data)
-            
-        elif element_type == 'Rule':
-            condition = element.when_clause.condition
-            action = element.then_clause.action
-            rule_data = {
-                "name": element.name,
-                "condition": {
-                    "sensor": condition.sensor_ref.sensor_name,
-                    "attribute": "value",
-                    "operator": condition.operator.value if hasattr(condition.operator, 'value') else condition.operator,
-                    "value": condition.value
-                },
-                "action": {
-                    "actuator": action.actuator_ref.actuator_name,
-                    "command": action.action_name
-                }
-            }
-            data["rules"].append(rule_data)
-    
-    return json.dumps(data, indent=4, ensure_ascii=False)
\ No newline at end of file
+    buffer = io.StringIO()
+    write_json(model, buffer, compact)
+    return buffer.getvalue()
@@ -3,6 +3,8 @@ textX CLI generator for IoTFlow DSL to JSON conversion.
 
 This module provides a textX generator that can be invoked using:
     textx generate model.iot --target json
+
+Pass ``--compact true`` to write NDJSON (one element per line) instead.
 """
 
 from textx import generator
@@ -11,7 +13,7 @@ from .json_generator import generate_json
 
 
 @generator('iotflow', 'json')
-def json_generator_cli(metamodel, model, output_path, overwrite, debug=False):
+def json_generator_cli(metamodel, model, output_path, overwrite, debug=False, **custom_args):
     """
     textX CLI generator for converting IoTFlow models to JSON.
     
@@ -21,7 +23,11 @@ def json_generator_cli(metamodel, model, output_path, overwrite, debug=False):
         output_path: Path where generated files should be placed
         overwrite: Whether to overwrite existing files
         debug: Debug mode flag
+        custom_args: Extra CLI arguments; ``compact`` selects NDJSON output
     """
+    # textX passes extra CLI arguments through as strings
+    compact = str(custom_args.get('compact', False)).lower() in ('1', 'true', 'yes')
+    
     # Create output file path
     if output_path:
         output_dir = Path(output_path)
@@ -43,7 +49,7 @@ def json_generator_cli(metamodel, model, output_path, overwrite, debug=False):
         model_file = Path("model.iot")
     
     # Create JSON filename
-    json_filename = model_file.stem + ".json"
+    json_filename = model_file.stem + (".ndjson" if compact else ".json")
     output_file = output_dir / json_filename
     
     # Check overwrite protection
@@ -56,7 +62,7 @@ def json_generator_cli(metamodel, model, output_path, overwrite, debug=False):
         print(f"Input model: {model_file}")
         print(f"Output file: {output_file}")
     
-    generate_json(model, str(output_file))
+    generate_json(model, str(output_file), compact=compact)
     
     if debug:
         print(f"JSON generated successfully: {output_file}")
\ No newline at end of file
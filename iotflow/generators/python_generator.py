@@ -0,0 +1,306 @@
+"""
+Python rule-engine generator for IoTFlow DSL models.
+
+This module compiles a validated IoTFlow model into a self-contained Python
+module for edge devices: a fixed sensor slot layout, the model's rules as
+straight-line evaluation code and an `evaluate(readings) -> actions` API.
+The generated module needs neither iotflow nor textX at runtime and gives
+the same results as the built-in compiled engine.
+"""
+
+import io
+from pathlib import Path
+from typing import Dict, List, TextIO, Tuple
+
+from iotflow.model import AndCondition, Condition, NotCondition, OrCondition, Rule, Sensor
+
+# Bumped whenever the generated module changes, so batch builds regenerate it.
+PYTHON_GENERATOR_VERSION = 1
+
+# Ring buffer used for windowed conditions. It repeats the arithmetic of
+# iotflow.runtime.windows.SensorWindow so aggregates match it bit for bit.
+WINDOW_CLASS = '''
+class _Window:
+    __slots__ = ("size", "ring", "head", "count", "pushed", "total", "low", "high")
+
+    def __init__(self, size):
+        self.size = size
+        self.ring = [0.0] * size
+        self.head = 0
+        self.count = 0
+        self.pushed = 0
+        self.total = 0.0
+        self.low = deque()
+        self.high = deque()
+
+    def push(self, value):
+        pos = self.pushed
+        if self.count == self.size:
+            self.total -= self.ring[self.head]
+        else:
+            self.count += 1
+        self.ring[self.head] = value
+        self.head = (self.head + 1) % self.size
+        self.total += value
+        self.pushed += 1
+        if self.head == 0:
+            self.total = sum(self.ring[:self.count])
+        oldest = pos - self.size + 1
+        while self.low and self.low[-1][1] >= value:
+            self.low.pop()
+        self.low.append((pos, value))
+        while self.low[0][0] < oldest:
+            self.low.popleft()
+        while self.high and self.high[-1][1] <= value:
+            self.high.pop()
+        self.high.append((pos, value))
+        while self.high[0][0] < oldest:
+            self.high.popleft()
+
+    def avg(self):
+        return self.total / self.count if self.count else None
+
+    def min(self):
+        return self.low[0][1] if self.count else None
+
+    def max(self):
+        return self.high[0][1] if self.count else None
+
+    def delta(self):
+        if not self.count:
+            return None
+        return self.ring[self.head - 1] - self.ring[self.head if self.count == self.size else 0]
+'''
+
+MODULE_API = '''
+
+_engine = RuleEngine()
+
+
+def evaluate(readings):
+    """Evaluate one cycle on the module's shared engine; see RuleEngine.evaluate."""
+    return _engine.evaluate(readings)
+
+
+def reset():
+    """Forget window contents and streaks of the shared engine."""
+    _engine.reset()
+
+
+if __name__ == "__main__":
+    # One JSON object of readings per input line, the fired actions per output line.
+    import json
+    import sys
+
+    for line in sys.stdin:
+        if line.strip():
+            print(json.dumps(evaluate(json.loads(line))), flush=True)
+'''
+
+
+class _RuleCompiler:
+    """
+    Turns rule conditions into straight-line statements.
+
+    Every distinct comparison becomes one local, computed once per cycle no
+    matter how many rules use it; windows shared by several conditions are
+    pushed once. Rule results are expressions over those locals.
+    """
+
+    def __init__(self, sensors: List[str]) -> None:
+        self.slots = {name: i for i, name in enumerate(sensors)}
+        self.used_slots: Dict[int, None] = {}
+        self.windows: Dict[Tuple[str, int], int] = {}
+        self.aggregates: Dict[Tuple[str, int, str], str] = {}
+        self.streaks: List[str] = []
+        self.statements: List[str] = []
+        self._terms: Dict[tuple, str] = {}
+
+    def _reading(self, sensor_name: str) -> str:
+        slot = self.slots[sensor_name]
+        self.used_slots[slot] = None
+        return f"v{slot}"
+
+    def _aggregate(self, condition: Condition) -> str:
+        sensor_name = condition.sensor_ref.sensor_name
+        window_key = (sensor_name, condition.window)
+        if window_key not in self.windows:
+            self._reading(sensor_name)
+            self.windows[window_key] = len(self.windows)
+        key = (sensor_name, condition.window, condition.aggregate)
+        if key not in self.aggregates:
+            self.aggregates[key] = f"a{len(self.aggregates)}"
+        return self.aggregates[key]
+
+    def _term(self, condition: Condition) -> str:
+        operator = condition.operator.value if hasattr(condition.operator, 'value') else condition.operator
+        key = (
+            condition.sensor_ref.sensor_name, operator, condition.value,
+            condition.aggregate, condition.window, condition.duration,
+        )
+        if key in self._terms:
+            return self._terms[key]
+        name = f"t{len(self._terms)}"
+        self._terms[key] = name
+        if condition.aggregate:
+            source = self._aggregate(condition)
+        else:
+            source = self._reading(condition.sensor_ref.sensor_name)
+        met = f"{source} is not None and {source} {operator} {condition.value!r}"
+        if condition.duration:
+            streak = f"self._s{len(self.streaks)}"
+            self.streaks.append(streak)
+            self.statements.append(f"{streak} = {streak} + 1 if {met} else 0")
+            self.statements.append(f"{name} = {streak} >= {condition.duration}")
+        else:
+            self.statements.append(f"{name} = {met}")
+        return name
+
+    def expression(self, condition) -> str:
+        """
+        Python expression for a condition, over the locals it needs.
+
+        Args:
+            condition: Condition tree of a rule's when clause
+
+        Returns:
+            Expression string evaluating to the rule's fired flag
+        """
+        if isinstance(condition, Condition):
+            return self._term(condition)
+        if isinstance(condition, NotCondition):
+            inner = self.expression(condition.operand)
+            return f"not {inner}" if condition.negated else inner
+        if isinstance(condition, (AndCondition, OrCondition)):
+            joiner = " and " if isinstance(condition, AndCondition) else " or "
+            operands = [self.expression(op) for op in condition.operands]
+            if len(operands) == 1:
+                return operands[0]
+            return "(" + joiner.join(operands) + ")"
+        raise TypeError(f"Unsupported condition node {type(condition).__name__}")
+
+
+def _tuple(items: List[str]) -> str:
+    if not items:
+        return "()"
+    return "(\n" + "".join(f"    {item},\n" for item in items) + ")"
+
+
+def write_python(model, out: TextIO, model_name: str = "model") -> None:
+    """
+    Write the standalone rule-engine module for a model.
+
+    Args:
+        model: Parsed and validated IoTFlow model object
+        out: Text stream to write the module source to
+        model_name: Name of the model, used in the module docstring
+    """
+    sensors = [el.name for el in model.elements if isinstance(el, Sensor)]
+    rules = [el for el in model.elements if isinstance(el, Rule)]
+    actions = [
+        (rule.then_clause.action.actuator_ref.actuator_name, rule.then_clause.action.action_name)
+        for rule in rules
+    ]
+    compiler = _RuleCompiler(sensors)
+    results = [compiler.expression(rule.when_clause.condition) for rule in rules]
+
+    out.write(f'# Generated by iotflow from {model_name}; regenerate instead of editing.\n')
+    out.write(f'''"""
+Rule engine for the IoTFlow model {model_name!r}.
+
+RuleEngine.evaluate (or the module-level evaluate) takes one cycle of
+readings as a dict of sensor name to value and returns the (actuator,
+command) pairs of the rules that fired, in rule order. Call it once per
+cycle, in order: windowed and "for N cycles" conditions depend on earlier
+cycles. A sensor missing from the readings makes its comparisons false.
+"""
+''')
+    if compiler.windows:
+        out.write("\nfrom collections import deque\n")
+    out.write("\n# Slot layout: evaluate_slots takes readings in this order, None if missing.\n")
+    out.write(f"SENSORS = {_tuple([repr(s) for s in sensors])}\n\n")
+    out.write(f"RULES = {_tuple([repr(rule.name) for rule in rules])}\n\n")
+    out.write(f"ACTIONS = {_tuple([repr(action) for action in actions])}\n")
+    if compiler.windows:
+        out.write("\n" + WINDOW_CLASS)
+    out.write('''
+
+class RuleEngine:
+    """Evaluates the model's rules; holds window contents and streaks."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+''')
+    state = [
+        f"self._w{index} = _Window({size})  # {sensor_name}, {size} readings"
+        for (sensor_name, size), index in compiler.windows.items()
+    ]
+    state += [f"{streak} = 0" for streak in compiler.streaks]
+    for line in state or ["pass"]:
+        out.write(f"        {line}\n")
+
+    out.write('''
+    def evaluate_slots(self, values):
+        """Fired flag of every rule, given readings in SENSORS order."""
+''')
+    for slot in sorted(compiler.used_slots):
+        out.write(f"        v{slot} = values[{slot}]  # {sensors[slot]}\n")
+    for (sensor_name, size), index in compiler.windows.items():
+        slot = compiler.slots[sensor_name]
+        out.write(f"        if v{slot} is not None:\n            self._w{index}.push(v{slot})\n")
+    for (sensor_name, size, aggregate), name in compiler.aggregates.items():
+        out.write(f"        {name} = self._w{compiler.windows[(sensor_name, size)]}.{aggregate}()\n")
+    for statement in compiler.statements:
+        out.write(f"        {statement}\n")
+    if results:
+        out.write("        return [\n")
+        for rule, result in zip(rules, results):
+            out.write(f"            {result},  # {rule.name}\n")
+        out.write("        ]\n")
+    else:
+        out.write("        return []\n")
+
+    out.write('''
+    def fired(self, readings):
+        """Fired flag of every rule, in RULES order."""
+        return self.evaluate_slots([readings.get(name) for name in SENSORS])
+
+    def evaluate(self, readings):
+        """(actuator, command) pairs of the rules that fired this cycle."""
+        return [action for action, met in zip(ACTIONS, self.fired(readings)) if met]
+''')
+    out.write(MODULE_API)
+
+
+def generate_python(model, output_path: str, model_name: str = None) -> None:
+    """
+    Generate a standalone Python rule engine for an IoTFlow DSL model.
+
+    Args:
+        model: Parsed and validated IoTFlow model object
+        output_path: Path where the Python module will be saved
+        model_name: Name used in the module docstring (default: file stem)
+    """
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    with open(output_path, 'w', encoding='utf-8') as f:
+        write_python(model, f, model_name or output_path.stem)
+
+
+def model_to_python_string(model, model_name: str = "model") -> str:
+    """
+    Convert an IoTFlow model to standalone rule-engine source (for in-memory use).
+
+    Args:
+        model: Parsed and validated IoTFlow model object
+        model_name: Name used in the module docstring
+
+    Returns:
+        Python source of the generated module
+    """
+    buffer = io.StringIO()
+    write_python(model, buffer, model_name)
+    return buffer.getvalue()
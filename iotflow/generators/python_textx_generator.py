@@ -0,0 +1,47 @@
+"""
+textX CLI generator for IoTFlow DSL to a standalone Python rule engine.
+
+This module provides a textX generator that can be invoked using:
+    textx generate model.iot --target python
+
+The generated <model>_rules.py runs without iotflow or textX installed.
+"""
+
+from textx import generator
+from pathlib import Path
+from .python_generator import generate_python
+
+
+@generator('iotflow', 'python')
+def python_generator_cli(metamodel, model, output_path, overwrite, debug=False, **custom_args):
+    """
+    textX CLI generator for compiling IoTFlow models to a Python rule engine.
+    
+    Args:
+        metamodel: The metamodel used to parse the model
+        model: The parsed IoTFlow model object
+        output_path: Path where generated files should be placed
+        overwrite: Whether to overwrite existing files
+        debug: Debug mode flag
+        custom_args: Extra CLI arguments (unused)
+    """
+    if hasattr(model, '_tx_filename') and model._tx_filename:
+        model_file = Path(model._tx_filename)
+    else:
+        model_file = Path("model.iot")
+    output_dir = Path(output_path) if output_path else model_file.parent
+    output_file = output_dir / (model_file.stem + "_rules.py")
+    
+    # Check overwrite protection
+    if output_file.exists() and not overwrite:
+        raise Exception(f"Output file {output_file} already exists. Use --overwrite to replace it.")
+    
+    if debug:
+        print(f"Generating Python rule engine for IoTFlow model...")
+        print(f"Input model: {model_file}")
+        print(f"Output file: {output_file}")
+    
+    generate_python(model, str(output_file), model_name=model_file.name)
+    
+    if debug:
+        print(f"Python rule engine generated successfully: {output_file}")
@@ -2,14 +2,16 @@ from .base import TxNode
 from .devices import Sensor, Actuator, TypeProperty, UnitProperty
 from .rules import (
     Rule, WhenClause, ThenClause, Condition,
+    OrCondition, AndCondition, NotCondition, iter_conditions,
     SensorRef, Action, ActuatorRef, ComparisonOp,
 )
-from .core import Model
+from .core import Import, Model, iter_imported_devices
 
 __all__ = [
     "TxNode",
     "Sensor", "Actuator", "TypeProperty", "UnitProperty",
     "Rule", "WhenClause", "ThenClause", "Condition",
+    "OrCondition", "AndCondition", "NotCondition", "iter_conditions",
     "SensorRef", "Action", "ActuatorRef", "ComparisonOp",
-    "Model",
+    "Import", "Model", "iter_imported_devices",
 ]
@@ -1,8 +1,40 @@
 from dataclasses import dataclass, field
+from typing import Iterator, Optional, Tuple
 
 from iotflow.model.base import TxNode
 
 
+@dataclass
+class Import(TxNode):
+    path: str = ""
+    # Resolved path of the file and its module, shared by every model
+    # importing the same file; set when the import is resolved.
+    file: Optional[str] = field(default=None, repr=False, compare=False)
+    module: Optional["Model"] = field(default=None, repr=False, compare=False)
+
+
 @dataclass
 class Model(TxNode):
+    imports: list = field(default_factory=list)
     elements: list = field(default_factory=list)
+
+
+def iter_imported_devices(model: Model) -> Iterator[Tuple[Import, object]]:
+    """
+    Yield (import, device) for every sensor and actuator a model imports.
+
+    Imports are followed transitively, depth first in source order. A device
+    reached through several imports of the same file is yielded once.
+    """
+    seen = set()
+    stack = list(reversed(model.imports))
+    while stack:
+        imp = stack.pop()
+        module = imp.module
+        if module is None or id(module) in seen:
+            continue
+        seen.add(id(module))
+        for element in module.elements:
+            if element.__class__.__name__ in ('Sensor', 'Actuator'):
+                yield imp, element
+        stack.extend(reversed(module.imports))
@@ -1,6 +1,6 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
-from typing import Optional
+from typing import Iterator, Optional
 
 from iotflow.model.base import TxNode
 
@@ -29,6 +29,38 @@ class Condition(TxNode):
     sensor_ref: Optional[SensorRef] = None
     operator: str = ""
     value: float = 0.0
+    # Windowed aggregate (avg/max/min/delta) over the last `window` readings.
+    aggregate: Optional[str] = None
+    window: int = 0
+    # Number of consecutive cycles the comparison must hold ("for N cycles").
+    duration: int = 0
+
+
+@dataclass
+class OrCondition(TxNode):
+    operands: list = field(default_factory=list)
+
+
+@dataclass
+class AndCondition(TxNode):
+    operands: list = field(default_factory=list)
+
+
+@dataclass
+class NotCondition(TxNode):
+    negated: bool = False
+    operand: Optional[object] = None
+
+
+def iter_conditions(node) -> Iterator[Condition]:
+    """Yield the leaf comparisons of a (possibly compound) condition in order."""
+    if isinstance(node, Condition):
+        yield node
+    elif isinstance(node, (OrCondition, AndCondition)):
+        for operand in node.operands:
+            yield from iter_conditions(operand)
+    elif isinstance(node, NotCondition):
+        yield from iter_conditions(node.operand)
 
 
 @dataclass
@@ -0,0 +1,224 @@
+"""
+Imported device catalogs for IoTFlow DSL models.
+
+`import "catalog.iot"` makes the sensors and actuators of another file
+usable in a model; the path is relative to the importing file. Imported
+files are modules: they may define sensors, actuators and imports of their
+own, but no rules. A module is parsed and validated once per process and
+the same object is shared by every model importing it. When a cache
+directory is configured (IOTFLOW_CACHE_DIR), parsed modules are also stored
+there, keyed by path and content, so later processes skip parsing them.
+
+After validation a model links the imported devices its rules reference
+into its own elements, so the runtime and generators see one flat model.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .. import __version__
+from ..generators.json_generator import KINDS, element_record
+from ..model import Import, Model, iter_conditions, iter_imported_devices
+from ..validators import MODEL_VALIDATORS, ModelValidationError
+from .json_loader import build_element
+
+CACHE_DIR_ENV = "IOTFLOW_CACHE_DIR"
+# Bumped whenever the on-disk module format changes.
+MODULE_CACHE_VERSION = 1
+
+
+@dataclass
+class _Module:
+    # (size, mtime_ns) of the file when it was loaded.
+    stat: Tuple[int, int]
+    model: Model
+
+
+class ModuleCache:
+    """
+    Imported modules of one process, by resolved path.
+
+    A cached module is reused while its file and every file it imports are
+    unchanged (same size and modification time).
+    """
+
+    def __init__(self, cache_dir=None) -> None:
+        # None reads IOTFLOW_CACHE_DIR on each parse; unset means memory only.
+        self.cache_dir = cache_dir
+        self._modules: Dict[Path, _Module] = {}
+        self._loading: List[Path] = []
+        self._lock = threading.RLock()
+        self.parsed = 0
+        self.from_disk = 0
+
+    def clear(self) -> None:
+        with self._lock:
+            self._modules.clear()
+
+    def load(self, path, metamodel) -> Model:
+        """
+        Imported module at a path, parsing it only if it changed.
+
+        Args:
+            path: Path of the imported file
+            metamodel: IoTFlow metamodel to parse it with
+
+        Returns:
+            The module's validated model
+
+        Raises:
+            ModelValidationError: If the file is missing, defines rules or
+                imports itself through a cycle
+        """
+        path = Path(path).resolve()
+        with self._lock:
+            if path in self._loading:
+                cycle = self._loading[self._loading.index(path):] + [path]
+                raise ModelValidationError(f"Import cycle: {' -> '.join(str(p) for p in cycle)}")
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                raise ModelValidationError(f"Imported file not found: {path}") from None
+            key = (st.st_size, st.st_mtime_ns)
+            cached = self._modules.get(path)
+            if cached is not None and cached.stat == key and self.current(cached.model, metamodel):
+                return cached.model
+
+            self._loading.append(path)
+            try:
+                model = self._read(path, metamodel)
+            finally:
+                self._loading.pop()
+            self._modules[path] = _Module(key, model)
+            return model
+
+    def current(self, model: Model, metamodel) -> bool:
+        """Whether the modules a model imports are still those on disk."""
+        return all(imp.module is self.load(imp.file, metamodel) for imp in model.imports)
+
+    def _cache_dir(self) -> Optional[Path]:
+        directory = self.cache_dir if self.cache_dir is not None else os.environ.get(CACHE_DIR_ENV)
+        return Path(directory) if directory else None
+
+    def _read(self, path: Path, metamodel) -> Model:
+        data = path.read_bytes()
+        cache_dir = self._cache_dir()
+        cache_file = None
+        if cache_dir is not None:
+            digest = hashlib.sha256(f"{path}\0".encode("utf-8") + data).hexdigest()
+            cache_file = cache_dir / f"{digest}.json"
+            model = self._read_cached(cache_file, path.parent, metamodel)
+            if model is not None:
+                self.from_disk += 1
+                return model
+
+        model = metamodel.model_from_str(data.decode("utf-8"), file_name=str(path))
+        self.parsed += 1
+        rules = [element.name for element in model.elements if element.__class__.__name__ == 'Rule']
+        if rules:
+            raise ModelValidationError(
+                f"Imported file {path} defines rules {rules}; "
+                f"only sensors, actuators and imports can be imported."
+            )
+        if cache_file is not None:
+            _write_cached(cache_file, model)
+        return model
+
+    def _read_cached(self, cache_file: Path, base: Path, metamodel) -> Optional[Model]:
+        try:
+            entry = json.loads(cache_file.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if not isinstance(entry, dict) or entry.get("version") != _cache_version():
+            return None
+        model = Model()
+        for import_path in entry["imports"]:
+            imp = Import(parent=model, path=import_path)
+            imp.file = str((base / import_path).resolve())
+            imp.module = self.load(imp.file, metamodel)
+            model.imports.append(imp)
+        model.elements = [build_element(kind, record, model) for kind, record in entry["elements"]]
+        # The module itself was validated when cached; its imports may have changed since.
+        for validator in MODEL_VALIDATORS:
+            validator(model, metamodel)
+        return model
+
+
+def _cache_version() -> str:
+    return f"{__version__}/{MODULE_CACHE_VERSION}"
+
+
+def _write_cached(cache_file: Path, model: Model) -> None:
+    records = []
+    for element in model.elements:
+        section, record = element_record(element)
+        records.append([KINDS[section], record])
+    entry = {
+        "version": _cache_version(),
+        "imports": [imp.path for imp in model.imports],
+        "elements": records,
+    }
+    tmp = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp.write_text(json.dumps(entry), encoding="utf-8")
+        os.replace(tmp, cache_file)
+    except OSError:
+        # The disk cache only saves time; a read-only cache directory is not an error.
+        pass
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+
+# Modules of this process, shared by every metamodel.
+MODULES = ModuleCache()
+
+
+def resolve_imports(model: Model, metamodel) -> None:
+    """
+    Load the modules a model imports, relative to the model's file (or the
+    working directory for models parsed from a string).
+    """
+    file_name = getattr(model, '_tx_filename', None)
+    base = Path(file_name).parent if file_name else Path.cwd()
+    for imp in model.imports:
+        imp.file = str((base / imp.path).resolve())
+        imp.module = MODULES.load(imp.file, metamodel)
+
+
+def link_imports(model: Model, _) -> None:
+    """Add the imported devices the model's rules reference to its elements."""
+    if not model.imports:
+        return
+    referenced = set()
+    for element in model.elements:
+        if element.__class__.__name__ == 'Rule':
+            for condition in iter_conditions(element.when_clause.condition):
+                referenced.add(condition.sensor_ref.sensor_name)
+            referenced.add(element.then_clause.action.actuator_ref.actuator_name)
+    present = {id(element) for element in model.elements}
+    linked = [
+        device for _, device in iter_imported_devices(model)
+        if device.name in referenced and id(device) not in present
+    ]
+    model.elements = linked + model.elements
+
+
+def imported_files(model: Model) -> Iterator[str]:
+    """Resolved paths of every file a model imports, directly or not."""
+    seen = set()
+    stack = list(reversed(model.imports))
+    while stack:
+        imp = stack.pop()
+        if imp.file in seen:
+            continue
+        seen.add(imp.file)
+        yield imp.file
+        if imp.module is not None:
+            stack.extend(reversed(imp.module.imports))
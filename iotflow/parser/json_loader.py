@@ -0,0 +1,246 @@
+"""
+JSON loader for IoTFlow DSL models.
+
+Builds the model object graph from the JSON written by the JSON generator,
+either the indented document or compact NDJSON, and runs the same semantic
+validators as the textX parser. Neither this module nor the runtime needs
+textX, so a gateway can run rules from generated JSON alone.
+"""
+
+import json
+import re
+from itertools import chain
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Tuple
+
+from iotflow.model import (
+    Model, Sensor, Actuator, TypeProperty, UnitProperty,
+    Rule, WhenClause, ThenClause, Condition,
+    OrCondition, AndCondition, NotCondition,
+    SensorRef, Action, ActuatorRef, ComparisonOp,
+)
+from iotflow.validators import MODEL_VALIDATORS, ModelValidationError
+from iotflow.validators.rule_validator import VALID_SENSOR_ATTRIBUTES
+
+# Section of the indented document holding each kind of compact record.
+SECTION_KINDS = {"sensors": "sensor", "actuators": "actuator", "rules": "rule"}
+
+# textX's ID rule; the grammar checks these for parsed models.
+_ID = re.compile(r"[^\d\W]\w*\Z")
+
+
+def _field(record: Dict[str, Any], key: str, kind: str) -> Any:
+    if not isinstance(record, dict) or key not in record:
+        raise ModelValidationError(f"Malformed {kind} record {record!r}: missing '{key}'")
+    return record[key]
+
+
+def _identifier(record: Dict[str, Any], key: str, kind: str) -> str:
+    value = _field(record, key, kind)
+    if not isinstance(value, str) or not _ID.match(value):
+        raise ModelValidationError(f"Malformed {kind} record {record!r}: '{key}' must be an identifier")
+    return value
+
+
+def _count(record: Dict[str, Any], key: str) -> int:
+    # Absent counts are 0, as for parsed models without the clause.
+    if key not in record:
+        return 0
+    value = record[key]
+    if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+        raise ModelValidationError(f"Malformed condition {record!r}: '{key}' must be a whole number of at least 1")
+    return value
+
+
+def _number(record: Dict[str, Any], key: str) -> float:
+    value = _field(record, key, "condition")
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ModelValidationError(f"Malformed condition {record!r}: '{key}' must be a number")
+    return value
+
+
+def _properties(record: Dict[str, Any], parent, kind: str) -> list:
+    properties = []
+    if record.get("type") is not None:
+        properties.append(TypeProperty(parent=parent, value=_identifier(record, "type", kind)))
+    if record.get("unit") is not None:
+        properties.append(UnitProperty(parent=parent, value=_identifier(record, "unit", kind)))
+    return properties
+
+
+def _operator(value):
+    # Unknown operators stay strings so the rule validator reports them.
+    try:
+        return ComparisonOp(value)
+    except ValueError:
+        return value
+
+
+def build_condition(data: Dict[str, Any], parent):
+    """
+    Build a condition tree from its JSON representation.
+
+    Args:
+        data: Condition dictionary as written by `extract_condition`
+        parent: Model object the condition belongs to
+
+    Returns:
+        Condition, AndCondition, OrCondition or NotCondition
+    """
+    if isinstance(data, dict) and ("and" in data or "or" in data):
+        node = AndCondition(parent=parent) if "and" in data else OrCondition(parent=parent)
+        operands = data.get("and", data.get("or"))
+        if not isinstance(operands, list) or not operands:
+            raise ModelValidationError(f"Malformed condition {data!r}: operands must be a non-empty list")
+        node.operands = [build_condition(op, node) for op in operands]
+        return node
+    if isinstance(data, dict) and "not" in data:
+        node = NotCondition(parent=parent, negated=True)
+        node.operand = build_condition(data["not"], node)
+        return node
+
+    attribute = data.get("attribute", "value") if isinstance(data, dict) else None
+    if attribute not in VALID_SENSOR_ATTRIBUTES:
+        raise ModelValidationError(
+            f"Invalid sensor attribute '{attribute}' in condition {data!r}. "
+            f"Valid attributes: {sorted(VALID_SENSOR_ATTRIBUTES)}"
+        )
+    condition = Condition(
+        parent=parent,
+        operator=_operator(_field(data, "operator", "condition")),
+        value=_number(data, "value"),
+        aggregate=data.get("aggregate"),
+        window=_count(data, "window"),
+        duration=_count(data, "duration"),
+    )
+    condition.sensor_ref = SensorRef(parent=condition, sensor_name=_identifier(data, "sensor", "condition"))
+    return condition
+
+
+def build_element(kind: str, record: Dict[str, Any], model: Model):
+    """
+    Build one model element from its JSON record.
+
+    Args:
+        kind: "sensor", "actuator" or "rule"
+        record: Element dictionary as written by `element_record`
+        model: Model the element belongs to
+
+    Returns:
+        Sensor, Actuator or Rule object
+    """
+    name = _identifier(record, "name", kind)
+
+    if kind == "sensor":
+        sensor = Sensor(parent=model, name=name)
+        sensor.properties = _properties(record, sensor, kind)
+        return sensor
+
+    if kind == "actuator":
+        actuator = Actuator(parent=model, name=name)
+        actuator.properties = _properties(record, actuator, kind)
+        return actuator
+
+    if kind == "rule":
+        rule = Rule(parent=model, name=name)
+        rule.when_clause = WhenClause(parent=rule)
+        rule.when_clause.condition = build_condition(_field(record, "condition", kind), rule.when_clause)
+        action_record = _field(record, "action", kind)
+        rule.then_clause = ThenClause(parent=rule)
+        action = Action(parent=rule.then_clause, action_name=_identifier(action_record, "command", "action"))
+        action.actuator_ref = ActuatorRef(parent=action, actuator_name=_identifier(action_record, "actuator", "action"))
+        rule.then_clause.action = action
+        return rule
+
+    raise ModelValidationError(f"Unknown element kind '{kind}'. Expected one of {sorted(SECTION_KINDS.values())}")
+
+
+def build_model(records: Iterable[Tuple[str, Dict[str, Any]]], validate: bool = True) -> Model:
+    """
+    Build and validate a model from (kind, record) pairs.
+
+    Args:
+        records: Element records in model order
+        validate: Run the semantic validators on the finished model
+
+    Returns:
+        Model object equivalent to parsing the DSL source
+
+    Raises:
+        ModelValidationError: If a record is malformed or a validator fails
+    """
+    model = Model()
+    model.elements = [build_element(kind, record, model) for kind, record in records]
+    if validate:
+        for validator in MODEL_VALIDATORS:
+            validator(model, None)
+    return model
+
+
+def _document_records(data: Dict[str, Any]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    if not isinstance(data, dict):
+        raise ModelValidationError("Model JSON must be an object with sensors, actuators and rules")
+    for section, kind in SECTION_KINDS.items():
+        records = data.get(section, [])
+        if not isinstance(records, list):
+            raise ModelValidationError(f"Malformed model JSON: '{section}' must be a list of {kind} records")
+        for record in records:
+            yield kind, record
+
+
+def _compact_records(lines: Iterable[str]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    for line in lines:
+        if line.strip():
+            record = json.loads(line)
+            yield _field(record, "kind", "element"), record
+
+
+def _is_compact(first_line: str) -> bool:
+    # A compact file starts with a complete record; the indented document
+    # starts with a lone "{" and a minified one has no "kind" key.
+    try:
+        record = json.loads(first_line)
+    except ValueError:
+        return False
+    return isinstance(record, dict) and "kind" in record
+
+
+def load_json_str(text: str, validate: bool = True) -> Model:
+    """
+    Load a model from generated JSON or NDJSON text.
+
+    Args:
+        text: Output of `model_to_json_string`, in either mode
+        validate: Run the semantic validators on the loaded model
+
+    Returns:
+        Model object equivalent to parsing the DSL source
+    """
+    lines = text.splitlines()
+    first = next((line for line in lines if line.strip()), "")
+    if not first or _is_compact(first):
+        return build_model(_compact_records(lines), validate)
+    return build_model(_document_records(json.loads(text)), validate)
+
+
+def load_json_file(path: Path, validate: bool = True) -> Model:
+    """
+    Load a model from a file written by `generate_json`.
+
+    Compact files are read one line at a time.
+
+    Args:
+        path: Path to a .json or .ndjson model file
+        validate: Run the semantic validators on the loaded model
+
+    Returns:
+        Model object equivalent to parsing the DSL source
+    """
+    with open(path, encoding="utf-8") as f:
+        first = f.readline()
+        while first and not first.strip():
+            first = f.readline()
+        if not first or _is_compact(first):
+            return build_model(_compact_records(chain([first], f)), validate)
+        f.seek(0)
+        return build_model(_document_records(json.load(f)), validate)
@@ -1,17 +1,14 @@
 from pathlib import Path
 from textx import metamodel_from_file
 from iotflow.model import (
-    Model, Sensor, Actuator, TypeProperty, UnitProperty,
+    Model, Import, Sensor, Actuator, TypeProperty, UnitProperty,
     Rule, WhenClause, ThenClause, Condition,
+    OrCondition, AndCondition, NotCondition,
     SensorRef, Action, ActuatorRef,
 )
-from iotflow.parser.preprocessors import convert_operator_to_enum
-from iotflow.validators.device_reference_validator import validate_device_references
-from iotflow.validators.rule_validator import (
-    validate_rule_logic,
-    validate_duplicate_rule_names,
-    validate_conflicting_rules,
-)
+from iotflow.parser.imports import link_imports, resolve_imports
+from iotflow.parser.preprocessors import collapse_condition_trees, convert_operator_to_enum
+from iotflow.validators import MODEL_VALIDATORS, as_textx_processor
 
 HERE = Path(__file__).resolve().parent.parent
 GRAMMAR_PATH = HERE / "grammar" / "iotflow.tx"
@@ -20,16 +17,18 @@ GRAMMAR_PATH = HERE / "grammar" / "iotflow.tx"
 def build_metamodel():
     mm = metamodel_from_file(
         str(GRAMMAR_PATH),
-        classes=[Model,
+        classes=[Model, Import,
             Sensor, Actuator, TypeProperty, UnitProperty,
             Rule, WhenClause, ThenClause, Condition,
+            OrCondition, AndCondition, NotCondition,
             SensorRef, Action, ActuatorRef,
         ],
     )
+    mm.register_model_processor(collapse_condition_trees)
     mm.register_model_processor(convert_operator_to_enum)
-    mm.register_model_processor(validate_device_references)
-    mm.register_model_processor(validate_rule_logic)
-    mm.register_model_processor(validate_duplicate_rule_names)
-    mm.register_model_processor(validate_conflicting_rules)
+    mm.register_model_processor(as_textx_processor(resolve_imports))
+    for validator in MODEL_VALIDATORS:
+        mm.register_model_processor(as_textx_processor(validator))
+    mm.register_model_processor(link_imports)
 
     return mm
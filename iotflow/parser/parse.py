@@ -1,4 +1,5 @@
 from pathlib import Path
+from typing import Optional
 
 from .metamodel import build_metamodel
 from ..model import Model
@@ -13,10 +14,13 @@ def parse_file(path: Path) -> Model:
     return model
 
 
-def parse_str(text: str) -> Model:
+def parse_str(text: str, file_name: Optional[str] = None) -> Model:
     """
     Parses DSL string (used mainly in tests).
+
+    Imports resolve relative to `file_name` when the text was read from
+    that file, else relative to the working directory.
     """
     mm = build_metamodel()
-    model: Model = mm.model_from_str(text)
+    model: Model = mm.model_from_str(text, file_name=file_name)
     return model
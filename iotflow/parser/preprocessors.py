@@ -1,5 +1,35 @@
 from textx import get_children_of_type
-from iotflow.model import Condition, ComparisonOp
+from iotflow.model import (
+    Condition, ComparisonOp, WhenClause,
+    OrCondition, AndCondition, NotCondition,
+)
+
+
+def _collapse(node, parent):
+    if isinstance(node, (OrCondition, AndCondition)):
+        node.operands = [_collapse(op, node) for op in node.operands]
+        if len(node.operands) == 1:
+            return _collapse_parent(node.operands[0], parent)
+    elif isinstance(node, NotCondition):
+        node.operand = _collapse(node.operand, node)
+        if not node.negated:
+            return _collapse_parent(node.operand, parent)
+    node.parent = parent
+    return node
+
+
+def _collapse_parent(node, parent):
+    node.parent = parent
+    return node
+
+
+def collapse_condition_trees(model, _) -> None:
+    """
+    Drop the single-operand or/and wrappers and non-negated not wrappers the
+    grammar produces, so a plain comparison stays a bare `Condition`.
+    """
+    for clause in get_children_of_type(WhenClause, model):
+        clause.condition = _collapse(clause.condition, clause)
 
 
 def convert_operator_to_enum(model, _) -> None:
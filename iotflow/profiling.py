@@ -0,0 +1,189 @@
+"""
+CPU and memory profiling for IoTFlow CLI commands.
+
+Wraps a command in cProfile and/or tracemalloc and prints a short top-N
+summary suitable for attaching to bug reports. The CPU profile is written
+in pstats format, loadable by snakeviz or `python -m pstats`.
+"""
+
+import cProfile
+import pstats
+import sys
+import tracemalloc
+from collections import defaultdict
+from dataclasses import fields, is_dataclass
+from pathlib import Path
+from typing import Iterator, Optional
+
+DEFAULT_PROFILE_OUTPUT = "iotflow.prof"
+DEFAULT_TOP = 15
+
+# Frames kept per allocation so it can be traced back into iotflow code.
+TRACEBACK_DEPTH = 16
+
+PACKAGE_DIR = Path(__file__).resolve().parent
+
+
+def _short_path(filename: str) -> str:
+    path = Path(filename)
+    try:
+        return "iotflow/" + path.resolve().relative_to(PACKAGE_DIR).as_posix()
+    except (ValueError, OSError):
+        pass
+    parts = path.parts
+    if "site-packages" in parts:
+        return "/".join(parts[parts.index("site-packages") + 1:])
+    return path.name
+
+
+def _format_bytes(size: float) -> str:
+    for unit in ("B", "KiB", "MiB"):
+        if abs(size) < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
+
+def _model_objects(obj) -> Iterator[object]:
+    # Model classes are dataclasses whatever built them (textX or the JSON
+    # loader), so their fields give the containment tree. Imported modules
+    # are shared between models and not part of any one of them.
+    yield obj
+    for f in fields(obj):
+        if f.name in ("parent", "module"):
+            continue
+        value = getattr(obj, f.name)
+        for child in value if isinstance(value, list) else [value]:
+            if is_dataclass(child):
+                yield from _model_objects(child)
+
+
+def element_sizes(model) -> dict[str, tuple[int, int]]:
+    """
+    Shallow memory use of a parsed model, grouped by element type.
+
+    Args:
+        model: Parsed IoTFlow model
+
+    Returns:
+        dict: Class name -> (object count, bytes held by the objects and their
+        attribute dicts), largest first
+    """
+    groups: dict[str, list[int]] = defaultdict(lambda: [0, 0])
+    for obj in _model_objects(model):
+        size = sys.getsizeof(obj)
+        attrs = getattr(obj, "__dict__", None)
+        if attrs is not None:
+            size += sys.getsizeof(attrs)
+        group = groups[type(obj).__name__]
+        group[0] += 1
+        group[1] += size
+    return {
+        name: (count, size)
+        for name, (count, size) in sorted(groups.items(), key=lambda kv: -kv[1][1])
+    }
+
+
+def allocation_sites(snapshot: tracemalloc.Snapshot) -> dict[str, int]:
+    """
+    Live allocations grouped by the innermost iotflow module that made them.
+
+    Memory allocated on behalf of iotflow code (by textX, the standard
+    library or extensions) is charged to the iotflow frame that called
+    into them, so runtime structures such as the columnar store or the run
+    index show up under their own modules. Allocations with no iotflow
+    frame are grouped as "other".
+    """
+    groups: dict[str, int] = defaultdict(int)
+    for stat in snapshot.statistics("traceback"):
+        site = "other"
+        for frame in reversed(stat.traceback):
+            path = _short_path(frame.filename)
+            if path.startswith("iotflow/") and not path.endswith("profiling.py"):
+                site = path
+                break
+        groups[site] += stat.size
+    return dict(sorted(groups.items(), key=lambda kv: -kv[1]))
+
+
+class Profiler:
+    """
+    Context manager profiling the code run inside it.
+
+    With `cpu_output`, a cProfile is captured and dumped to that path on
+    exit. With `memory`, tracemalloc runs for the duration and a snapshot
+    is taken on exit. Objects passed to `watch` stay alive until then, so
+    their memory shows up in the snapshot; parsed models are also sized by
+    element type in the report.
+    """
+
+    def __init__(self, cpu_output=None, memory: bool = False, top: int = DEFAULT_TOP) -> None:
+        self.cpu_output = Path(cpu_output) if cpu_output else None
+        self.memory = memory
+        self.top = top
+        self.watched = []
+        self._profile: Optional[cProfile.Profile] = None
+        self.snapshot: Optional[tracemalloc.Snapshot] = None
+        self.peak = 0
+        self._started_tracing = False
+
+    @property
+    def enabled(self) -> bool:
+        return self.cpu_output is not None or self.memory
+
+    def watch(self, obj) -> None:
+        self.watched.append(obj)
+
+    def __enter__(self) -> "Profiler":
+        if self.memory:
+            self._started_tracing = not tracemalloc.is_tracing()
+            if self._started_tracing:
+                tracemalloc.start(TRACEBACK_DEPTH)
+            tracemalloc.reset_peak()
+        if self.cpu_output is not None:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self._profile is not None:
+            self._profile.disable()
+            self.cpu_output.parent.mkdir(parents=True, exist_ok=True)
+            self._profile.dump_stats(str(self.cpu_output))
+        if self.memory:
+            self.snapshot = tracemalloc.take_snapshot()
+            self.peak = tracemalloc.get_traced_memory()[1]
+            if self._started_tracing:
+                tracemalloc.stop()
+
+    def hot_paths(self) -> list[tuple[str, int, float, float]]:
+        """Top functions by cumulative time: (function, calls, own seconds, cumulative seconds)."""
+        if self._profile is None:
+            return []
+        stats = pstats.Stats(self._profile)
+        rows = []
+        for (filename, line, name), (_, calls, own, cumulative, _) in stats.stats.items():
+            if filename == "~" or _short_path(filename).endswith("profiling.py"):
+                continue
+            rows.append((f"{_short_path(filename)}:{line}({name})", calls, own, cumulative))
+        rows.sort(key=lambda row: -row[3])
+        return rows[:self.top]
+
+    def report(self, out=None) -> None:
+        out = out or sys.stdout
+        if self._profile is not None:
+            out.write(f"\nCPU profile written to {self.cpu_output} (open with snakeviz or python -m pstats)\n")
+            out.write(f"Top {self.top} functions by cumulative time:\n")
+            out.write(f"  {'calls':>9} {'own s':>9} {'cum s':>9}  function\n")
+            for function, calls, own, cumulative in self.hot_paths():
+                out.write(f"  {calls:>9} {own:>9.4f} {cumulative:>9.4f}  {function}\n")
+        if self.snapshot is not None:
+            total = sum(stat.size for stat in self.snapshot.statistics("filename"))
+            out.write(f"\nMemory: {_format_bytes(total)} live, {_format_bytes(self.peak)} peak\n")
+            for model in (obj for obj in self.watched if hasattr(obj, "elements")):
+                out.write("By model element type:\n")
+                for name, (count, size) in list(element_sizes(model).items())[:self.top]:
+                    out.write(f"  {name:<24} {count:>8} objects  {_format_bytes(size):>11}\n")
+            out.write("By allocation site:\n")
+            for site, size in list(allocation_sites(self.snapshot).items())[:self.top]:
+                out.write(f"  {site:<48} {_format_bytes(size):>11}\n")
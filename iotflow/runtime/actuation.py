@@ -0,0 +1,124 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from ..model import ComparisonOp
+from .columnar import RuleTable
+
+
+@dataclass
+class RulePolicy:
+    # Once fired, a rule stays active until its reading moves this far back
+    # across the threshold, so noise around the threshold is not a new edge.
+    hysteresis: float = 0.0
+    # Cycles during which a command from this rule cannot be overridden by a
+    # different command to the same actuator.
+    min_hold: int = 0
+
+
+def _within_band(operator: ComparisonOp, value: float, threshold: float, band: float) -> bool:
+    if operator == ComparisonOp.GT:
+        return value > threshold - band
+    if operator == ComparisonOp.GTE:
+        return value >= threshold - band
+    if operator == ComparisonOp.LT:
+        return value < threshold + band
+    if operator == ComparisonOp.LTE:
+        return value <= threshold + band
+    return False
+
+
+class EdgeTracker:
+    """
+    Tracks each actuator's last commanded action so that a sustained
+    condition emits its command once instead of on every cycle.
+
+    A fired rule emits when its condition has just become true or when its
+    action differs from the actuator's current state; otherwise the command
+    is suppressed. A different action is also suppressed while the current
+    one is inside its rule's minimum hold time.
+    """
+
+    def __init__(self, table: RuleTable, policies: Optional[dict[str, RulePolicy]] = None) -> None:
+        policies = policies or {}
+        unknown = set(policies) - set(table.rule_names)
+        if unknown:
+            raise ValueError(f"Policies given for unknown rules: {sorted(unknown)}")
+        compound = sorted(
+            name for name, operator in zip(table.rule_names, table.rule_operators)
+            if operator is None and policies.get(name, RulePolicy()).hysteresis
+        )
+        if compound:
+            raise ValueError(f"hysteresis needs a single-comparison rule: {compound}")
+        self.table = table
+        self._policies = [policies.get(name, RulePolicy()) for name in table.rule_names]
+        self._active = [False] * len(table)
+        self.actuator_names: list[str] = list(dict.fromkeys(table.rule_actuators))
+        actuator_pos = {name: i for i, name in enumerate(self.actuator_names)}
+        self._rule_actuator = [actuator_pos[a] for a in table.rule_actuators]
+        self.state: list[Optional[str]] = [None] * len(self.actuator_names)
+        self._hold_until = [0] * len(self.actuator_names)
+
+    def rebind(self, table: RuleTable) -> "EdgeTracker":
+        """
+        A tracker for a reloaded rule table that keeps each actuator's state
+        and hold time, and the activity and policy of every rule that is
+        still present.
+        """
+        names = set(table.rule_names)
+        policies = {
+            name: policy for name, policy in zip(self.table.rule_names, self._policies) if name in names
+        }
+        tracker = EdgeTracker(table, policies)
+        active = dict(zip(self.table.rule_names, self._active))
+        tracker._active = [active.get(name, False) for name in table.rule_names]
+        for pos, name in enumerate(self.actuator_names):
+            if name in tracker.actuator_names:
+                new_pos = tracker.actuator_names.index(name)
+                tracker.state[new_pos] = self.state[pos]
+                tracker._hold_until[new_pos] = self._hold_until[pos]
+        return tracker
+
+    def snapshot(self) -> dict:
+        return {"state": list(self.state), "hold_until": list(self._hold_until), "active": list(self._active)}
+
+    def restore(self, state: dict) -> None:
+        self.state = list(state["state"])
+        self._hold_until = list(state["hold_until"])
+        self._active = list(state["active"])
+
+    def actuator_state(self, actuator_name: str) -> Optional[str]:
+        if actuator_name not in self.actuator_names:
+            return None
+        return self.state[self.actuator_names.index(actuator_name)]
+
+    def _still_active(self, i: int, met: bool) -> bool:
+        if met or not self._active[i]:
+            return met
+        band = self._policies[i].hysteresis
+        if not band:
+            return False
+        value = self.table.value_of(i)
+        if value is None:
+            return False
+        return _within_band(self.table.rule_operators[i], value, self.table.rule_thresholds[i], band)
+
+    def step(self, cycle_number: int, readings: dict[str, float], fired: list[bool]) -> list[bool]:
+        """Returns, per rule, whether its fired command was suppressed."""
+        suppressed = [False] * len(fired)
+        for i, met in enumerate(fired):
+            rising = met and not self._active[i]
+            self._active[i] = self._still_active(i, met)
+            if not met:
+                continue
+            actuator = self._rule_actuator[i]
+            action = self.table.rule_actions[i]
+            current = self.state[actuator]
+            if current == action and not rising:
+                suppressed[i] = True
+            elif current not in (None, action) and cycle_number < self._hold_until[actuator]:
+                suppressed[i] = True
+            else:
+                if current != action:
+                    self._hold_until[actuator] = cycle_number + self._policies[i].min_hold
+                self.state[actuator] = action
+        return suppressed
@@ -0,0 +1,429 @@
+import math
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from decimal import Decimal, ROUND_CEILING, ROUND_FLOOR
+from fractions import Fraction
+from statistics import NormalDist
+from typing import Optional, TextIO
+
+from ..model import AndCondition, ComparisonOp, Condition, Model, NotCondition, OrCondition
+from .context import build_context
+from .evaluator import get_comparator
+from .sensor_sim import DEFAULT_RANGE, DEFAULT_RANGES, sensor_unit
+
+# Window sizes up to this use the exact Irwin-Hall distribution for averages,
+# larger ones its normal approximation.
+IRWIN_HALL_MAX = 200
+# Variables shared between operands that are conditioned on before falling
+# back to treating operands as independent.
+MAX_CONDITIONED = 16
+
+
+class _Distribution(ABC):
+    """Distribution of a reading (or window aggregate) through its CDF."""
+
+    @abstractmethod
+    def lt(self, t: float) -> float:
+        """P(X < t)."""
+
+    @abstractmethod
+    def le(self, t: float) -> float:
+        """P(X <= t)."""
+
+    def probability(self, operator: ComparisonOp, t: float) -> float:
+        if operator == ComparisonOp.GT:
+            return 1.0 - self.le(t)
+        if operator == ComparisonOp.GTE:
+            return 1.0 - self.lt(t)
+        if operator == ComparisonOp.LT:
+            return self.lt(t)
+        if operator == ComparisonOp.LTE:
+            return self.le(t)
+        equal = self.le(t) - self.lt(t)
+        return equal if operator == ComparisonOp.EQ else 1.0 - equal
+
+
+class _RoundedUniform(_Distribution):
+    """`round(uniform(lo, hi), 2)`: a reading k/100 covers u within 0.005 of it."""
+
+    def __init__(self, lo: float, hi: float) -> None:
+        self.lo = lo
+        self.hi = hi
+
+    def _at_most(self, k: int) -> float:
+        return min(max(((k + 0.5) / 100 - self.lo) / (self.hi - self.lo), 0.0), 1.0)
+
+    def lt(self, t: float) -> float:
+        return self._at_most(int((Decimal(repr(t)) * 100).to_integral_value(ROUND_CEILING)) - 1)
+
+    def le(self, t: float) -> float:
+        return self._at_most(int((Decimal(repr(t)) * 100).to_integral_value(ROUND_FLOOR)))
+
+
+class _Discrete(_Distribution):
+    def __init__(self, points: dict[float, float]) -> None:
+        self.points = points
+
+    def lt(self, t: float) -> float:
+        return sum(p for value, p in self.points.items() if value < t)
+
+    def le(self, t: float) -> float:
+        return sum(p for value, p in self.points.items() if value <= t)
+
+
+class _Continuous(_Distribution):
+    @abstractmethod
+    def cdf(self, t: float) -> float:
+        """P(X <= t), which is also P(X < t)."""
+
+    def lt(self, t: float) -> float:
+        return self.cdf(t)
+
+    def le(self, t: float) -> float:
+        return self.cdf(t)
+
+
+class _UniformMean(_Continuous):
+    """Mean of `n` uniform readings: a scaled Irwin-Hall distribution."""
+
+    def __init__(self, lo: float, hi: float, n: int) -> None:
+        self.lo = lo
+        self.hi = hi
+        self.n = n
+
+    def cdf(self, t: float) -> float:
+        n = self.n
+        x = n * (t - self.lo) / (self.hi - self.lo)
+        if x <= 0:
+            return 0.0
+        if x >= n:
+            return 1.0
+        if n > IRWIN_HALL_MAX:
+            return NormalDist(n / 2, math.sqrt(n / 12)).cdf(x)
+        # Exact rational arithmetic; the alternating sum cancels badly in floats.
+        x = Fraction(x)
+        total = sum(
+            (-1) ** k * math.comb(n, k) * (x - k) ** n for k in range(math.floor(x) + 1)
+        )
+        return float(total / math.factorial(n))
+
+
+class _UniformDifference(_Continuous):
+    """Difference of two independent uniform readings: triangular on ±(hi - lo)."""
+
+    def __init__(self, lo: float, hi: float) -> None:
+        self.width = hi - lo
+
+    def cdf(self, t: float) -> float:
+        w = self.width
+        if t <= -w:
+            return 0.0
+        if t >= w:
+            return 1.0
+        if t <= 0:
+            return (w + t) ** 2 / (2 * w * w)
+        return 1.0 - (w - t) ** 2 / (2 * w * w)
+
+
+class _Max(_Distribution):
+    def __init__(self, base: _Distribution, n: int) -> None:
+        self.base = base
+        self.n = n
+
+    def lt(self, t: float) -> float:
+        return self.base.lt(t) ** self.n
+
+    def le(self, t: float) -> float:
+        return self.base.le(t) ** self.n
+
+
+class _Min(_Max):
+    def lt(self, t: float) -> float:
+        return 1.0 - (1.0 - self.base.lt(t)) ** self.n
+
+    def le(self, t: float) -> float:
+        return 1.0 - (1.0 - self.base.le(t)) ** self.n
+
+
+def _discrete_mean(points: dict[float, float], n: int) -> dict[float, float]:
+    sums = {0.0: 1.0}
+    for _ in range(n):
+        step: dict[float, float] = {}
+        for total, p in sums.items():
+            for value, q in points.items():
+                step[total + value] = step.get(total + value, 0.0) + p * q
+        sums = step
+    return {total / n: p for total, p in sums.items()}
+
+
+def _discrete_difference(points: dict[float, float]) -> dict[float, float]:
+    diffs: dict[float, float] = {}
+    for a, p in points.items():
+        for b, q in points.items():
+            diffs[a - b] = diffs.get(a - b, 0.0) + p * q
+    return diffs
+
+
+@dataclass
+class _Leaf:
+    # ("sensor", name) for plain comparisons, which can be conditioned on the
+    # reading; ("term", signature) for windowed or streak terms.
+    var: tuple
+    sensor_name: str
+    operator: ComparisonOp
+    threshold: float
+    probability: float
+
+
+@dataclass
+class FiringProbability:
+    name: str
+    probability: float
+    exact: bool = True
+
+
+@dataclass
+class AnalyticResult:
+    rules: list[FiringProbability] = field(default_factory=list)
+    actuators: list[FiringProbability] = field(default_factory=list)
+
+    def render(self, out: TextIO) -> None:
+        out.write("Per-cycle firing probabilities (steady state)\n")
+        width = max((len(p.name) for p in self.rules + self.actuators), default=4)
+        for title, rows in (("Rules", self.rules), ("Actuators", self.actuators)):
+            out.write(f"\n{title}:\n")
+            for row in rows:
+                note = "" if row.exact else "  (approximate)"
+                out.write(f"  {row.name:<{width}}  {row.probability:.6f}{note}\n")
+
+
+class FiringAnalysis:
+    """
+    Closed-form per-cycle firing probabilities of a model's rules.
+
+    Simulated readings come from known distributions (see `sensor_sim`): a
+    uniform draw over the unit's range rounded to 0.01, or a fair 0/1 coin
+    for boolean sensors. `sensor_overrides` fix sensors to constant
+    readings, as in `run_simulation`.
+
+    Probabilities are for the steady state, once windows have filled.
+    Plain comparisons, "for N cycles" streaks and min/max windows are exact.
+    Window averages and deltas treat readings as continuous, ignoring the
+    0.01 rounding. Terms on different sensors are independent and combine
+    by product. Plain comparisons on the same sensor are handled exactly by
+    conditioning on which interval between thresholds the reading falls in.
+    A probability that needed any other approximation has `exact=False`.
+    """
+
+    def __init__(self, model: Model, sensor_overrides: Optional[dict[str, float]] = None) -> None:
+        ctx = build_context(model)
+        overrides = sensor_overrides or {}
+        self.distributions: dict[str, _Distribution] = {}
+        for name, sensor in ctx.sensors.items():
+            unit = sensor_unit(sensor)
+            if name in overrides:
+                self.distributions[name] = _Discrete({float(overrides[name]): 1.0})
+            elif unit == "boolean":
+                self.distributions[name] = _Discrete({0.0: 0.5, 1.0: 0.5})
+            else:
+                self.distributions[name] = _RoundedUniform(*DEFAULT_RANGES.get(unit, DEFAULT_RANGE))
+        self.rules = {rule.name: rule for rule in ctx.rules}
+        self._exact = True
+
+    # -- building expressions ------------------------------------------------
+
+    def _aggregate(self, condition: Condition) -> _Distribution:
+        base = self.distributions[condition.sensor_ref.sensor_name]
+        n = condition.window
+        if condition.aggregate == "max":
+            return _Max(base, n)
+        if condition.aggregate == "min":
+            return _Min(base, n)
+        if condition.aggregate == "avg":
+            if isinstance(base, _Discrete):
+                return _Discrete(_discrete_mean(base.points, n))
+            self._exact = False
+            return _UniformMean(base.lo, base.hi, n)
+        # delta: newest minus oldest reading of a full window.
+        if n == 1:
+            return _Discrete({0.0: 1.0})
+        if isinstance(base, _Discrete):
+            return _Discrete(_discrete_difference(base.points))
+        self._exact = False
+        return _UniformDifference(base.lo, base.hi)
+
+    def _expr(self, condition):
+        if isinstance(condition, NotCondition):
+            inner = self._expr(condition.operand)
+            return ("not", inner) if condition.negated else inner
+        if isinstance(condition, (AndCondition, OrCondition)):
+            kind = "and" if isinstance(condition, AndCondition) else "or"
+            return (kind, [self._expr(op) for op in condition.operands])
+        sensor = condition.sensor_ref.sensor_name
+        if not condition.aggregate and not condition.duration:
+            p = self.distributions[sensor].probability(condition.operator, condition.value)
+            return ("leaf", _Leaf(("sensor", sensor), sensor, condition.operator, condition.value, p))
+        dist = self._aggregate(condition) if condition.aggregate else self.distributions[sensor]
+        p = dist.probability(condition.operator, condition.value)
+        if condition.duration:
+            if condition.aggregate:
+                # Overlapping windows make consecutive cycles dependent.
+                self._exact = False
+            p **= condition.duration
+        signature = (sensor, condition.operator, condition.value, condition.aggregate,
+                     condition.window, condition.duration)
+        return ("leaf", _Leaf(("term", signature), sensor, condition.operator, condition.value, p))
+
+    # -- evaluating expressions ----------------------------------------------
+
+    def _leaves(self, expr, out: list) -> list:
+        kind = expr[0] if isinstance(expr, tuple) else None
+        if kind == "leaf":
+            out.append(expr[1])
+        elif kind == "not":
+            self._leaves(expr[1], out)
+        elif kind in ("and", "or"):
+            for child in expr[1]:
+                self._leaves(child, out)
+        return out
+
+    def _substitute(self, expr, var: tuple, outcome):
+        """Replace the leaves of `var` by their outcome and fold constants."""
+        if isinstance(expr, bool):
+            return expr
+        kind = expr[0]
+        if kind == "leaf":
+            return outcome(expr[1]) if expr[1].var == var else expr
+        if kind == "not":
+            inner = self._substitute(expr[1], var, outcome)
+            return (not inner) if isinstance(inner, bool) else ("not", inner)
+        absorbing = kind == "or"
+        children = []
+        for child in expr[1]:
+            child = self._substitute(child, var, outcome)
+            if isinstance(child, bool):
+                if child == absorbing:
+                    return absorbing
+                continue
+            children.append(child)
+        if not children:
+            return not absorbing
+        return children[0] if len(children) == 1 else (kind, children)
+
+    def _outcomes(self, expr, var: tuple):
+        """(probability, outcome function) for each state of `var`."""
+        if var[0] == "term":
+            p = next(leaf.probability for leaf in self._leaves(expr, []) if leaf.var == var)
+            return [(p, lambda leaf: True), (1.0 - p, lambda leaf: False)]
+        dist = self.distributions[var[1]]
+        thresholds = sorted({leaf.threshold for leaf in self._leaves(expr, []) if leaf.var == var})
+        # The reading lies below, on or between thresholds; every comparison
+        # is constant over each of these segments.
+        segments = [(thresholds[0] - 1, dist.lt(thresholds[0]))]
+        for i, t in enumerate(thresholds):
+            segments.append((t, dist.le(t) - dist.lt(t)))
+            if i + 1 < len(thresholds):
+                upper = thresholds[i + 1]
+                segments.append(((t + upper) / 2, dist.lt(upper) - dist.le(t)))
+        segments.append((thresholds[-1] + 1, 1.0 - dist.le(thresholds[-1])))
+
+        def outcome_at(value):
+            return lambda leaf: get_comparator(leaf.operator)(value, leaf.threshold)
+
+        return [(p, outcome_at(value)) for value, p in segments if p > 0]
+
+    def _probability(self, expr, depth: int = 0) -> float:
+        if isinstance(expr, bool):
+            return 1.0 if expr else 0.0
+        kind = expr[0]
+        if kind == "leaf":
+            return expr[1].probability
+        if kind == "not":
+            return 1.0 - self._probability(expr[1], depth)
+        counts: dict[tuple, int] = {}
+        for child in expr[1]:
+            for var in {leaf.var for leaf in self._leaves(child, [])}:
+                counts[var] = counts.get(var, 0) + 1
+        shared = [var for var, count in counts.items() if count > 1]
+        if shared and depth < MAX_CONDITIONED:
+            var = max(shared, key=counts.get)
+            return sum(
+                p * self._probability(self._substitute(expr, var, outcome), depth + 1)
+                for p, outcome in self._outcomes(expr, var)
+            )
+        if shared:
+            self._exact = False
+        probabilities = [self._probability(child, depth) for child in expr[1]]
+        if kind == "and":
+            return math.prod(probabilities)
+        return 1.0 - math.prod(1.0 - p for p in probabilities)
+
+    def _evaluate(self, name: str, conditions: list) -> FiringProbability:
+        self._exact = True
+        exprs = [self._expr(condition) for condition in conditions]
+        expr = exprs[0] if len(exprs) == 1 else ("or", exprs)
+        # Windowed or streak terms are independent of other terms only when
+        # nothing else in the expression reads their sensor.
+        sensor_vars: dict[str, set] = {}
+        for leaf in self._leaves(expr, []):
+            sensor_vars.setdefault(leaf.sensor_name, set()).add(leaf.var)
+        for variables in sensor_vars.values():
+            if len(variables) > 1 and any(var[0] == "term" for var in variables):
+                self._exact = False
+        probability = min(max(self._probability(expr), 0.0), 1.0)
+        return FiringProbability(name, probability, self._exact)
+
+    def _rule(self, name: str):
+        try:
+            return self.rules[name]
+        except KeyError:
+            raise KeyError(f"Unknown rule '{name}'") from None
+
+    def rule(self, name: str) -> FiringProbability:
+        return self._evaluate(name, [self._rule(name).when_clause.condition])
+
+    def any_fires(self, names: list[str]) -> FiringProbability:
+        """Probability that at least one of the rules fires in a cycle."""
+        conditions = [self._rule(name).when_clause.condition for name in names]
+        return self._evaluate(" or ".join(names), conditions)
+
+    def all_fire(self, names: list[str]) -> FiringProbability:
+        """Probability that all of the rules fire in the same cycle."""
+        conditions = [self._rule(name).when_clause.condition for name in names]
+        combined = AndCondition(operands=conditions)
+        return self._evaluate(" and ".join(names), [combined])
+
+    def actuator(self, name: str) -> FiringProbability:
+        """Probability that at least one rule commands the actuator in a cycle."""
+        names = [
+            rule.name for rule in self.rules.values()
+            if rule.then_clause.action.actuator_ref.actuator_name == name
+        ]
+        if not names:
+            return FiringProbability(name, 0.0)
+        result = self.any_fires(names)
+        result.name = name
+        return result
+
+    def report(self) -> AnalyticResult:
+        actuators = dict.fromkeys(
+            rule.then_clause.action.actuator_ref.actuator_name for rule in self.rules.values()
+        )
+        return AnalyticResult(
+            rules=[self.rule(name) for name in self.rules],
+            actuators=[self.actuator(name) for name in actuators],
+        )
+
+
+def analyze_model(model: Model, sensor_overrides: Optional[dict[str, float]] = None) -> AnalyticResult:
+    """
+    Per-cycle firing probability of every rule and actuator of a model.
+
+    Args:
+        model: Parsed and validated IoTFlow model object
+        sensor_overrides: Sensors fixed to constant readings
+
+    Returns:
+        AnalyticResult with one FiringProbability per rule and per actuator
+    """
+    return FiringAnalysis(model, sensor_overrides).report()
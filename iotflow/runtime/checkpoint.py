@@ -0,0 +1,131 @@
+import gzip
+import hashlib
+import json
+import os
+import random
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Optional
+
+from ..generators.json_generator import model_to_json_string
+from ..model import Model
+from .simulation import Simulation
+
+CHECKPOINT_VERSION = 1
+# Cycles between checkpoints; writing one costs about as much as a hundred
+# cycles of a typical model, so this keeps the overhead around 0.1%.
+DEFAULT_CHECKPOINT_EVERY = 100_000
+
+
+def model_fingerprint(model: Model, engine: str = "compiled") -> str:
+    """
+    Identify a model (and the engine it runs on) for checkpoint checks.
+
+    Args:
+        model: Parsed and validated IoTFlow model object
+        engine: Rule engine the run uses
+
+    Returns:
+        Hex SHA-256 of the model's JSON form and the engine name
+    """
+    digest = hashlib.sha256(model_to_json_string(model).encode("utf-8"))
+    digest.update(engine.encode("utf-8"))
+    return digest.hexdigest()
+
+
+@dataclass
+class Checkpoint:
+    """
+    Runner state after a given cycle, enough to continue the run.
+
+    Holds the simulation snapshot (totals, index, node, window and actuator
+    state), the global RNG state that drives simulated readings, and how far
+    into the trace the run had read. Stored as gzip-compressed JSON.
+    """
+
+    fingerprint: str
+    cycle_number: int
+    # Trace rows consumed; the next run skips these.
+    trace_offset: int
+    # Last values of the "hold" missing-value policy, None for other runs.
+    held: Optional[dict[str, float]]
+    rng_state: list
+    simulation: dict
+    version: int = CHECKPOINT_VERSION
+
+    @classmethod
+    def capture(
+        cls,
+        simulation: Simulation,
+        fingerprint: str,
+        trace_offset: int = 0,
+        held: Optional[dict[str, float]] = None,
+    ) -> "Checkpoint":
+        version, internal, gauss = random.getstate()
+        return cls(
+            fingerprint=fingerprint,
+            cycle_number=simulation.cycle_number,
+            trace_offset=trace_offset,
+            held=held,
+            rng_state=[version, list(internal), gauss],
+            simulation=simulation.snapshot(),
+        )
+
+    def write(self, path) -> None:
+        """Write atomically, so a crash mid-write leaves the previous checkpoint."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        with gzip.open(tmp, "wt", encoding="utf-8", compresslevel=1) as f:
+            json.dump(asdict(self), f, separators=(",", ":"))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path) -> "Checkpoint":
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != CHECKPOINT_VERSION:
+            raise ValueError(
+                f"Checkpoint '{path}' has version {data.get('version')}, expected {CHECKPOINT_VERSION}"
+            )
+        return cls(**data)
+
+    def resume(self, simulation: Simulation, fingerprint: str) -> None:
+        """Bring a fresh simulation of the same model to this checkpoint."""
+        if fingerprint != self.fingerprint:
+            raise ValueError("Checkpoint was written for a different model or engine")
+        version, internal, gauss = self.rng_state
+        random.setstate((version, tuple(internal), gauss))
+        simulation.restore(self.simulation)
+
+
+class Checkpointer:
+    """Writes a checkpoint every `every` cycles and keeps its own cost."""
+
+    def __init__(self, path, every: int = DEFAULT_CHECKPOINT_EVERY, engine: str = "compiled") -> None:
+        if every < 1:
+            raise ValueError("Checkpoint interval must be at least 1 cycle")
+        self.path = Path(path)
+        self.every = every
+        self.engine = engine
+        self.written = 0
+        self.seconds = 0.0
+        self._fingerprints: dict[int, str] = {}
+
+    def fingerprint(self, model: Model) -> str:
+        # Cached per model object; a hot reload brings a new one.
+        key = id(model)
+        if key not in self._fingerprints:
+            self._fingerprints = {key: model_fingerprint(model, self.engine)}
+        return self._fingerprints[key]
+
+    def due(self, cycle_number: int) -> bool:
+        return cycle_number % self.every == 0
+
+    def write(self, simulation: Simulation, trace_offset: int = 0, held=None) -> None:
+        started = time.perf_counter()
+        fingerprint = self.fingerprint(simulation.model)
+        Checkpoint.capture(simulation, fingerprint, trace_offset, held).write(self.path)
+        self.written += 1
+        self.seconds += time.perf_counter() - started
@@ -0,0 +1,296 @@
+import sys
+from array import array
+from collections.abc import Sequence
+from typing import Iterator, Optional, Union
+
+from ..model import Condition, iter_conditions
+from .compound import ConditionCompiler, Node, Term
+from .context import SimulationContext
+from .executor import RuleExecution
+from .network import RuleNetwork, is_network_condition
+from .run_result import CycleResult
+from .windows import WindowBank
+
+ENGINES = ("compiled", "network")
+
+
+class RuleTable:
+    """
+    Per-run lookup table of rule, sensor and actuator names.
+
+    Each name is held once; cycles refer to rules and sensors by index. The
+    table also carries every rule's compiled condition so a cycle can be
+    evaluated into a list of fired flags without building `RuleExecution`
+    objects.
+
+    Conditions compile into a shared node graph (see `ConditionCompiler`):
+    windowed conditions read from a shared `WindowBank` and "for N cycles"
+    conditions keep a streak, so `evaluate` must be called once per cycle,
+    in order.
+
+    With the "network" engine, single plain comparisons are matched through
+    a shared `RuleNetwork` instead, which pays off on rule bases where many
+    rules repeat the same conditions; the remaining rules still compile.
+
+    A table built with `previous` (on hot reload) takes over the previous
+    table's compiled nodes and windows wherever a condition is unchanged,
+    so streaks, operand statistics and window contents carry over.
+    """
+
+    def __init__(
+        self,
+        ctx: SimulationContext,
+        engine: str = "compiled",
+        previous: Optional["RuleTable"] = None,
+    ) -> None:
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine '{engine}', expected one of {', '.join(ENGINES)}")
+        # Names are interned so that many tables in one process (see
+        # `ModelHost`) share a single copy of each.
+        intern = sys.intern
+        self.sensor_names: list[str] = [intern(name) for name in ctx.sensors]
+        self.rule_names: list[str] = []
+        # Sensor of the rule's first comparison; all of them in rule_sensor_sets.
+        self.rule_sensors: list[str] = []
+        self.rule_sensor_sets: list[tuple[str, ...]] = []
+        self.rule_actuators: list[str] = []
+        self.rule_actions: list[str] = []
+        # Operator and threshold of single-comparison rules, None for compound ones.
+        self.rule_operators: list = []
+        self.rule_thresholds: list[Optional[float]] = []
+        self.windows = WindowBank(inherited=previous.windows.windows if previous is not None else None)
+        self.compiler = ConditionCompiler(
+            self.windows, inherited=previous.compiler.nodes if previous is not None else None,
+        )
+        self._nodes: list[Optional[Node]] = []
+        # Carried over so inherited nodes never see a stamp they already hold.
+        self._stamp = previous._stamp if previous is not None else 0
+        self.network: Optional[RuleNetwork] = RuleNetwork() if engine == "network" else None
+        self._compiled: list[int] = []
+        self._readings: dict[str, float] = {}
+        for i, rule in enumerate(ctx.rules):
+            condition = rule.when_clause.condition
+            action = rule.then_clause.action
+            sensors = tuple(dict.fromkeys(
+                intern(c.sensor_ref.sensor_name) for c in iter_conditions(condition)
+            ))
+            simple = isinstance(condition, Condition)
+            self.rule_names.append(intern(rule.name))
+            self.rule_sensors.append(sensors[0])
+            self.rule_sensor_sets.append(sensors)
+            self.rule_actuators.append(intern(action.actuator_ref.actuator_name))
+            self.rule_actions.append(intern(action.action_name))
+            self.rule_operators.append(condition.operator if simple else None)
+            self.rule_thresholds.append(condition.value if simple else None)
+            if self.network is not None and is_network_condition(condition):
+                self.network.add_rule(rule, slot=i)
+                self._nodes.append(None)
+            else:
+                self._compiled.append(i)
+                self._nodes.append(self.compiler.compile(condition))
+
+    def __len__(self) -> int:
+        return len(self.rule_names)
+
+    def resume_from(self, previous: "RuleTable") -> None:
+        """Continue the cycle stamps of `previous`, which ran on after this table was built."""
+        self._stamp = max(self._stamp, previous._stamp)
+
+    def snapshot(self) -> dict:
+        """Cycle stamp, compiled node state and window contents as plain values."""
+        nodes = list(self.compiler.nodes.values())
+        positions = {id(node): i for i, node in enumerate(nodes)}
+        return {
+            "stamp": self._stamp,
+            "nodes": [node.snapshot(positions) for node in nodes],
+            "windows": self.windows.snapshot(),
+        }
+
+    def restore(self, state: dict) -> None:
+        nodes = list(self.compiler.nodes.values())
+        if len(nodes) != len(state["nodes"]):
+            raise ValueError("Saved state does not match this rule table")
+        self._stamp = state["stamp"]
+        for node, node_state in zip(nodes, state["nodes"]):
+            node.restore(node_state, nodes)
+        self.windows.restore(state["windows"])
+
+    def value_of(self, rule_index: int) -> Optional[float]:
+        """Value a single-comparison rule compared in the latest cycle."""
+        node = self._nodes[rule_index]
+        if node is None:
+            return self._readings.get(self.rule_sensors[rule_index])
+        return node.value if isinstance(node, Term) else None
+
+    def evaluate(self, readings: dict[str, float]) -> list[bool]:
+        self._stamp += 1
+        stamp = self._stamp
+        if self.windows:
+            self.windows.push(readings)
+        for term in self.compiler.stateful_terms:
+            term.evaluate(readings, stamp)
+        if self.network is None:
+            return [node.evaluate(readings, stamp) for node in self._nodes]
+        self._readings = readings
+        fired = [False] * len(self._nodes)
+        for i in self.network.match(readings):
+            fired[i] = True
+        nodes = self._nodes
+        for i in self._compiled:
+            fired[i] = nodes[i].evaluate(readings, stamp)
+        return fired
+
+    def executions(
+        self,
+        readings: dict[str, float],
+        fired: list[bool],
+        suppressed: Optional[list[bool]] = None,
+    ) -> list[RuleExecution]:
+        results: list[RuleExecution] = []
+        for i, met in enumerate(fired):
+            sensor_name = self.rule_sensors[i]
+            execution = RuleExecution(
+                rule_name=self.rule_names[i],
+                sensor_name=sensor_name,
+                sensor_value=readings.get(sensor_name, 0.0),
+                condition_met=met,
+            )
+            if met:
+                execution.actuator_name = self.rule_actuators[i]
+                execution.action_name = self.rule_actions[i]
+                execution.suppressed = bool(suppressed and suppressed[i])
+            results.append(execution)
+        return results
+
+    def cycle(
+        self,
+        cycle_number: int,
+        readings: dict[str, float],
+        fired: list[bool],
+        suppressed: Optional[list[bool]] = None,
+    ) -> CycleResult:
+        return CycleResult(
+            cycle_number=cycle_number,
+            readings=readings,
+            rule_executions=self.executions(readings, fired, suppressed),
+            actions_triggered=sum(fired) - (sum(suppressed) if suppressed else 0),
+        )
+
+
+class SegmentedStore(Sequence):
+    """
+    Cycles stored across several `ColumnarStore` segments, one per rule
+    table a run used (a new segment starts on every hot reload).
+    """
+
+    def __init__(self, segments: list["ColumnarStore"]) -> None:
+        self.segments = segments
+
+    def __len__(self) -> int:
+        return sum(len(segment) for segment in self.segments)
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if index < 0:
+            raise IndexError("cycle index out of range")
+        for segment in self.segments:
+            if index < len(segment):
+                return segment[index]
+            index -= len(segment)
+        raise IndexError("cycle index out of range")
+
+    def fired_cycles(self) -> Iterator[CycleResult]:
+        for segment in self.segments:
+            yield from segment.fired_cycles()
+
+
+class ColumnarStore(Sequence):
+    """
+    Column-oriented storage of cycle results.
+
+    Readings are kept as one float per sensor per cycle and rule outcomes as
+    one bit per rule per cycle; everything else comes from the `RuleTable`.
+    Indexing returns a freshly materialized `CycleResult`, so callers see
+    the usual API while only the cycles they touch are turned into objects.
+    """
+
+    def __init__(self, table: RuleTable) -> None:
+        self.table = table
+        self.cycle_numbers = array("q")
+        self.readings = array("d")
+        self.fired = bytearray()
+        # Allocated on the first suppressed command of an edge-triggered run.
+        self.suppressed: Optional[bytearray] = None
+        self._row_bytes = (len(table) + 7) // 8
+        self._width = len(table.sensor_names)
+
+    def _pack(self, flags: list[bool]) -> bytes:
+        bits = 0
+        for i, flag in enumerate(flags):
+            if flag:
+                bits |= 1 << i
+        return bits.to_bytes(self._row_bytes, "little")
+
+    def append(
+        self,
+        cycle_number: int,
+        readings: dict[str, float],
+        fired: list[bool],
+        suppressed: Optional[list[bool]] = None,
+    ) -> None:
+        row = len(self.cycle_numbers)
+        self.cycle_numbers.append(cycle_number)
+        self.readings.extend(readings.get(name, 0.0) for name in self.table.sensor_names)
+        self.fired += self._pack(fired)
+        if suppressed and any(suppressed):
+            if self.suppressed is None:
+                self.suppressed = bytearray(row * self._row_bytes)
+            self.suppressed += self._pack(suppressed)
+        elif self.suppressed is not None:
+            self.suppressed += bytes(self._row_bytes)
+
+    def __len__(self) -> int:
+        return len(self.cycle_numbers)
+
+    def _bits(self, column: bytearray, index: int) -> list[bool]:
+        start = index * self._row_bytes
+        bits = int.from_bytes(column[start:start + self._row_bytes], "little")
+        return [bool(bits >> i & 1) for i in range(len(self.table))]
+
+    def _materialize(self, index: int) -> CycleResult:
+        start = index * self._width
+        values = self.readings[start:start + self._width]
+        readings = dict(zip(self.table.sensor_names, values))
+        fired = self._bits(self.fired, index)
+        suppressed = self._bits(self.suppressed, index) if self.suppressed is not None else None
+        return self.table.cycle(self.cycle_numbers[index], readings, fired, suppressed)
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return [self._materialize(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("cycle index out of range")
+        return self._materialize(index)
+
+    def fired_cycles(self) -> Iterator[CycleResult]:
+        """Materialize only the cycles in which at least one rule fired."""
+        row_bytes = self._row_bytes
+        for index in range(len(self)):
+            start = index * row_bytes
+            if any(self.fired[start:start + row_bytes]):
+                yield self._materialize(index)
+
+    def fired_count(self, rule_index: Optional[int] = None) -> int:
+        """Number of set fired bits, overall or for one rule."""
+        if rule_index is None:
+            return bin(int.from_bytes(self.fired, "little")).count("1")
+        byte, bit = divmod(rule_index, 8)
+        return sum(
+            1 for row in range(len(self))
+            if self.fired[row * self._row_bytes + byte] >> bit & 1
+        )
@@ -0,0 +1,238 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from ..model import Condition, OrCondition, AndCondition, NotCondition
+from .evaluator import get_comparator
+from .windows import WindowBank
+
+# How many evaluations of a compound node pass between re-orderings of its
+# operands by observed selectivity.
+REORDER_INTERVAL = 64
+
+
+class Node(ABC):
+    """
+    A compiled condition node, memoized per cycle.
+
+    `stamp` identifies the current cycle; a node reached a second time in
+    the same cycle (shared by several rules or sub-expressions) returns its
+    cached result. Every node also counts how often it was evaluated and how
+    often it was true, which compound parents use to order their operands.
+    """
+
+    __slots__ = ("stamp", "result", "evals", "trues", "cost")
+
+    def __init__(self, cost: int = 1) -> None:
+        self.stamp = -1
+        self.result = False
+        self.evals = 0
+        self.trues = 0
+        self.cost = cost
+
+    def evaluate(self, readings: dict[str, float], stamp: int) -> bool:
+        if self.stamp != stamp:
+            self.stamp = stamp
+            self.result = self._compute(readings, stamp)
+            self.evals += 1
+            if self.result:
+                self.trues += 1
+        return self.result
+
+    @abstractmethod
+    def _compute(self, readings: dict[str, float], stamp: int) -> bool:
+        """This cycle's result, computed afresh."""
+
+    def snapshot(self, positions: dict[int, int]) -> list:
+        """Mutable state as plain values; `positions` maps node ids to indexes."""
+        return [self.stamp, self.result, self.evals, self.trues]
+
+    def restore(self, state: list, nodes: list["Node"]) -> None:
+        self.stamp, self.result, self.evals, self.trues = state[:4]
+
+    def true_rate(self) -> float:
+        # Laplace smoothing keeps unseen nodes away from 0 and 1.
+        return (self.trues + 1) / (self.evals + 2)
+
+
+class Term(Node):
+    """One comparison, optionally over a window and/or held for N cycles."""
+
+    __slots__ = (
+        "sensor_name", "comparator", "threshold", "sensor_window", "window", "duration", "streak", "value",
+    )
+
+    def __init__(self, condition: Condition, windows: WindowBank) -> None:
+        super().__init__()
+        self.sensor_name = condition.sensor_ref.sensor_name
+        self.comparator = get_comparator(condition.operator)
+        self.threshold = condition.value
+        self.sensor_window = None
+        self.window = None
+        if condition.aggregate:
+            self.sensor_window = windows.get(self.sensor_name, condition.window)
+            self.window = getattr(self.sensor_window, condition.aggregate)
+        self.duration = condition.duration
+        self.streak = 0
+        self.value: Optional[float] = None
+
+    @property
+    def stateful(self) -> bool:
+        return bool(self.duration)
+
+    def snapshot(self, positions: dict[int, int]) -> list:
+        return super().snapshot(positions) + [self.streak, self.value]
+
+    def restore(self, state: list, nodes: list[Node]) -> None:
+        super().restore(state, nodes)
+        self.streak, self.value = state[4:]
+
+    def _compute(self, readings: dict[str, float], stamp: int) -> bool:
+        current = self.window() if self.window is not None else readings.get(self.sensor_name)
+        self.value = current
+        met = current is not None and self.comparator(current, self.threshold)
+        if self.duration:
+            self.streak = self.streak + 1 if met else 0
+            met = self.streak >= self.duration
+        return met
+
+
+class _Junction(Node):
+    __slots__ = ("operands", "_until_reorder")
+
+    def __init__(self, operands: list[Node]) -> None:
+        super().__init__(cost=sum(op.cost for op in operands))
+        self.operands = operands
+        self._until_reorder = REORDER_INTERVAL
+
+    def _reorder(self) -> None:
+        self._until_reorder = REORDER_INTERVAL
+        self.operands.sort(key=self._rank)
+
+    def _tick(self) -> None:
+        self._until_reorder -= 1
+        if not self._until_reorder:
+            self._reorder()
+
+    def snapshot(self, positions: dict[int, int]) -> list:
+        order = [positions[id(op)] for op in self.operands]
+        return super().snapshot(positions) + [self._until_reorder, order]
+
+    def restore(self, state: list, nodes: list[Node]) -> None:
+        super().restore(state, nodes)
+        self._until_reorder = state[4]
+        self.operands[:] = [nodes[pos] for pos in state[5]]
+
+
+class AllOf(_Junction):
+    """Conjunction; the cheapest, most-often-false operands run first."""
+
+    @staticmethod
+    def _rank(node: Node) -> float:
+        return node.cost / max(1.0 - node.true_rate(), 1e-9)
+
+    def _compute(self, readings: dict[str, float], stamp: int) -> bool:
+        self._tick()
+        for operand in self.operands:
+            if not operand.evaluate(readings, stamp):
+                return False
+        return True
+
+
+class AnyOf(_Junction):
+    """Disjunction; the cheapest, most-often-true operands run first."""
+
+    @staticmethod
+    def _rank(node: Node) -> float:
+        return node.cost / max(node.true_rate(), 1e-9)
+
+    def _compute(self, readings: dict[str, float], stamp: int) -> bool:
+        self._tick()
+        for operand in self.operands:
+            if operand.evaluate(readings, stamp):
+                return True
+        return False
+
+
+class Negation(Node):
+    __slots__ = ("operand",)
+
+    def __init__(self, operand: Node) -> None:
+        super().__init__(cost=operand.cost)
+        self.operand = operand
+
+    def _compute(self, readings: dict[str, float], stamp: int) -> bool:
+        return not self.operand.evaluate(readings, stamp)
+
+
+class ConditionCompiler:
+    """
+    Compiles rule conditions into a shared graph of nodes.
+
+    Structurally identical comparisons and sub-expressions compile to the
+    same node, so each is evaluated at most once per cycle however many
+    rules contain it. Terms with a "for N cycles" streak are listed in
+    `stateful_terms`; they must be evaluated every cycle even when
+    short-circuiting would skip them.
+
+    `inherited` holds the nodes of a previous compilation (on hot reload).
+    A condition found there is taken over as is instead of being compiled
+    afresh; `windows` should then inherit the previous windows as well.
+    """
+
+    def __init__(self, windows: WindowBank, inherited: Optional[dict[tuple, Node]] = None) -> None:
+        self.windows = windows
+        self.nodes: dict[tuple, Node] = {}
+        self.stateful_terms: list[Term] = []
+        self._inherited = inherited or {}
+
+    def _lookup(self, key: tuple) -> Optional[Node]:
+        node = self.nodes.get(key)
+        if node is None:
+            node = self._inherited.get(key)
+            if node is not None:
+                self.nodes[key] = node
+                if isinstance(node, Term):
+                    if node.sensor_window is not None:
+                        # Registers the window; the bank inherits the same object.
+                        self.windows.get(node.sensor_name, node.sensor_window.size)
+                    if node.stateful:
+                        self.stateful_terms.append(node)
+        return node
+
+    def compile(self, condition) -> Node:
+        if isinstance(condition, Condition):
+            key = (
+                "term",
+                condition.sensor_ref.sensor_name,
+                condition.operator,
+                condition.value,
+                condition.aggregate,
+                condition.window,
+                condition.duration,
+            )
+            node = self._lookup(key)
+            if node is None:
+                node = self.nodes[key] = Term(condition, self.windows)
+                if node.stateful:
+                    self.stateful_terms.append(node)
+            return node
+        if isinstance(condition, NotCondition):
+            operand = self.compile(condition.operand)
+            if not condition.negated:
+                return operand
+            key = ("not", id(operand))
+            node = self._lookup(key)
+            if node is None:
+                node = self.nodes[key] = Negation(operand)
+            return node
+        if isinstance(condition, (AndCondition, OrCondition)):
+            operands = [self.compile(op) for op in condition.operands]
+            if len(operands) == 1:
+                return operands[0]
+            kind = AllOf if isinstance(condition, AndCondition) else AnyOf
+            key = (kind.__name__, tuple(sorted(id(op) for op in operands)))
+            node = self._lookup(key)
+            if node is None:
+                node = self.nodes[key] = kind(operands)
+            return node
+        raise TypeError(f"Unsupported condition node {type(condition).__name__}")
@@ -1,6 +1,6 @@
 import operator as op_module
 
-from ..model import Condition, ComparisonOp
+from ..model import Condition, ComparisonOp, OrCondition, AndCondition, NotCondition
 
 _OPS = {
     ComparisonOp.GT:  op_module.gt,
@@ -12,10 +12,34 @@ _OPS = {
 }
 
 
+def _evaluate_operand(node, readings: dict[str, float]) -> bool:
+    try:
+        return evaluate_condition(node, readings)
+    except RuntimeError:
+        # Inside a compound condition a missing reading makes its comparison false.
+        return False
+
+
 def evaluate_condition(condition: Condition, readings: dict[str, float]) -> bool:
+    if isinstance(condition, AndCondition):
+        return all(_evaluate_operand(op, readings) for op in condition.operands)
+    if isinstance(condition, OrCondition):
+        return any(_evaluate_operand(op, readings) for op in condition.operands)
+    if isinstance(condition, NotCondition):
+        result = _evaluate_operand(condition.operand, readings)
+        return not result if condition.negated else result
+    if condition.aggregate or condition.duration:
+        raise ValueError(
+            "Windowed and 'for N cycles' conditions depend on earlier cycles; "
+            "evaluate them through run_simulation"
+        )
     sensor_name = condition.sensor_ref.sensor_name
     if sensor_name not in readings:
         raise RuntimeError(f"No reading for sensor '{sensor_name}'")
     current = readings[sensor_name]
     comparator = _OPS[condition.operator]
     return comparator(current, condition.value)
+
+
+def get_comparator(operator: ComparisonOp):
+    return _OPS[operator]
@@ -1,7 +1,7 @@
 from dataclasses import dataclass
 from typing import Optional
 
-from ..model import Rule
+from ..model import Rule, iter_conditions
 from .evaluator import evaluate_condition
 
 
@@ -13,6 +13,8 @@ class RuleExecution:
     condition_met: bool
     actuator_name: Optional[str] = None
     action_name: Optional[str] = None
+    # Set in edge-triggered runs when the command repeated the actuator's state.
+    suppressed: bool = False
 
 
 def execute_rules(
@@ -22,7 +24,7 @@ def execute_rules(
     results: list[RuleExecution] = []
 
     for rule in rules:
-        sensor_name = rule.when_clause.condition.sensor_ref.sensor_name
+        sensor_name = next(iter_conditions(rule.when_clause.condition)).sensor_ref.sensor_name
         sensor_value = readings.get(sensor_name, 0.0)
 
         try:
@@ -0,0 +1,304 @@
+import json
+import shutil
+import tempfile
+import zipfile
+from array import array
+from pathlib import Path
+from typing import Optional
+
+from .columnar import RuleTable
+from .run_result import CycleResult
+from .sinks import ResultSink
+
+EXPORT_FORMATS = ("npz", "arrow", "parquet")
+DEFAULT_CHUNK_ROWS = 65536
+
+_EXTENSIONS = {
+    ".npz": "npz",
+    ".arrow": "arrow",
+    ".ipc": "arrow",
+    ".feather": "arrow",
+    ".parquet": "parquet",
+}
+
+
+def detect_export_format(path: Path) -> str:
+    fmt = _EXTENSIONS.get(path.suffix.lower())
+    if fmt is None:
+        raise ValueError(
+            f"Cannot detect export format of '{path}'. "
+            f"Supported extensions: {sorted(_EXTENSIONS)}"
+        )
+    return fmt
+
+
+def run_metadata(table: RuleTable) -> dict:
+    """Name tables and rule wiring stored next to the exported matrices."""
+    actuators = list(dict.fromkeys(table.rule_actuators))
+    return {
+        "format_version": 1,
+        "sensors": table.sensor_names,
+        "rules": table.rule_names,
+        "actuators": actuators,
+        "rule_sensors": table.rule_sensors,
+        "rule_actuators": [actuators.index(a) for a in table.rule_actuators],
+        "rule_actions": table.rule_actions,
+    }
+
+
+class _NpzWriter:
+    """
+    Spills each chunk to temporary raw files and assembles the `.npz`
+    archive at close by streaming those files into it, so the full matrices
+    are never held in memory.
+    """
+
+    def __init__(self, path: Path, table: RuleTable) -> None:
+        try:
+            import numpy as np
+        except ImportError:
+            raise ImportError("Exporting to .npz requires numpy (pip install numpy)") from None
+        self._np = np
+        self.path = path
+        self.table = table
+        self.rows = 0
+        self._cycles = tempfile.TemporaryFile()
+        self._readings = tempfile.TemporaryFile()
+        self._fired = tempfile.TemporaryFile()
+
+    @staticmethod
+    def read_rows(path: Path, rows: int):
+        """The first `rows` rows of an existing export, for `write_rows`."""
+        import numpy as np
+
+        with np.load(path) as data:
+            if len(data["cycles"]) < rows:
+                return None
+            return data["cycles"][:rows], data["readings"][:rows], data["fired"][:rows]
+
+    def write_rows(self, saved) -> None:
+        cycles, readings, fired = saved
+        self.write_chunk(cycles, readings.ravel(), fired.tobytes(), len(cycles))
+
+    def write_chunk(self, cycles: array, readings: array, fired: bytearray, rows: int) -> None:
+        cycles.tofile(self._cycles)
+        readings.tofile(self._readings)
+        self._fired.write(fired)
+        self.rows += rows
+
+    def _copy_array(self, archive, name, source, dtype, shape) -> None:
+        fmt = self._np.lib.format
+        with archive.open(f"{name}.npy", "w", force_zip64=True) as entry:
+            fmt.write_array_header_1_0(entry, {
+                "descr": self._np.dtype(dtype).str,
+                "fortran_order": False,
+                "shape": shape,
+            })
+            source.seek(0)
+            shutil.copyfileobj(source, entry)
+
+    def _write_small(self, archive, name, value, dtype) -> None:
+        with archive.open(f"{name}.npy", "w") as entry:
+            value = self._np.asarray(value, dtype=dtype)
+            self._np.lib.format.write_array(entry, value, allow_pickle=False)
+
+    def close(self, metadata: dict) -> None:
+        n_sensors = len(self.table.sensor_names)
+        n_rules = len(self.table)
+        with zipfile.ZipFile(self.path, "w", zipfile.ZIP_STORED, allowZip64=True) as archive:
+            self._copy_array(archive, "cycles", self._cycles, "q", (self.rows,))
+            self._copy_array(archive, "readings", self._readings, "d", (self.rows, n_sensors))
+            self._copy_array(archive, "fired", self._fired, "?", (self.rows, n_rules))
+            self._write_small(archive, "sensor_names", self.table.sensor_names, str)
+            self._write_small(archive, "rule_names", self.table.rule_names, str)
+            self._write_small(archive, "actuator_names", metadata["actuators"], str)
+            self._write_small(archive, "rule_actuators", metadata["rule_actuators"], "q")
+            self._write_small(archive, "metadata", json.dumps(metadata), str)
+        for tmp in (self._cycles, self._readings, self._fired):
+            tmp.close()
+
+
+class _ArrowWriter:
+    """Writes one Arrow record batch per chunk to an IPC or Parquet file."""
+
+    def __init__(self, path: Path, table: RuleTable, fmt: str, metadata: dict) -> None:
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise ImportError(
+                f"Exporting to {fmt} requires pyarrow (pip install pyarrow)"
+            ) from None
+        self._pa = pa
+        self.table = table
+        fields = [pa.field("cycle", pa.int64())]
+        fields += [pa.field(f"reading.{name}", pa.float64()) for name in table.sensor_names]
+        fields += [pa.field(f"fired.{name}", pa.bool_()) for name in table.rule_names]
+        self.schema = pa.schema(fields, metadata={"iotflow": json.dumps(metadata)})
+        if fmt == "parquet":
+            import pyarrow.parquet as pq
+            self._sink = None
+            self._writer = pq.ParquetWriter(str(path), self.schema)
+        else:
+            self._sink = pa.OSFile(str(path), "wb")
+            self._writer = pa.ipc.new_file(self._sink, self.schema)
+
+    @staticmethod
+    def read_rows(path: Path, rows: int):
+        """The first `rows` rows of an existing export, for `write_rows`."""
+        import pyarrow as pa
+
+        if path.suffix.lower() == ".parquet":
+            import pyarrow.parquet as pq
+            saved = pq.read_table(str(path))
+        else:
+            # Read into memory: the file is overwritten while the rows are copied.
+            with pa.OSFile(str(path)) as source:
+                saved = pa.ipc.open_file(source).read_all()
+        return saved.slice(0, rows) if saved.num_rows >= rows else None
+
+    def write_rows(self, saved) -> None:
+        self._writer.write_table(saved.cast(self.schema))
+
+    def write_chunk(self, cycles: array, readings: array, fired: bytearray, rows: int) -> None:
+        pa = self._pa
+        n_sensors = len(self.table.sensor_names)
+        n_rules = len(self.table)
+        columns = [pa.array(cycles, pa.int64())]
+        columns += [
+            pa.array(readings[j::n_sensors], pa.float64()) for j in range(n_sensors)
+        ]
+        columns += [
+            pa.array([bool(b) for b in fired[j::n_rules]], pa.bool_()) for j in range(n_rules)
+        ]
+        self._writer.write_batch(pa.record_batch(columns, schema=self.schema))
+
+    def close(self, metadata: dict) -> None:
+        self._writer.close()
+        if self._sink is not None:
+            self._sink.close()
+
+
+class ColumnarExportSink(ResultSink):
+    """
+    Streams cycles to a columnar analytics file during the run.
+
+    The file holds a cycle column, a readings matrix (one float per sensor),
+    a fired matrix (one bool per rule) and the rule/sensor/actuator name
+    tables as run metadata. Rows are buffered and written `chunk_rows` at a
+    time; `.npz` needs numpy, Arrow IPC and Parquet need pyarrow.
+
+    The file is created when the first chunk is written. A resumed run
+    first copies the rows written before the checkpoint from the existing
+    file, so the export holds the whole run.
+    """
+
+    def __init__(self, path, format: Optional[str] = None, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> None:
+        self.path = Path(path)
+        self.format = format or detect_export_format(self.path)
+        if self.format not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format '{self.format}'. Supported: {list(EXPORT_FORMATS)}")
+        self.chunk_rows = chunk_rows
+        self._writer = None
+        self._opened = False
+        self._first_path = self.path
+        self._part = 0
+
+    @property
+    def pending(self) -> int:
+        return self._rows if self._opened else 0
+
+    def open(self, table: RuleTable) -> None:
+        super().open(table)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.metadata = run_metadata(table)
+        self._opened = True
+        # Rows of this file, written or buffered.
+        self._written = 0
+        self._saved = None
+        self._reset()
+
+    def _ensure_writer(self) -> None:
+        if self._writer is not None:
+            return
+        if self.format == "npz":
+            self._writer = _NpzWriter(self.path, self.table)
+        else:
+            self._writer = _ArrowWriter(self.path, self.table, self.format, self.metadata)
+        if self._saved is not None:
+            self._writer.write_rows(self._saved)
+            self._saved = None
+
+    def snapshot(self) -> Optional[dict]:
+        return {"part": self._part, "rows": self._written}
+
+    def restore(self, state: Optional[dict]) -> None:
+        if state is None:
+            return
+        self._part = state["part"]
+        if self._part:
+            self.path = self._part_path()
+        rows = state["rows"]
+        if rows:
+            reader = _NpzWriter if self.format == "npz" else _ArrowWriter
+            try:
+                saved = reader.read_rows(self.path, rows)
+            except Exception as e:
+                raise ValueError(f"Cannot continue export '{self.path}': {e}") from None
+            if saved is None:
+                raise ValueError(
+                    f"Cannot continue export '{self.path}': it has fewer than the {rows} "
+                    f"rows written before the checkpoint; export to a new file instead"
+                )
+            self._saved = saved
+        self._written = rows
+
+    def _part_path(self) -> Path:
+        return self._first_path.with_name(f"{self._first_path.stem}.{self._part}{self._first_path.suffix}")
+
+    def rebind(self, table: RuleTable) -> None:
+        """
+        Columns are fixed per file, so when a reload changes the sensors or
+        rules the current file is finished and the run continues in the
+        next part, `<stem>.<n><suffix>` next to the first one.
+        """
+        if table.sensor_names == self.table.sensor_names and table.rule_names == self.table.rule_names:
+            super().rebind(table)
+            return
+        self.close()
+        self._part += 1
+        self.path = self._part_path()
+        self.open(table)
+
+    def _reset(self) -> None:
+        self._cycles = array("q")
+        self._readings = array("d")
+        self._fired = bytearray()
+        self._rows = 0
+
+    def _flush(self) -> None:
+        if self._rows:
+            self._ensure_writer()
+            self._writer.write_chunk(self._cycles, self._readings, self._fired, self._rows)
+            self._reset()
+
+    def record(self, cycle: CycleResult) -> None:
+        fired = [r.condition_met for r in cycle.rule_executions]
+        self.record_fired(cycle.cycle_number, cycle.readings, fired)
+
+    def record_fired(self, cycle_number, readings, fired, suppressed=None) -> None:
+        self._cycles.append(cycle_number)
+        self._readings.extend(readings.get(name, 0.0) for name in self.table.sensor_names)
+        self._fired += bytes(fired)
+        self._rows += 1
+        self._written += 1
+        if self._rows >= self.chunk_rows:
+            self._flush()
+
+    def close(self) -> None:
+        if not self._opened:
+            return
+        self._flush()
+        self._ensure_writer()
+        self._writer.close(self.metadata)
+        self._writer = None
+        self._opened = False
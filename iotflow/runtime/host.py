@@ -0,0 +1,322 @@
+import hashlib
+import sys
+import threading
+import time
+from array import array
+from dataclasses import dataclass
+from enum import Enum
+from itertools import islice, repeat
+from pathlib import Path
+from types import BuiltinFunctionType, FunctionType, MethodType, ModuleType
+from typing import Iterable, Iterator, Optional
+
+from ..model import Model
+from ..parser.metamodel import build_metamodel
+from ..profiling import element_sizes
+from .context import SimulationContext, build_context
+from .run_result import RunResult
+from .simulation import Simulation
+from .sinks import AggregateSink
+
+# Cycles each tenant runs per scheduling round, multiplied by its weight.
+DEFAULT_QUANTUM = 1
+
+_DONE = object()
+
+_OPAQUE = (type, ModuleType, FunctionType, BuiltinFunctionType, MethodType, Enum)
+
+
+def approximate_size(root) -> int:
+    """
+    Bytes held by an object graph of runtime structures.
+
+    Follows containers, arrays and instance attributes, counting each
+    object once. Model elements and anything they reference are not
+    followed; they are shared between tenants and sized separately.
+    """
+    seen = set()
+    stack = [root]
+    total = 0
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, _OPAQUE):
+            continue
+        seen.add(id(obj))
+        module = type(obj).__module__
+        if module.startswith("iotflow.model") or module.startswith("textx"):
+            continue
+        total += sys.getsizeof(obj)
+        if isinstance(obj, (str, bytes, bytearray, array, int, float, bool)) or obj is None:
+            continue
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        else:
+            attrs = getattr(obj, "__dict__", None)
+            if attrs is not None:
+                total += sys.getsizeof(attrs)
+                stack.extend(attrs.values())
+            for cls in type(obj).__mro__:
+                for slot in getattr(cls, "__slots__", ()):
+                    value = getattr(obj, slot, None)
+                    if value is not None:
+                        stack.append(value)
+    return total
+
+
+@dataclass
+class _SharedModel:
+    model: Model
+    ctx: SimulationContext
+    size: int
+    tenants: int = 0
+
+
+@dataclass
+class TenantStats:
+    name: str
+    cycles: int
+    busy_seconds: float
+    # Own runtime structures plus this tenant's share of the parsed model.
+    memory_bytes: int
+
+    @property
+    def throughput(self) -> float:
+        """Cycles per second of processing time."""
+        return self.cycles / self.busy_seconds if self.busy_seconds else 0.0
+
+
+class Tenant:
+    def __init__(
+        self,
+        name: str,
+        key: str,
+        simulation: Simulation,
+        readings: Optional[Iterator[Optional[dict[str, float]]]],
+        weight: int,
+    ) -> None:
+        self.name = name
+        self.key = key
+        self.simulation = simulation
+        self.readings = readings
+        self.weight = weight
+        self.busy_seconds = 0.0
+
+
+class ModelHost:
+    """
+    Runs many models in one process on a single scheduling loop.
+
+    Models parsed from identical source share one parsed model and
+    simulation context; every model parses through the host's one
+    metamodel. Each tenant still gets its own rule table, since windows,
+    streaks and actuator state are per model.
+
+    Scheduling is round-robin: every round, each tenant runs `quantum`
+    cycles times its weight, so no model can starve the others. Models can
+    be added and removed at any time, including from another thread while
+    `run` or `start` is active; changes take effect between rounds. A
+    tenant that runs out of readings (or of its cycle budget) is retired,
+    and its `RunResult` is kept in `results`.
+    """
+
+    def __init__(self, quantum: int = DEFAULT_QUANTUM) -> None:
+        if quantum < 1:
+            raise ValueError("Quantum must be at least 1 cycle")
+        self.quantum = quantum
+        self.metamodel = build_metamodel()
+        self.tenants: dict[str, Tenant] = {}
+        self.results: dict[str, RunResult] = {}
+        self._shared: dict[str, _SharedModel] = {}
+        self._pending: list[tuple[str, object]] = []
+        self._lock = threading.Lock()
+        self._parse_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __len__(self) -> int:
+        return len(self.tenants)
+
+    def _load(self, source: str, file_name: Optional[str] = None) -> tuple[str, _SharedModel]:
+        # Imports resolve relative to the file, so the same source in another
+        # directory may be another model.
+        base = str(Path(file_name).resolve().parent) if file_name else ""
+        key = hashlib.sha256(f"{base}\0{source}".encode("utf-8")).hexdigest()
+        with self._lock:
+            shared = self._shared.get(key)
+        if shared is None:
+            with self._parse_lock:
+                model = self.metamodel.model_from_str(source, file_name=file_name)
+            size = sum(size for _, size in element_sizes(model).values())
+            with self._lock:
+                shared = self._shared.setdefault(key, _SharedModel(model, build_context(model), size))
+        return key, shared
+
+    def add_model(
+        self,
+        name: str,
+        source: Optional[str] = None,
+        *,
+        path=None,
+        cycles: Optional[int] = None,
+        readings: Optional[Iterable[Optional[dict[str, float]]]] = None,
+        sensor_overrides: Optional[dict[str, float]] = None,
+        weight: int = 1,
+        **options,
+    ) -> None:
+        """
+        Add a model from DSL `source` or a file `path`.
+
+        Each cycle uses the next item of `readings` as sensor overrides (or
+        `sensor_overrides` when no readings are given), stopping after
+        `cycles` cycles or when `readings` runs out. Other keyword arguments
+        configure the tenant's `Simulation` (sink, engine, edge_triggered...).
+        Tenants keep only totals unless given another sink, since a hosted
+        model may run indefinitely.
+
+        Raises:
+            ValueError: For a tenant with neither `cycles` nor `readings`
+                whose sink keeps every cycle, as its memory would grow
+                without limit
+        """
+        if (source is None) == (path is None):
+            raise ValueError("Give exactly one of source or path")
+        if weight < 1:
+            raise ValueError("Weight must be at least 1")
+        if self._hosted(name):
+            raise ValueError(f"A model named '{name}' is already hosted")
+        sink = options.setdefault("sink", AggregateSink())
+        if cycles is None and readings is None and not sink.bounded:
+            raise ValueError(f"Model '{name}' would run forever with a sink that keeps every cycle; give cycles")
+        file_name = None
+        if source is None:
+            source = Path(path).read_text(encoding="utf-8")
+            file_name = str(path)
+        key, shared = self._load(source, file_name)
+        simulation = Simulation(shared.model, ctx=shared.ctx, **options)
+        if readings is None:
+            per_cycle = repeat(sensor_overrides) if cycles is None else repeat(sensor_overrides, cycles)
+        else:
+            per_cycle = iter(readings) if cycles is None else islice(readings, cycles)
+        tenant = Tenant(name, key, simulation, per_cycle, weight)
+        with self._lock:
+            if self._hosted(name):
+                simulation.close()
+                raise ValueError(f"A model named '{name}' is already hosted")
+            # The entry may have been dropped while this model was parsing.
+            self._shared.setdefault(key, shared).tenants += 1
+            self._pending.append(("add", tenant))
+
+    def _hosted(self, name: str) -> bool:
+        pending = [item for op, item in self._pending if op == "add"]
+        return name in self.tenants or any(tenant.name == name for tenant in pending)
+
+    def remove_model(self, name: str) -> None:
+        """Retire a model; its result becomes available in `results`."""
+        with self._lock:
+            if not self._hosted(name):
+                raise KeyError(f"No hosted model named '{name}'")
+            self._pending.append(("remove", name))
+
+    def _apply_pending(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, []
+        for op, item in pending:
+            if op == "add":
+                self.tenants[item.name] = item
+            else:
+                tenant = self.tenants.get(item)
+                # Already retired if it finished before the removal applied.
+                if tenant is not None:
+                    self._retire(tenant)
+
+    def _retire(self, tenant: Tenant) -> None:
+        del self.tenants[tenant.name]
+        tenant.simulation.close()
+        self.results[tenant.name] = tenant.simulation.result(tenant.busy_seconds)
+        with self._lock:
+            shared = self._shared[tenant.key]
+            shared.tenants -= 1
+            if not shared.tenants:
+                del self._shared[tenant.key]
+
+    def run_round(self) -> int:
+        """Give every tenant its share of cycles once; returns cycles run."""
+        self._apply_pending()
+        ran = 0
+        clock = time.perf_counter
+        for tenant in list(self.tenants.values()):
+            simulation = tenant.simulation
+            started = clock()
+            finished = False
+            for _ in range(self.quantum * tenant.weight):
+                overrides = next(tenant.readings, _DONE)
+                if overrides is _DONE:
+                    finished = True
+                    break
+                simulation.step(overrides)
+                ran += 1
+            tenant.busy_seconds += clock() - started
+            if finished:
+                self._retire(tenant)
+        return ran
+
+    def run(self, rounds: Optional[int] = None) -> int:
+        """
+        Run scheduling rounds until `rounds` have run, every tenant has
+        finished, or `stop` is called. Returns the number of cycles run.
+        """
+        total = 0
+        done = 0
+        self._stop.clear()
+        while not self._stop.is_set() and (rounds is None or done < rounds):
+            total += self.run_round()
+            done += 1
+            if not self.tenants and not self._pending:
+                break
+        return total
+
+    def start(self) -> None:
+        """Run the scheduling loop on a background thread until `stop`."""
+        if self._thread is not None:
+            raise RuntimeError("Host is already running")
+
+        def loop():
+            while not self._stop.is_set():
+                if not self.run_round():
+                    self._stop.wait(0.001)
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=loop, name="iotflow-host", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def close(self) -> dict[str, RunResult]:
+        """Stop the loop, retire every tenant and return all results."""
+        self.stop()
+        self._apply_pending()
+        for tenant in list(self.tenants.values()):
+            self._retire(tenant)
+        return self.results
+
+    def report(self) -> list[TenantStats]:
+        rows = []
+        for tenant in list(self.tenants.values()):
+            shared = self._shared.get(tenant.key)
+            share = shared.size // max(shared.tenants, 1) if shared else 0
+            rows.append(TenantStats(
+                name=tenant.name,
+                cycles=tenant.simulation.cycle_number,
+                busy_seconds=tenant.busy_seconds,
+                memory_bytes=approximate_size(tenant.simulation) + share,
+            ))
+        return rows
+
+
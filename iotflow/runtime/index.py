@@ -0,0 +1,206 @@
+import math
+from array import array
+from dataclasses import dataclass
+from typing import Optional
+
+from .columnar import RuleTable
+
+
+@dataclass
+class SensorSummary:
+    count: int = 0
+    minimum: float = math.inf
+    maximum: float = -math.inf
+    total: float = 0.0
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+
+class RunIndex:
+    """
+    Per-rule, per-actuator and per-sensor indexes maintained during a run.
+
+    Counters and first/last fired cycles are kept for every run and cost
+    O(rules + actuators + sensors) memory. Lists of fired cycle numbers grow
+    with the number of fires, so they are only kept when `track_cycles` is
+    set (the runner does so when the sink retains every cycle).
+
+    A snapshot holds only the counters, so writing one costs the same
+    however long the run. After `restore` the cycle lists start empty and,
+    like the sink's retained cycles, cover the cycles run since.
+    """
+
+    def __init__(self, table: RuleTable, track_cycles: bool = True) -> None:
+        self.table = table
+        self.track_cycles = track_cycles
+        self._rule_pos = {name: i for i, name in enumerate(table.rule_names)}
+        self.actuator_names: list[str] = list(dict.fromkeys(table.rule_actuators))
+        actuator_pos = {name: i for i, name in enumerate(self.actuator_names)}
+        self._rule_actuator = [actuator_pos[a] for a in table.rule_actuators]
+        self._actuator_pos = actuator_pos
+        sensor_pos = {name: i for i, name in enumerate(table.sensor_names)}
+        self._rule_sensors = [
+            [sensor_pos[s] for s in sensors if s in sensor_pos]
+            for sensors in table.rule_sensor_sets
+        ]
+        self._sensor_pos = sensor_pos
+
+        n_rules = len(table)
+        self.rule_fires = [0] * n_rules
+        self.first_fired: list[Optional[int]] = [None] * n_rules
+        self.last_fired: list[Optional[int]] = [None] * n_rules
+        self.actuator_commands = [0] * len(self.actuator_names)
+        self.sensors = [SensorSummary() for _ in table.sensor_names]
+        self._rule_cycles = [array("q") for _ in range(n_rules)] if track_cycles else None
+        self._actuator_cycles = (
+            [array("q") for _ in self.actuator_names] if track_cycles else None
+        )
+        self._sensor_cycles = (
+            [array("q") for _ in table.sensor_names] if track_cycles else None
+        )
+
+    def rebind(self, table: RuleTable) -> "RunIndex":
+        """
+        An index for a reloaded rule table that keeps the counters and cycle
+        lists of every rule, actuator and sensor that is still present.
+        """
+        index = RunIndex(table, self.track_cycles)
+        for new, name in enumerate(table.rule_names):
+            old = self._rule_pos.get(name)
+            if old is None:
+                continue
+            index.rule_fires[new] = self.rule_fires[old]
+            index.first_fired[new] = self.first_fired[old]
+            index.last_fired[new] = self.last_fired[old]
+            if self.track_cycles:
+                index._rule_cycles[new] = self._rule_cycles[old]
+        for new, name in enumerate(index.actuator_names):
+            old = self._actuator_pos.get(name)
+            if old is not None:
+                index.actuator_commands[new] = self.actuator_commands[old]
+                if self.track_cycles:
+                    index._actuator_cycles[new] = self._actuator_cycles[old]
+        for new, name in enumerate(table.sensor_names):
+            old = self._sensor_pos.get(name)
+            if old is not None:
+                index.sensors[new] = self.sensors[old]
+                if self.track_cycles:
+                    index._sensor_cycles[new] = self._sensor_cycles[old]
+        return index
+
+    def snapshot(self) -> dict:
+        return {
+            "rule_fires": list(self.rule_fires),
+            "first_fired": list(self.first_fired),
+            "last_fired": list(self.last_fired),
+            "actuator_commands": list(self.actuator_commands),
+            "sensors": [[s.count, s.minimum, s.maximum, s.total] for s in self.sensors],
+        }
+
+    def restore(self, state: dict) -> None:
+        self.rule_fires = list(state["rule_fires"])
+        self.first_fired = list(state["first_fired"])
+        self.last_fired = list(state["last_fired"])
+        self.actuator_commands = list(state["actuator_commands"])
+        self.sensors = [SensorSummary(*values) for values in state["sensors"]]
+        if self.track_cycles:
+            self._rule_cycles = [array("q") for _ in self.rule_fires]
+            self._actuator_cycles = [array("q") for _ in self.actuator_names]
+            self._sensor_cycles = [array("q") for _ in self.sensors]
+
+    def record(
+        self,
+        cycle_number: int,
+        readings: dict[str, float],
+        fired: list[bool],
+        suppressed: Optional[list[bool]] = None,
+    ) -> None:
+        for pos, name in enumerate(self.table.sensor_names):
+            value = readings.get(name)
+            if value is None:
+                continue
+            summary = self.sensors[pos]
+            summary.count += 1
+            summary.total += value
+            if value < summary.minimum:
+                summary.minimum = value
+            if value > summary.maximum:
+                summary.maximum = value
+
+        touched_actuators = set()
+        touched_sensors = set()
+        for i, met in enumerate(fired):
+            if not met:
+                continue
+            self.rule_fires[i] += 1
+            if self.first_fired[i] is None:
+                self.first_fired[i] = cycle_number
+            self.last_fired[i] = cycle_number
+            touched_sensors.update(self._rule_sensors[i])
+            if self._rule_cycles is not None:
+                self._rule_cycles[i].append(cycle_number)
+            if suppressed and suppressed[i]:
+                continue
+            actuator = self._rule_actuator[i]
+            self.actuator_commands[actuator] += 1
+            touched_actuators.add(actuator)
+
+        if self._actuator_cycles is not None:
+            for actuator in touched_actuators:
+                self._actuator_cycles[actuator].append(cycle_number)
+            for sensor in touched_sensors:
+                self._sensor_cycles[sensor].append(cycle_number)
+
+    def _rule(self, rule_name: str) -> int:
+        try:
+            return self._rule_pos[rule_name]
+        except KeyError:
+            raise KeyError(f"Unknown rule '{rule_name}'") from None
+
+    def _actuator(self, actuator_name: str) -> Optional[int]:
+        return self._actuator_pos.get(actuator_name)
+
+    def _sensor(self, sensor_name: str) -> int:
+        try:
+            return self._sensor_pos[sensor_name]
+        except KeyError:
+            raise KeyError(f"Unknown sensor '{sensor_name}'") from None
+
+    def _require_cycles(self) -> None:
+        if not self.track_cycles:
+            raise ValueError(
+                "Fired cycle lists were not kept for this run; "
+                "use the in-memory sink to query them."
+            )
+
+    def fire_count(self, rule_name: str) -> int:
+        return self.rule_fires[self._rule(rule_name)]
+
+    def first_fired_cycle(self, rule_name: str) -> Optional[int]:
+        return self.first_fired[self._rule(rule_name)]
+
+    def last_fired_cycle(self, rule_name: str) -> Optional[int]:
+        return self.last_fired[self._rule(rule_name)]
+
+    def cycles_fired(self, rule_name: str) -> list[int]:
+        self._require_cycles()
+        return list(self._rule_cycles[self._rule(rule_name)])
+
+    def actuator_command_count(self, actuator_name: str) -> int:
+        pos = self._actuator(actuator_name)
+        return 0 if pos is None else self.actuator_commands[pos]
+
+    def actuator_cycles(self, actuator_name: str) -> list[int]:
+        self._require_cycles()
+        pos = self._actuator(actuator_name)
+        return [] if pos is None else list(self._actuator_cycles[pos])
+
+    def sensor_cycles(self, sensor_name: str) -> list[int]:
+        """Cycles in which at least one rule conditioned on the sensor fired."""
+        self._require_cycles()
+        return list(self._sensor_cycles[self._sensor(sensor_name)])
+
+    def sensor_summary(self, sensor_name: str) -> SensorSummary:
+        return self.sensors[self._sensor(sensor_name)]
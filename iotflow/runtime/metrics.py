@@ -0,0 +1,287 @@
+import json
+import os
+import threading
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional, Union
+
+# Set IOTFLOW_METRICS=0 to take instrumentation out of the runtime entirely:
+# no instruments are created and the cycle loop runs uninstrumented even
+# when a registry is passed in.
+ENABLED = os.environ.get("IOTFLOW_METRICS", "1").lower() not in ("0", "off", "false", "no")
+
+# Upper bounds, in seconds, of the per-cycle latency histogram buckets.
+CYCLE_SECONDS_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0,
+)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class _Metric(ABC):
+    kind = ""
+
+    def __init__(self, name: str, help: str, label: Optional[str] = None) -> None:
+        self.name = name
+        self.help = help
+        self.label = label
+
+    def _labels(self, label_value: str, extra: str = "") -> str:
+        parts = []
+        if self.label is not None:
+            parts.append(f'{self.label}="{_escape_label(label_value)}"')
+        if extra:
+            parts.append(extra)
+        return "{" + ",".join(parts) + "}" if parts else ""
+
+    @abstractmethod
+    def snapshot(self) -> dict:
+        """Current values as plain JSON data."""
+
+    def exposition(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """
+    Monotonic counter, optionally split by one label.
+
+    Updates are plain dict arithmetic with no locking. The runtime updates
+    instruments from the simulation thread only; readers such as the HTTP
+    endpoint may see a cycle's updates partially applied, never corrupted.
+    """
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, label: Optional[str] = None) -> None:
+        super().__init__(name, help, label)
+        self.values: dict[str, float] = {}
+
+    def inc(self, amount: float = 1, label_value: str = "") -> None:
+        values = self.values
+        values[label_value] = values.get(label_value, 0) + amount
+
+    def value(self, label_value: str = "") -> float:
+        return self.values.get(label_value, 0)
+
+    def snapshot(self) -> dict:
+        if self.label is None:
+            return {"type": self.kind, "value": self.value()}
+        return {"type": self.kind, "label": self.label, "values": dict(self.values)}
+
+    def exposition(self) -> list[str]:
+        lines = super().exposition()
+        values = self.values if self.values or self.label is not None else {"": 0}
+        for label_value, value in list(values.items()):
+            lines.append(f"{self.name}{self._labels(label_value)} {_format_value(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    """A value that can go up and down, such as a queue depth."""
+
+    kind = "gauge"
+
+    def set(self, value: float, label_value: str = "") -> None:
+        self.values[label_value] = value
+
+
+class Histogram(_Metric):
+    """
+    Histogram over fixed bucket upper bounds.
+
+    Each bucket holds the observations that fell into it alone; cumulative
+    counts, as Prometheus expects them, are computed on export.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, buckets) -> None:
+        super().__init__(name, help)
+        self.buckets = tuple(sorted(buckets))
+        if not self.buckets:
+            raise ValueError(f"Histogram '{name}' needs at least one bucket")
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> list[tuple[float, int]]:
+        total = 0
+        result = []
+        for bound, count in zip(self.buckets + (float("inf"),), list(self.counts)):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def snapshot(self) -> dict:
+        return {
+            "type": self.kind,
+            "count": self.count,
+            "sum": self.sum,
+            "buckets": {_format_value(b): c for b, c in self.cumulative()},
+        }
+
+    def exposition(self) -> list[str]:
+        lines = super().exposition()
+        for bound, count in self.cumulative():
+            le = self._labels("", f'le="{_format_value(bound)}"')
+            lines.append(f"{self.name}_bucket{le} {count}")
+        lines.append(f"{self.name}_sum {_format_value(self.sum)}")
+        lines.append(f"{self.name}_count {self.count}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Named counters, gauges and histograms with JSON and Prometheus exporters.
+
+    Asking for an existing name returns the instrument already registered,
+    so several runs can share one registry and keep accumulating.
+    """
+
+    def __init__(self) -> None:
+        self.metrics: dict[str, _Metric] = {}
+
+    def _get(self, cls, name: str, *args):
+        metric = self.metrics.get(name)
+        if metric is None:
+            metric = self.metrics[name] = cls(name, *args)
+        elif type(metric) is not cls:
+            raise ValueError(f"Metric '{name}' is already registered as a {metric.kind}")
+        return metric
+
+    def counter(self, name: str, help: str, label: Optional[str] = None) -> Counter:
+        return self._get(Counter, name, help, label)
+
+    def gauge(self, name: str, help: str, label: Optional[str] = None) -> Gauge:
+        return self._get(Gauge, name, help, label)
+
+    def histogram(self, name: str, help: str, buckets=CYCLE_SECONDS_BUCKETS) -> Histogram:
+        return self._get(Histogram, name, help, buckets)
+
+    def snapshot(self) -> dict:
+        return {name: metric.snapshot() for name, metric in list(self.metrics.items())}
+
+    def to_prometheus(self) -> str:
+        lines = []
+        for metric in list(self.metrics.values()):
+            lines.extend(metric.exposition())
+        return "\n".join(lines) + "\n"
+
+    def write_json(self, path: Union[str, Path]) -> None:
+        _write_atomic(Path(path), json.dumps(self.snapshot(), indent=2))
+
+    def write_prometheus(self, path: Union[str, Path]) -> None:
+        """Write the text exposition format, e.g. for node_exporter's textfile collector."""
+        _write_atomic(Path(path), self.to_prometheus())
+
+    def serve(self, port: int = 0, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+        """
+        Serve `/metrics` from a daemon thread. Port 0 picks a free port; the
+        bound address is on the returned server's `server_address`. Call its
+        `shutdown()` to stop.
+        """
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = registry.to_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", PROMETHEUS_CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+
+
+class RunInstruments:
+    """The runtime's instruments on a registry, bound to one run's rule table."""
+
+    def __init__(self, registry: MetricsRegistry, table) -> None:
+        self.cycles = registry.counter("iotflow_cycles_total", "Simulation cycles run")
+        self.cycle_seconds = registry.histogram(
+            "iotflow_cycle_seconds", "Time to evaluate, track and record one cycle",
+        )
+        self.evaluations = registry.counter(
+            "iotflow_rule_evaluations_total", "Rule conditions evaluated",
+        )
+        self.evaluation_rate = registry.gauge(
+            "iotflow_rule_evaluations_per_second", "Rule evaluations per second of busy time in the current run",
+        )
+        self.fires = registry.counter("iotflow_rule_fires_total", "Times each rule fired", "rule")
+        self.dispatches = registry.counter(
+            "iotflow_actuator_commands_total", "Commands dispatched to each actuator", "actuator",
+        )
+        self.suppressed = registry.counter(
+            "iotflow_commands_suppressed_total", "Commands suppressed in edge-triggered runs",
+        )
+        self.sink_pending = registry.gauge(
+            "iotflow_sink_pending_cycles", "Cycles buffered in result sinks and not yet written",
+        )
+        self.rule_names = table.rule_names
+        self.rule_actuators = table.rule_actuators
+        self._rules = len(table)
+        self._cycles = 0
+        self._busy = 0.0
+
+    def rebind(self, table) -> None:
+        self.rule_names = table.rule_names
+        self.rule_actuators = table.rule_actuators
+        self._rules = len(table)
+        self._cycles = 0
+        self._busy = 0.0
+
+    def cycle(self, seconds: float, fired: list[bool], suppressed: Optional[list[bool]], pending: int) -> None:
+        self.cycles.inc()
+        self.cycle_seconds.observe(seconds)
+        self.evaluations.inc(self._rules)
+        self._cycles += 1
+        self._busy += seconds
+        # Kept current so that a scrape during the run sees the live rate.
+        if self._busy:
+            self.evaluation_rate.set(self._rules * self._cycles / self._busy)
+        for i, met in enumerate(fired):
+            if met:
+                self.fires.inc(1, self.rule_names[i])
+                if suppressed and suppressed[i]:
+                    self.suppressed.inc()
+                else:
+                    self.dispatches.inc(1, self.rule_actuators[i])
+        self.sink_pending.set(pending)
@@ -0,0 +1,259 @@
+import math
+import os
+import random
+import warnings
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from statistics import NormalDist
+from typing import Optional, TextIO
+
+from .. import JSON_SUFFIXES
+from .simulation import Simulation
+from .sinks import AggregateSink
+
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_CONFIDENCE = 0.95
+# Batches that must finish before the precision target may stop a run.
+MIN_BATCHES = 4
+
+# Parsed model of a worker process, set once by `_init_worker`.
+_worker_model = None
+
+
+@dataclass
+class BatchCounts:
+    cycles: int
+    rule_fires: list[int]
+    # Cycles in which at least one rule commanded the actuator.
+    actuator_fires: list[int]
+
+
+def _load(source: str, file_name: Optional[str]):
+    # Generated JSON is read as `load_model` would; the parser (and textX)
+    # is only imported for DSL source.
+    if file_name is not None and Path(file_name).suffix.lower() in JSON_SUFFIXES:
+        from ..parser.json_loader import load_json_str
+        return load_json_str(source)
+    from ..parser.parse import parse_str
+    return parse_str(source, file_name)
+
+
+def _init_worker(source: str, file_name: Optional[str]) -> None:
+    global _worker_model
+    # Validation warnings were already shown once by the parent process.
+    warnings.simplefilter("ignore")
+    _worker_model = _load(source, file_name)
+
+
+def _run_batch(seed: int, batch: int, cycles: int, sensor_overrides, engine: str) -> "BatchCounts":
+    return _simulate_batch(_worker_model, seed, batch, cycles, sensor_overrides, engine)
+
+
+def _simulate_batch(
+    model, seed: int, batch: int, cycles: int, sensor_overrides: Optional[dict[str, float]], engine: str,
+) -> BatchCounts:
+    # Every batch has its own seed, so results do not depend on which
+    # worker ran it or in what order batches finished.
+    random.seed(f"{seed}-{batch}")
+    simulation = Simulation(model, sink=AggregateSink(), engine=engine)
+    actuators = list(dict.fromkeys(simulation.table.rule_actuators))
+    rule_actuator = [actuators.index(a) for a in simulation.table.rule_actuators]
+    actuator_fires = [0] * len(actuators)
+    for _ in range(cycles):
+        fired = simulation.step(sensor_overrides)
+        for pos in {rule_actuator[i] for i, met in enumerate(fired) if met}:
+            actuator_fires[pos] += 1
+    simulation.close()
+    return BatchCounts(cycles, list(simulation.index.rule_fires), actuator_fires)
+
+
+@dataclass
+class Estimate:
+    name: str
+    probability: float
+    low: float
+    high: float
+
+    @property
+    def half_width(self) -> float:
+        return (self.high - self.low) / 2
+
+
+@dataclass
+class MonteCarloResult:
+    cycles: int
+    batches: int
+    confidence: float
+    stopped_early: bool
+    rules: list[Estimate] = field(default_factory=list)
+    actuators: list[Estimate] = field(default_factory=list)
+
+    @property
+    def max_half_width(self) -> float:
+        return max((e.half_width for e in self.rules + self.actuators), default=0.0)
+
+    def render(self, out: TextIO) -> None:
+        note = ", stopped at target precision" if self.stopped_early else ""
+        out.write(
+            f"Monte Carlo: {self.cycles} cycles in {self.batches} batches{note}; "
+            f"{self.confidence:.0%} confidence intervals\n"
+        )
+        width = max((len(e.name) for e in self.rules + self.actuators), default=4)
+        for title, estimates in (("Rules", self.rules), ("Actuators", self.actuators)):
+            out.write(f"\n{title}:\n")
+            for e in estimates:
+                out.write(
+                    f"  {e.name:<{width}}  {e.probability:8.4f}  "
+                    f"[{e.low:.4f}, {e.high:.4f}]\n"
+                )
+
+
+class _Tally:
+    """
+    Fire counts and batch rates for a list of rules or actuators.
+
+    Cycles inside a batch are correlated (windows, streaks), batches are
+    not, so the spread of batch rates carries the honest variance. The
+    binomial error is a floor for batches too few or too alike to show any.
+    """
+
+    def __init__(self, names: list[str]) -> None:
+        self.names = names
+        self.fires = [0] * len(names)
+        self._rate_sum = [0.0] * len(names)
+        self._rate_squares = [0.0] * len(names)
+
+    def add(self, fires: list[int], cycles: int) -> None:
+        for pos, count in enumerate(fires):
+            rate = count / cycles
+            self.fires[pos] += count
+            self._rate_sum[pos] += rate
+            self._rate_squares[pos] += rate * rate
+
+    def estimates(self, cycles: int, batches: int, z: float) -> list[Estimate]:
+        estimates = []
+        for pos, name in enumerate(self.names):
+            p = self.fires[pos] / cycles
+            spread = 0.0
+            if batches > 1:
+                squares = self._rate_squares[pos] - 2 * p * self._rate_sum[pos] + batches * p * p
+                spread = max(squares, 0.0) / (batches - 1)
+            error = max(math.sqrt(spread / batches), math.sqrt(p * (1 - p) / cycles))
+            estimates.append(Estimate(name, p, max(p - z * error, 0.0), min(p + z * error, 1.0)))
+        return estimates
+
+
+def run_monte_carlo(
+    source: Optional[str] = None,
+    *,
+    path=None,
+    samples: int = 100_000,
+    workers: Optional[int] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    precision: Optional[float] = None,
+    confidence: float = DEFAULT_CONFIDENCE,
+    seed: int = 0,
+    sensor_overrides: Optional[dict[str, float]] = None,
+    engine: str = "compiled",
+) -> MonteCarloResult:
+    """
+    Estimate per-cycle firing probabilities from independent seeded batches.
+
+    Args:
+        source: DSL source of the model (or give `path`)
+        path: Model file to read instead of `source`; .json and .ndjson
+            files are loaded as generated JSON
+        samples: Maximum number of simulated cycles over all batches
+        workers: Worker processes (default: one per CPU); 1 runs in-process
+        batch_size: Cycles per batch, each with fresh state and its own seed
+        precision: Stop once every interval's half-width is at most this
+        confidence: Confidence level of the intervals
+        seed: Base seed; the same seed gives the same result for any `workers`
+        sensor_overrides: Fixed readings, as for `run_simulation`
+        engine: Rule engine, as for `run_simulation`
+
+    Returns:
+        MonteCarloResult with a probability and interval for every rule and
+        for every actuator (the chance it receives a command in a cycle)
+    """
+    if (source is None) == (path is None):
+        raise ValueError("Give exactly one of source or path")
+    file_name = None
+    if source is None:
+        source = Path(path).read_text(encoding="utf-8")
+        file_name = str(path)
+    if samples < 1 or batch_size < 1:
+        raise ValueError("Samples and batch size must be at least 1")
+    workers = workers or os.cpu_count() or 1
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    sizes = [batch_size] * (samples // batch_size)
+    if samples % batch_size:
+        sizes.append(samples % batch_size)
+
+    model = _load(source, file_name)
+    table = Simulation(model, sink=AggregateSink(), engine=engine).table
+    rules = _Tally(list(table.rule_names))
+    actuators = _Tally(list(dict.fromkeys(table.rule_actuators)))
+    cycles = 0
+    batches = 0
+
+    def absorb(counts: BatchCounts) -> None:
+        nonlocal cycles, batches
+        cycles += counts.cycles
+        batches += 1
+        rules.add(counts.rule_fires, counts.cycles)
+        actuators.add(counts.actuator_fires, counts.cycles)
+
+    def result(stopped: bool) -> MonteCarloResult:
+        return MonteCarloResult(
+            cycles=cycles,
+            batches=batches,
+            confidence=confidence,
+            stopped_early=stopped,
+            rules=rules.estimates(cycles, batches, z),
+            actuators=actuators.estimates(cycles, batches, z),
+        )
+
+    def precise() -> bool:
+        return (
+            precision is not None
+            and batches >= MIN_BATCHES
+            and result(True).max_half_width <= precision
+        )
+
+    if workers == 1:
+        # Batches reseed the global generator; leave the caller's as it was.
+        state = random.getstate()
+        try:
+            for batch, size in enumerate(sizes):
+                absorb(_simulate_batch(model, seed, batch, size, sensor_overrides, engine))
+                if batch + 1 < len(sizes) and precise():
+                    return result(True)
+        finally:
+            random.setstate(state)
+        return result(False)
+
+    # Batches are absorbed strictly in order, so an early stop happens at the
+    # same batch however many workers there are.
+    done: dict[int, BatchCounts] = {}
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(source, file_name)) as pool:
+        pending = {}
+        next_batch = 0
+        absorbed = 0
+        while absorbed < len(sizes):
+            while next_batch < len(sizes) and len(pending) < 2 * workers:
+                future = pool.submit(_run_batch, seed, next_batch, sizes[next_batch], sensor_overrides, engine)
+                pending[future] = next_batch
+                next_batch += 1
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                done[pending.pop(future)] = future.result()
+            while absorbed in done:
+                absorb(done.pop(absorbed))
+                absorbed += 1
+                if absorbed < len(sizes) and precise():
+                    for future in pending:
+                        future.cancel()
+                    return result(True)
+    return result(False)
@@ -0,0 +1,130 @@
+import random
+import time
+from array import array
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+PERCENTILES = (50, 90, 99)
+
+# Cycles whose timings are kept for the percentiles; runs up to this long
+# get exact percentiles.
+DEFAULT_TIMING_SAMPLE = 10_000
+
+
+def percentile(values, q: float) -> float:
+    """Nearest-rank percentile; 0.0 for no values."""
+    if not len(values):
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * q // 100))
+    return ordered[int(rank) - 1]
+
+
+@dataclass
+class PacingStats:
+    """
+    Timing of a paced run in constant memory.
+
+    Counts and maxima cover every cycle. Percentiles come from a uniform
+    reservoir sample of `sample_size` cycles, shared by the three series so
+    that the kept entries at one position describe the same cycle, and in
+    run order until the reservoir fills.
+    """
+
+    period: float
+    sample_size: int = DEFAULT_TIMING_SAMPLE
+    seed: Optional[int] = None
+    # Per sampled cycle, in seconds: how late the cycle started after its
+    # release time, how long it took, and how much of its period was left
+    # over (negative when it overran its deadline).
+    jitter: array = field(default_factory=lambda: array("d"))
+    processing: array = field(default_factory=lambda: array("d"))
+    slack: array = field(default_factory=lambda: array("d"))
+    cycles: int = 0
+    deadline_misses: int = 0
+    max_jitter: float = 0.0
+    max_processing: float = 0.0
+
+    def __post_init__(self) -> None:
+        if self.sample_size < 1:
+            raise ValueError("Sample size must be at least 1")
+        self._rng = random.Random(self.seed)
+
+    def record(self, jitter: float, processing: float, slack: float) -> None:
+        self.cycles += 1
+        if slack < 0:
+            self.deadline_misses += 1
+        self.max_jitter = max(self.max_jitter, jitter)
+        self.max_processing = max(self.max_processing, processing)
+        if len(self.processing) < self.sample_size:
+            self.jitter.append(jitter)
+            self.processing.append(processing)
+            self.slack.append(slack)
+            return
+        slot = self._rng.randrange(self.cycles)
+        if slot < self.sample_size:
+            self.jitter[slot] = jitter
+            self.processing[slot] = processing
+            self.slack[slot] = slack
+
+    @property
+    def miss_rate(self) -> float:
+        return self.deadline_misses / self.cycles if self.cycles else 0.0
+
+    def percentiles(self, values, peak: float) -> dict[str, float]:
+        summary = {f"p{q}": percentile(values, q) for q in PERCENTILES}
+        summary["max"] = peak
+        return summary
+
+    def jitter_percentiles(self) -> dict[str, float]:
+        return self.percentiles(self.jitter, self.max_jitter)
+
+    def processing_percentiles(self) -> dict[str, float]:
+        return self.percentiles(self.processing, self.max_processing)
+
+
+class Pacer:
+    """
+    Releases cycles at a fixed period on a monotonic clock, by default the
+    high-resolution `time.perf_counter`.
+
+    Release times are computed from the start of the run (`start + n *
+    period`) rather than from the previous cycle, so sleep overshoot and
+    processing time never accumulate into drift. A cycle that overruns
+    delays the next one, which then starts late (jitter) but keeps its own
+    deadline; the schedule is not stretched to absorb the overrun.
+    """
+
+    def __init__(
+        self,
+        period: float,
+        clock: Callable[[], float] = time.perf_counter,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        if period <= 0:
+            raise ValueError("Period must be positive")
+        self.period = period
+        self.clock = clock
+        self.sleep = sleep
+        self.stats = PacingStats(period)
+        self._origin = None
+
+    def wait(self, cycle_index: int) -> float:
+        """Sleep until the cycle's release time; returns the time it actually starts."""
+        now = self.clock()
+        if self._origin is None:
+            self._origin = now
+        release = self._origin + cycle_index * self.period
+        if now < release:
+            self.sleep(release - now)
+            now = self.clock()
+        return now
+
+    def done(self, cycle_index: int, started: float) -> None:
+        finished = self.clock()
+        release = self._origin + cycle_index * self.period
+        self.stats.record(
+            jitter=max(0.0, started - release),
+            processing=finished - started,
+            slack=release + self.period - finished,
+        )
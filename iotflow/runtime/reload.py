@@ -0,0 +1,278 @@
+import json
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from ..generators.json_generator import extract_condition, extract_properties
+from ..model import Model
+from ..parser.imports import imported_files
+from .columnar import RuleTable
+from .context import SimulationContext, build_context
+from .simulation import Simulation
+
+# Seconds between checks of a watched model file.
+DEFAULT_WATCH_INTERVAL = 0.5
+
+
+def _rule_signature(rule) -> str:
+    action = rule.then_clause.action
+    return json.dumps(
+        [extract_condition(rule.when_clause.condition), action.actuator_ref.actuator_name, action.action_name],
+        sort_keys=True,
+    )
+
+
+def _device_signature(device) -> str:
+    return json.dumps(extract_properties(device.properties), sort_keys=True)
+
+
+def _diff_names(old: dict, new: dict, signature) -> tuple[list[str], list[str], list[str]]:
+    added = [name for name in new if name not in old]
+    removed = [name for name in old if name not in new]
+    changed = [
+        name for name in new
+        if name in old and signature(old[name]) != signature(new[name])
+    ]
+    return added, removed, changed
+
+
+@dataclass
+class ModelDiff:
+    rules_added: list[str] = field(default_factory=list)
+    rules_removed: list[str] = field(default_factory=list)
+    rules_changed: list[str] = field(default_factory=list)
+    sensors_added: list[str] = field(default_factory=list)
+    sensors_removed: list[str] = field(default_factory=list)
+    sensors_changed: list[str] = field(default_factory=list)
+    actuators_added: list[str] = field(default_factory=list)
+    actuators_removed: list[str] = field(default_factory=list)
+    actuators_changed: list[str] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return any(getattr(self, name) for name in self.__dataclass_fields__)
+
+    def summary(self) -> str:
+        parts = []
+        for kind in ("rules", "sensors", "actuators"):
+            for change, mark in (("added", "+"), ("removed", "-"), ("changed", "~")):
+                count = len(getattr(self, f"{kind}_{change}"))
+                if count:
+                    parts.append(f"{mark}{count} {kind if count > 1 else kind[:-1]}")
+        return ", ".join(parts) or "no changes"
+
+
+def diff_models(old: SimulationContext, new: SimulationContext) -> ModelDiff:
+    """
+    Element-level difference between two models' contexts.
+
+    Args:
+        old: Context of the running model
+        new: Context of the replacement model
+
+    Returns:
+        ModelDiff listing rules, sensors and actuators by name. A rule is
+        changed when its condition or action differs; a device when its
+        type or unit does.
+    """
+    diff = ModelDiff()
+    diff.rules_added, diff.rules_removed, diff.rules_changed = _diff_names(
+        {rule.name: rule for rule in old.rules}, {rule.name: rule for rule in new.rules}, _rule_signature,
+    )
+    diff.sensors_added, diff.sensors_removed, diff.sensors_changed = _diff_names(
+        old.sensors, new.sensors, _device_signature,
+    )
+    diff.actuators_added, diff.actuators_removed, diff.actuators_changed = _diff_names(
+        old.actuators, new.actuators, _device_signature,
+    )
+    return diff
+
+
+@dataclass
+class ReloadReport:
+    # Cycles run before the new model took over (or was rejected).
+    cycle: int
+    diff: Optional[ModelDiff]
+    # Parsing, validation and table building, off the simulation loop.
+    prepare_seconds: float
+    # Time the simulation loop was held between two cycles for the swap.
+    pause_seconds: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def applied(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class _Prepared:
+    model: Optional[Model]
+    ctx: Optional[SimulationContext]
+    table: Optional[RuleTable]
+    base: Optional[RuleTable]
+    diff: Optional[ModelDiff]
+    seconds: float
+    error: Optional[str] = None
+
+
+class HotReloader:
+    """
+    Replaces a running simulation's model without stopping it.
+
+    `submit` parses and validates new source on a background thread,
+    diffs it against the running model and builds its rule table from the
+    running one, so unchanged conditions keep their compiled nodes, streaks
+    and windows. `poll`, called by the simulation loop between cycles,
+    swaps a prepared model in; the loop is only held for the rebinding of
+    the tracker, index and sink. Invalid source is rejected and the running
+    model is kept. Every outcome is recorded in `reports`.
+
+    Readings are never dropped: the cycle after a swap is evaluated against
+    the new model with the same readings source.
+    """
+
+    def __init__(self, simulation: Simulation, metamodel=None) -> None:
+        if metamodel is None:
+            # Imported here so runs of JSON-loaded models never load textX.
+            from ..parser.metamodel import build_metamodel
+            metamodel = build_metamodel()
+        self.simulation = simulation
+        self.metamodel = metamodel
+        self.reports: list[ReloadReport] = []
+        self._lock = threading.Lock()
+        # (source, file name) of the latest submission not yet prepared.
+        self._queued: Optional[tuple] = None
+        self._ready: Optional[_Prepared] = None
+        self._worker: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+
+    def submit(self, source: str, file_name: Optional[str] = None) -> None:
+        """
+        Prepare `source` in the background; a newer submission supersedes it.
+
+        `file_name` is the file the source was read from; its imports are
+        resolved relative to it (default: the working directory).
+        """
+        with self._lock:
+            self._queued = (source, file_name)
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._prepare_queued, name="iotflow-reload", daemon=True)
+                self._worker.start()
+
+    def _prepare_queued(self) -> None:
+        try:
+            while True:
+                with self._lock:
+                    queued, self._queued = self._queued, None
+                    if queued is None:
+                        self._worker = None
+                        return
+                prepared = self._prepare(*queued)
+                with self._lock:
+                    self._ready = prepared
+        finally:
+            # Should the thread die anyway, the next submit starts a new one.
+            with self._lock:
+                if self._worker is threading.current_thread():
+                    self._worker = None
+
+    def _prepare(self, source: str, file_name: Optional[str] = None) -> _Prepared:
+        from textx.exceptions import TextXError
+
+        started = time.perf_counter()
+        simulation = self.simulation
+        try:
+            model = self.metamodel.model_from_str(source, file_name=file_name)
+            ctx = build_context(model)
+            base = simulation.table
+            table = RuleTable(ctx, engine=simulation.engine, previous=base)
+            diff = diff_models(simulation.ctx, ctx)
+        except TextXError as e:
+            return _Prepared(None, None, None, None, None, time.perf_counter() - started, str(e))
+        except Exception as e:
+            # Any failure rejects this source; the running model is kept.
+            error = f"{type(e).__name__}: {e}"
+            return _Prepared(None, None, None, None, None, time.perf_counter() - started, error)
+        return _Prepared(model, ctx, table, base, diff, time.perf_counter() - started)
+
+    def wait(self) -> None:
+        """Block until every submitted source has been prepared."""
+        worker = self._worker
+        if worker is not None:
+            worker.join()
+
+    def poll(self) -> Optional[ReloadReport]:
+        """Apply the latest prepared reload, if any. Call between cycles."""
+        with self._lock:
+            prepared, self._ready = self._ready, None
+        if prepared is None:
+            return None
+        simulation = self.simulation
+        if prepared.error is not None:
+            report = ReloadReport(simulation.cycle_number, None, prepared.seconds, error=prepared.error)
+        else:
+            started = time.perf_counter()
+            table, diff = prepared.table, prepared.diff
+            if prepared.base is not simulation.table:
+                # Another reload was applied meanwhile; rebuild against it.
+                table = None
+                diff = diff_models(simulation.ctx, prepared.ctx)
+            simulation.reload(prepared.model, prepared.ctx, table)
+            report = ReloadReport(
+                simulation.cycle_number, diff, prepared.seconds, time.perf_counter() - started,
+            )
+        self.reports.append(report)
+        return report
+
+    def watch(self, path, interval: float = DEFAULT_WATCH_INTERVAL) -> None:
+        """
+        Submit `path` again whenever the file, or a file the running model
+        imports, changes on disk.
+        """
+        path = Path(path)
+
+        def watched():
+            # The running model's imports, so the set follows each reload.
+            return [path, *map(Path, imported_files(self.simulation.model))]
+
+        def stamp(files):
+            stamps = []
+            for file in files:
+                try:
+                    stat = file.stat()
+                except OSError:
+                    stamps.append(None)
+                    continue
+                stamps.append((stat.st_mtime_ns, stat.st_size))
+            return stamps
+
+        def loop(files, last):
+            while not self._stop.wait(interval):
+                current_files = watched()
+                current = stamp(current_files)
+                if current_files != files:
+                    # A reload changed the imports; start watching the new set.
+                    files, last = current_files, current
+                    continue
+                if current[0] is None or current == last:
+                    continue
+                last = current
+                try:
+                    source = path.read_text(encoding="utf-8")
+                except OSError:
+                    continue
+                self.submit(source, file_name=str(path))
+
+        self._stop.clear()
+        files = watched()
+        self._watcher = threading.Thread(target=loop, args=(files, stamp(files)), name="iotflow-watch", daemon=True)
+        self._watcher.start()
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+        self.wait()
@@ -1,8 +1,15 @@
+import io
+from collections.abc import Sequence
 from dataclasses import field, dataclass
-from typing import Optional
+from typing import Iterator, Optional, TextIO, TYPE_CHECKING
 
 from .executor import RuleExecution
 
+if TYPE_CHECKING:
+    from .index import RunIndex
+    from .pacing import PacingStats
+    from .reload import ReloadReport
+
 
 class Color:
     RESET = "\033[0m"
@@ -13,6 +20,15 @@ class Color:
     CYAN = "\033[96m"
 
 
+class NoColor:
+    RESET = ""
+    BOLD = ""
+    GREEN = ""
+    RED = ""
+    YELLOW = ""
+    CYAN = ""
+
+
 @dataclass
 class CycleResult:
     cycle_number: int
@@ -21,77 +37,217 @@ class CycleResult:
     actions_triggered: int = 0
 
 
+@dataclass
+class RunStats:
+    cycles: int = 0
+    rules_evaluated: int = 0
+    rules_passed: int = 0
+    actions_triggered: int = 0
+    commands_suppressed: int = 0
+
+    def record(self, cycle: CycleResult) -> None:
+        self.cycles += 1
+        self.rules_evaluated += len(cycle.rule_executions)
+        self.rules_passed += sum(1 for r in cycle.rule_executions if r.condition_met)
+        self.actions_triggered += cycle.actions_triggered
+        self.commands_suppressed += sum(1 for r in cycle.rule_executions if r.suppressed)
+
+    def record_fired(self, fired: list[bool], suppressed: Optional[list[bool]] = None) -> None:
+        passed = sum(fired)
+        dropped = sum(suppressed) if suppressed else 0
+        self.cycles += 1
+        self.rules_evaluated += len(fired)
+        self.rules_passed += passed
+        self.actions_triggered += passed - dropped
+        self.commands_suppressed += dropped
+
+
 @dataclass
 class RunResult:
     model_name: str
     duration_seconds: float
-    cycles: list[CycleResult] = field(default_factory=list)
+    # A plain list, or a lazily materializing `ColumnarStore` from the runner.
+    cycles: Sequence[CycleResult] = field(default_factory=list)
+    # Running totals kept by the runner; set when `cycles` may hold only a
+    # sample (or none) of the cycles that were actually run.
+    stats: Optional[RunStats] = None
+    # Per-rule/actuator/sensor query indexes built by the runner.
+    index: Optional["RunIndex"] = None
+    # Per-cycle timing of a paced run; None when cycles ran back to back.
+    pacing: Optional["PacingStats"] = None
+    # Hot reloads attempted during the run, applied or rejected.
+    reloads: list["ReloadReport"] = field(default_factory=list)
+
+    @property
+    def cycle_count(self) -> int:
+        if self.stats is not None:
+            return self.stats.cycles
+        return len(self.cycles)
 
     @property
     def total_rules_evaluated(self) -> int:
+        if self.stats is not None:
+            return self.stats.rules_evaluated
         return sum(len(c.rule_executions) for c in self.cycles)
 
     @property
     def total_actions_triggered(self) -> int:
+        if self.stats is not None:
+            return self.stats.actions_triggered
         return sum(c.actions_triggered for c in self.cycles)
 
     @property
     def rules_passed(self) -> int:
+        if self.stats is not None:
+            return self.stats.rules_passed
         return sum(
             1 for c in self.cycles
             for r in c.rule_executions if r.condition_met
         )
 
+    @property
+    def commands_emitted(self) -> int:
+        return self.total_actions_triggered
+
+    @property
+    def commands_suppressed(self) -> int:
+        if self.stats is not None:
+            return self.stats.commands_suppressed
+        return sum(
+            1 for c in self.cycles
+            for r in c.rule_executions if r.suppressed
+        )
+
     @property
     def rules_not_triggered(self) -> int:
         return self.total_rules_evaluated - self.rules_passed
 
     @staticmethod
-    def _fmt_status(ok: bool) -> str:
-        return f"{Color.GREEN}✔ TRIGGERED{Color.RESET}" if ok else f"{Color.YELLOW}— SKIPPED{Color.RESET}"
+    def _fmt_status(ok: bool, c=Color) -> str:
+        return f"{c.GREEN}✔ TRIGGERED{c.RESET}" if ok else f"{c.YELLOW}— SKIPPED{c.RESET}"
 
-    def _render_header(self) -> str:
-        return (
-            f"{Color.BOLD}{Color.CYAN}IoTFlow Simulation Report{Color.RESET}\n"
-            f"Model: {Color.BOLD}{self.model_name}{Color.RESET}\n"
+    def _render_header(self, c=Color, shown: Optional[int] = None) -> str:
+        header = (
+            f"{c.BOLD}{c.CYAN}IoTFlow Simulation Report{c.RESET}\n"
+            f"Model: {c.BOLD}{self.model_name}{c.RESET}\n"
             f"Duration: {self.duration_seconds:.3f}s\n"
         )
+        if shown is None and len(self.cycles) != self.cycle_count:
+            header += f"Showing {len(self.cycles)} of {self.cycle_count} cycles\n"
+        return header
 
-    def _render_cycle(self, cycle: CycleResult) -> list[str]:
+    def _render_cycle(self, cycle: CycleResult, c=Color) -> list[str]:
         lines: list[str] = []
-        lines.append(f"\n{Color.BOLD}Cycle {cycle.cycle_number}:{Color.RESET}")
+        lines.append(f"\n{c.BOLD}Cycle {cycle.cycle_number}:{c.RESET}")
 
-        lines.append(f"  {Color.BOLD}Sensor Readings:{Color.RESET}")
+        lines.append(f"  {c.BOLD}Sensor Readings:{c.RESET}")
         for name, value in cycle.readings.items():
             lines.append(f"    {name}: {value}")
 
-        lines.append(f"  {Color.BOLD}Rules:{Color.RESET}")
+        lines.append(f"  {c.BOLD}Rules:{c.RESET}")
         for r in cycle.rule_executions:
-            status = self._fmt_status(r.condition_met)
+            status = self._fmt_status(r.condition_met, c)
             lines.append(f"    {status}  {r.rule_name}  ({r.sensor_name}={r.sensor_value})")
-            if r.condition_met:
+            if r.suppressed:
+                lines.append(
+                    f"      → {c.YELLOW}{r.actuator_name}.{r.action_name} (suppressed){c.RESET}"
+                )
+            elif r.condition_met:
                 lines.append(
-                    f"      → {Color.GREEN}{r.actuator_name}.{r.action_name}{Color.RESET}"
+                    f"      → {c.GREEN}{r.actuator_name}.{r.action_name}{c.RESET}"
                 )
 
         return lines
 
-    def _render_summary(self) -> str:
-        return (
-            f"\n{Color.BOLD}Summary:{Color.RESET}\n"
-            f"  Cycles: {len(self.cycles)}\n"
+    def _render_summary(self, c=Color) -> str:
+        summary = (
+            f"\n{c.BOLD}Summary:{c.RESET}\n"
+            f"  Cycles: {self.cycle_count}\n"
             f"  Rules evaluated: {self.total_rules_evaluated} "
-            f"({Color.GREEN}{self.rules_passed} triggered{Color.RESET}, "
-            f"{Color.YELLOW}{self.rules_not_triggered} skipped{Color.RESET})\n"
+            f"({c.GREEN}{self.rules_passed} triggered{c.RESET}, "
+            f"{c.YELLOW}{self.rules_not_triggered} skipped{c.RESET})\n"
             f"  Actions triggered: {self.total_actions_triggered}\n"
         )
+        if self.commands_suppressed:
+            summary += f"  Commands suppressed: {self.commands_suppressed}\n"
+        if self.pacing is not None:
+            summary += self._render_pacing(c)
+        if self.reloads:
+            summary += self._render_reloads(c)
+        return summary
+
+    def _render_reloads(self, c=Color) -> str:
+        applied = [report for report in self.reloads if report.applied]
+        rejected = len(self.reloads) - len(applied)
+        line = f"  Reloads: {len(applied)} applied"
+        if rejected:
+            line += f", {c.RED}{rejected} rejected{c.RESET}"
+        if applied:
+            pause = max(report.pause_seconds for report in applied)
+            line += f", max pause {pause * 1000:.2f} ms"
+        return line + "\n"
+
+    def _render_pacing(self, c=Color) -> str:
+        pacing = self.pacing
+        misses = f"{pacing.deadline_misses} ({pacing.miss_rate:.1%})"
+        if pacing.deadline_misses:
+            misses = f"{c.RED}{misses}{c.RESET}"
+        return (
+            f"  Period: {pacing.period * 1000:.1f} ms, deadline misses: {misses}\n"
+            f"  Processing: {self._fmt_ms(pacing.processing_percentiles())}\n"
+            f"  Jitter: {self._fmt_ms(pacing.jitter_percentiles())}\n"
+        )
 
-    def __str__(self) -> str:
-        lines: list[str] = [self._render_header()]
-
-        for cycle in self.cycles:
-            lines += self._render_cycle(cycle)
+    @staticmethod
+    def _fmt_ms(stats: dict[str, float]) -> str:
+        return ", ".join(f"{name} {value * 1000:.2f} ms" for name, value in stats.items())
+
+    def _selected_cycles(self, fired_only: bool) -> Iterator[CycleResult]:
+        if not fired_only:
+            return iter(self.cycles)
+        # The columnar store can skip quiet cycles without materializing them.
+        fired_cycles = getattr(self.cycles, "fired_cycles", None)
+        if fired_cycles is not None:
+            return fired_cycles()
+        return (cycle for cycle in self.cycles if any(r.condition_met for r in cycle.rule_executions))
+
+    def render(
+        self,
+        out: TextIO,
+        *,
+        summary_only: bool = False,
+        fired_only: bool = False,
+        max_cycles: Optional[int] = None,
+        color: Optional[bool] = None,
+    ) -> None:
+        """
+        Write the report to `out` piece by piece instead of building it whole.
+
+        `color=None` enables ANSI colors only when `out` is a TTY.
+        """
+        if color is None:
+            isatty = getattr(out, "isatty", None)
+            color = bool(isatty and isatty())
+        c = Color if color else NoColor
+        filtered = summary_only or fired_only or max_cycles is not None
+
+        out.write(self._render_header(c, shown=0 if filtered else None))
+        shown = 0
+        if not summary_only:
+            for cycle in self._selected_cycles(fired_only):
+                if max_cycles is not None and shown >= max_cycles:
+                    break
+                for line in self._render_cycle(cycle, c):
+                    out.write("\n")
+                    out.write(line)
+                shown += 1
+        if filtered and not summary_only:
+            out.write(f"\n(showing {shown} of {self.cycle_count} cycles)")
+
+        summary_color = c.GREEN if self.total_actions_triggered > 0 else c.YELLOW
+        out.write("\n" + summary_color + self._render_summary(c) + c.RESET)
 
-        summary_color = Color.GREEN if self.total_actions_triggered > 0 else Color.YELLOW
-        lines.append(summary_color + self._render_summary() + Color.RESET)
-        return "\n".join(lines)
+    def __str__(self) -> str:
+        buffer = io.StringIO()
+        self.render(buffer, color=True)
+        return buffer.getvalue()
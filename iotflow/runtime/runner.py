@@ -1,51 +1,203 @@
-from typing import Optional
+from itertools import islice, repeat
+from typing import Iterator, Optional
 
-from .context import build_context
-from .sensor_sim import generate_readings
-from .executor import execute_rules
-from .run_result import RunResult, CycleResult
+from .actuation import RulePolicy
+from .columnar import RuleTable
+from .checkpoint import Checkpoint, Checkpointer, DEFAULT_CHECKPOINT_EVERY, model_fingerprint
+from .metrics import MetricsRegistry
+from .pacing import Pacer
+from .reload import HotReloader
+from .run_result import RunResult
+from .simulation import Simulation
+from .sinks import ResultSink
 from .timing import timed
+from .trace import open_trace, replay_overrides
 from ..model import Model
 
 
+def _cycle_overrides(
+    sensors,
+    sensor_overrides: Optional[dict[str, float]],
+    cycles: Optional[int],
+    trace,
+    trace_columns: Optional[dict[str, str]],
+    missing: str,
+    start: int = 0,
+    trace_offset: int = 0,
+    held: Optional[dict[str, float]] = None,
+) -> Iterator[Optional[dict[str, float]]]:
+    # `cycles` counts from the start of the run, including resumed cycles.
+    if trace is None:
+        return repeat(sensor_overrides, max((1 if cycles is None else cycles) - start, 0))
+    source = open_trace(trace, columns=trace_columns, sensors=sensors)
+    overrides = replay_overrides(source, sensor_overrides, missing, start=trace_offset, held=held)
+    return overrides if cycles is None else islice(overrides, max(cycles - start, 0))
+
+
 def _run_simulation_internal(
     model: Model,
     sensor_overrides: Optional[dict[str, float]] = None,
-    cycles: int = 1,
+    cycles: Optional[int] = None,
+    trace=None,
+    trace_columns: Optional[dict[str, str]] = None,
+    missing: str = "simulate",
+    sink: Optional[ResultSink] = None,
+    export=None,
+    edge_triggered: bool = False,
+    rule_policies: Optional[dict[str, RulePolicy]] = None,
+    engine: str = "compiled",
+    metrics: Optional[MetricsRegistry] = None,
+    period: Optional[float] = None,
+    watch=None,
+    checkpoint=None,
+    checkpoint_every: int = DEFAULT_CHECKPOINT_EVERY,
+    resume_from=None,
+    table: Optional[RuleTable] = None,
 ) -> RunResult:
-    ctx = build_context(model)
-    cycle_results: list[CycleResult] = []
-
-    for i in range(cycles):
-        readings = generate_readings(ctx.sensors, sensor_overrides)
-        rule_execs = execute_rules(ctx.rules, readings)
-        actions_triggered = sum(1 for r in rule_execs if r.condition_met)
-
-        cycle_results.append(CycleResult(
-            cycle_number=i + 1,
-            readings=readings,
-            rule_executions=rule_execs,
-            actions_triggered=actions_triggered,
-        ))
-
-    return RunResult(
-        model_name=f"IoTFlow ({len(ctx.sensors)} sensors, {len(ctx.actuators)} actuators, {len(ctx.rules)} rules)",
-        duration_seconds=0.0,
-        cycles=cycle_results,
+    simulation = Simulation(
+        model,
+        table=table,
+        sink=sink,
+        export=export,
+        edge_triggered=edge_triggered,
+        rule_policies=rule_policies,
+        engine=engine,
+        metrics=metrics,
+    )
+    pacer = Pacer(period) if period is not None else None
+    reloader = None
+    if watch is not None:
+        reloader = HotReloader(simulation)
+        reloader.watch(watch)
+    checkpointer = Checkpointer(checkpoint, checkpoint_every, engine) if checkpoint is not None else None
+
+    start, trace_offset, held = 0, 0, None
+    if resume_from is not None:
+        saved = Checkpoint.load(resume_from)
+        saved.resume(simulation, model_fingerprint(model, engine))
+        start, trace_offset, held = saved.cycle_number, saved.trace_offset, saved.held
+    per_cycle = _cycle_overrides(
+        simulation.ctx.sensors.keys(), sensor_overrides, cycles, trace, trace_columns, missing,
+        start, trace_offset, held,
+    )
+    hold = trace is not None and missing == "hold"
+    try:
+        for i, overrides in enumerate(per_cycle):
+            if reloader:
+                # Swapping before the pacer wait spends the slack, not the period.
+                reloader.poll()
+            if pacer:
+                released = pacer.wait(i)
+            simulation.step(overrides)
+            if pacer:
+                pacer.done(i, released)
+            if checkpointer and checkpointer.due(simulation.cycle_number):
+                checkpointer.write(
+                    simulation,
+                    trace_offset=trace_offset + i + 1 if trace is not None else 0,
+                    held=overrides if hold else None,
+                )
+    finally:
+        if reloader:
+            reloader.close()
+        simulation.close()
+
+    return simulation.result(
+        pacing=pacer.stats if pacer else None,
+        reloads=reloader.reports if reloader else [],
     )
 
 
 @timed
-def _run_simulation_timed(model, sensor_overrides=None, cycles=1):
-    return _run_simulation_internal(model, sensor_overrides, cycles)
+def _run_simulation_timed(model, **kwargs):
+    return _run_simulation_internal(model, **kwargs)
 
 
 def run_simulation(
     model: Model,
     *,
     sensor_overrides: Optional[dict[str, float]] = None,
-    cycles: int = 1,
+    cycles: Optional[int] = None,
+    trace=None,
+    trace_columns: Optional[dict[str, str]] = None,
+    missing: str = "simulate",
+    sink: Optional[ResultSink] = None,
+    export=None,
+    edge_triggered: bool = False,
+    rule_policies: Optional[dict[str, RulePolicy]] = None,
+    engine: str = "compiled",
+    metrics: Optional[MetricsRegistry] = None,
+    period: Optional[float] = None,
+    watch=None,
+    checkpoint=None,
+    checkpoint_every: int = DEFAULT_CHECKPOINT_EVERY,
+    resume_from=None,
+    table: Optional[RuleTable] = None,
 ) -> RunResult:
-    result, duration = _run_simulation_timed(model, sensor_overrides, cycles)
+    """
+    Run the model's rules over simulated or replayed sensor readings.
+
+    Without a `trace`, `cycles` defaults to 1. With a `trace` (CSV, NDJSON or
+    binary file path), one cycle runs per recorded row until the trace ends
+    or `cycles` rows have been replayed.
+
+    `sink` decides which cycles are kept on the result (all of them by
+    default); the summary totals always cover every cycle that ran. With
+    `export`, every cycle is also streamed to a columnar file (`.npz`,
+    `.arrow` or `.parquet`).
+
+    With `edge_triggered`, a command is emitted only when it changes the
+    actuator's state or its condition has just become true; repeats are
+    counted as suppressed. `rule_policies` adds per-rule hysteresis and
+    minimum hold times in that mode.
+
+    `engine="network"` matches single-comparison rules through a shared
+    condition network (see `RuleNetwork`), which suits large rule bases that
+    repeat the same conditions.
+
+    With a `metrics` registry, every cycle updates its latency histogram and
+    the per-rule, per-actuator and sink counters (see `RunInstruments`),
+    unless instrumentation is switched off with IOTFLOW_METRICS=0.
+
+    With a `period` (seconds), cycles are released at that fixed rate
+    instead of back to back, and the result's `pacing` holds the deadline
+    misses and percentiles of processing time and start jitter (see
+    `PacingStats`).
+
+    With `watch` (a model file path), the file is checked for changes during
+    the run and a valid new version replaces the model between two cycles,
+    keeping the state of unchanged rules (see `HotReloader`); the result's
+    `reloads` lists each reload with its swap pause.
+
+    With `checkpoint` (a file path), the runner state is written there every
+    `checkpoint_every` cycles. `resume_from` continues a run from such a
+    file: give it the same model and options, and `cycles` still counts
+    from the start of the original run. Totals and the index come out as
+    if the run had never stopped; the sink only sees the resumed cycles.
+
+    `table` is a rule table already built for this model and `engine`, in
+    its initial state; a long-lived process can reuse one between runs
+    instead of compiling the rules each time.
+    """
+    result, duration = _run_simulation_timed(
+        model,
+        sensor_overrides=sensor_overrides,
+        cycles=cycles,
+        trace=trace,
+        trace_columns=trace_columns,
+        missing=missing,
+        sink=sink,
+        export=export,
+        edge_triggered=edge_triggered,
+        rule_policies=rule_policies,
+        engine=engine,
+        metrics=metrics,
+        period=period,
+        watch=watch,
+        checkpoint=checkpoint,
+        checkpoint_every=checkpoint_every,
+        resume_from=resume_from,
+        table=table,
+    )
     result.duration_seconds = duration
     return result
@@ -14,7 +14,7 @@ DEFAULT_RANGES = {
 DEFAULT_RANGE = (0.0, 100.0)
 
 
-def _get_unit(sensor: Sensor) -> str:
+def sensor_unit(sensor: Sensor) -> str:
     for prop in sensor.properties:
         if isinstance(prop, UnitProperty):
             return prop.value
@@ -30,7 +30,7 @@ def generate_readings(
         if overrides and name in overrides:
             readings[name] = overrides[name]
         else:
-            unit = _get_unit(sensor)
+            unit = sensor_unit(sensor)
             if unit == "boolean":
                 readings[name] = float(random.choice([0, 1]))
             else:
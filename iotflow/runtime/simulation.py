@@ -0,0 +1,148 @@
+import time
+from dataclasses import asdict
+from typing import Optional
+
+from ..model import Model
+from .actuation import EdgeTracker, RulePolicy
+from .columnar import RuleTable
+from .context import SimulationContext, build_context
+from .index import RunIndex
+from .metrics import ENABLED as METRICS_ENABLED, MetricsRegistry, RunInstruments
+from .run_result import RunResult, RunStats
+from .sensor_sim import generate_readings
+from .sinks import ResultSink, InMemorySink, TeeSink
+
+
+class Simulation:
+    """
+    One model's runtime state, advanced one cycle at a time.
+
+    Holds the rule table, edge tracker, sink, running totals and index that
+    `run_simulation` used to keep in local variables, so a run can also be
+    driven step by step (by a multi-model host, for instance). Call `close`
+    once the last cycle has run.
+    """
+
+    def __init__(
+        self,
+        model: Model,
+        *,
+        sink: Optional[ResultSink] = None,
+        export=None,
+        edge_triggered: bool = False,
+        rule_policies: Optional[dict[str, RulePolicy]] = None,
+        engine: str = "compiled",
+        metrics: Optional[MetricsRegistry] = None,
+        ctx: Optional[SimulationContext] = None,
+        table: Optional[RuleTable] = None,
+    ) -> None:
+        self.model = model
+        self.ctx = ctx if ctx is not None else build_context(model)
+        self.engine = engine
+        # A prebuilt table must be for this model and engine, in its initial state.
+        self.table = table if table is not None else RuleTable(self.ctx, engine=engine)
+        self.tracker = EdgeTracker(self.table, rule_policies) if edge_triggered else None
+        sink = sink if sink is not None else InMemorySink()
+        if export is not None:
+            from .export import ColumnarExportSink
+            sink = TeeSink(sink, ColumnarExportSink(export))
+        self.sink = sink
+        self.sink.open(self.table)
+        self.stats = RunStats()
+        self.index = RunIndex(self.table, track_cycles=not sink.bounded)
+        self.instruments = (
+            RunInstruments(metrics, self.table) if metrics is not None and METRICS_ENABLED else None
+        )
+        self.cycle_number = 0
+        self.closed = False
+
+    def step(self, overrides: Optional[dict[str, float]] = None) -> list[bool]:
+        """Run one cycle and return which rules fired."""
+        instruments = self.instruments
+        if instruments:
+            started = time.perf_counter()
+        self.cycle_number += 1
+        n = self.cycle_number
+        readings = generate_readings(self.ctx.sensors, overrides)
+        fired = self.table.evaluate(readings)
+        suppressed = self.tracker.step(n, readings, fired) if self.tracker else None
+        self.stats.record_fired(fired, suppressed)
+        self.index.record(n, readings, fired, suppressed)
+        self.sink.record_fired(n, readings, fired, suppressed)
+        if instruments:
+            instruments.cycle(time.perf_counter() - started, fired, suppressed, self.sink.pending)
+        return fired
+
+    def reload(
+        self,
+        model: Model,
+        ctx: Optional[SimulationContext] = None,
+        table: Optional[RuleTable] = None,
+    ) -> None:
+        """
+        Switch to `model` between cycles.
+
+        Compiled conditions, windows, actuator state, policies and index
+        counters carry over for every rule, sensor and actuator the new
+        model still has. `table` may be built ahead of time from the current
+        one (`RuleTable(ctx, engine, previous=simulation.table)`) so that
+        only the rebinding below happens between cycles.
+        """
+        ctx = ctx if ctx is not None else build_context(model)
+        if table is None:
+            table = RuleTable(ctx, engine=self.engine, previous=self.table)
+        table.resume_from(self.table)
+        if self.tracker:
+            self.tracker = self.tracker.rebind(table)
+        self.index = self.index.rebind(table)
+        self.sink.rebind(table)
+        if self.instruments:
+            self.instruments.rebind(table)
+        self.model = model
+        self.ctx = ctx
+        self.table = table
+
+    def snapshot(self) -> dict:
+        """
+        Everything a later run needs to continue from this cycle, as plain
+        values: totals, index, compiled node and window state, actuator
+        state, and how far file sinks have written. Cycles kept in memory by
+        the sink are not part of it.
+        """
+        return {
+            "cycle_number": self.cycle_number,
+            "stats": asdict(self.stats),
+            "table": self.table.snapshot(),
+            "index": self.index.snapshot(),
+            "tracker": self.tracker.snapshot() if self.tracker else None,
+            "sink": self.sink.snapshot(),
+        }
+
+    def restore(self, state: dict) -> None:
+        """Continue from a `snapshot` of a simulation of the same model."""
+        if (state["tracker"] is None) != (self.tracker is None):
+            raise ValueError("Saved state and this run differ in edge-triggered mode")
+        self.table.restore(state["table"])
+        self.index.restore(state["index"])
+        if self.tracker:
+            self.tracker.restore(state["tracker"])
+        self.sink.restore(state.get("sink"))
+        self.stats = RunStats(**state["stats"])
+        self.cycle_number = state["cycle_number"]
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        self.sink.close()
+
+    def result(self, duration_seconds: float = 0.0, **extra) -> RunResult:
+        ctx = self.ctx
+        return RunResult(
+            model_name=f"IoTFlow ({len(ctx.sensors)} sensors, {len(ctx.actuators)} actuators, {len(ctx.rules)} rules)",
+            duration_seconds=duration_seconds,
+            cycles=self.sink.retained(),
+            stats=self.stats,
+            index=self.index,
+            **extra,
+        )
@@ -0,0 +1,281 @@
+import json
+import os
+import random
+from abc import ABC, abstractmethod
+from dataclasses import asdict
+from pathlib import Path
+from typing import Optional
+
+from .columnar import ColumnarStore, RuleTable, SegmentedStore
+from .run_result import CycleResult
+
+SINK_KINDS = ("memory", "aggregate", "sampled", "stream")
+DEFAULT_SAMPLE_SIZE = 100
+
+
+class ResultSink(ABC):
+    """
+    Receives each cycle as the runner produces it.
+
+    The runner keeps the summary totals itself, so a sink only decides which
+    cycles (if any) stay available on the returned `RunResult`. A sink whose
+    memory does not grow with the cycle count is `bounded`.
+    """
+
+    bounded = True
+
+    @property
+    def pending(self) -> int:
+        """Cycles received but not yet written out."""
+        return 0
+
+    def open(self, table: RuleTable) -> None:
+        self.table = table
+
+    def rebind(self, table: RuleTable) -> None:
+        """Continue with the rule table of a hot-reloaded model."""
+        self.table = table
+
+    @abstractmethod
+    def record(self, cycle: CycleResult) -> None:
+        """Take one cycle as `CycleResult`."""
+
+    def record_fired(
+        self,
+        cycle_number: int,
+        readings: dict[str, float],
+        fired: list[bool],
+        suppressed: Optional[list[bool]] = None,
+    ) -> None:
+        """Columnar entry point used by the runner; builds objects only if needed."""
+        self.record(self.table.cycle(cycle_number, readings, fired, suppressed))
+
+    def retained(self) -> list[CycleResult]:
+        return []
+
+    def snapshot(self) -> Optional[dict]:
+        """How much a file sink has written, so a resumed run can continue it."""
+        return None
+
+    def restore(self, state: Optional[dict]) -> None:
+        """Continue the output of a `snapshot`; call before the first cycle."""
+
+    def close(self) -> None:
+        pass
+
+
+class InMemorySink(ResultSink):
+    """
+    Keeps every cycle (the historical behavior).
+
+    Once opened by the runner, cycles go into a `ColumnarStore` and are only
+    turned back into `CycleResult` objects when read.
+    """
+
+    bounded = False
+
+    def __init__(self) -> None:
+        self.cycles = []
+        self._segments: list[ColumnarStore] = []
+
+    def open(self, table: RuleTable) -> None:
+        super().open(table)
+        self.cycles = ColumnarStore(table)
+
+    def rebind(self, table: RuleTable) -> None:
+        # Rows are laid out per table, so a reload starts a new segment.
+        super().rebind(table)
+        if len(self.cycles):
+            self._segments.append(self.cycles)
+        self.cycles = ColumnarStore(table)
+
+    def record(self, cycle: CycleResult) -> None:
+        if isinstance(self.cycles, ColumnarStore):
+            fired = [r.condition_met for r in cycle.rule_executions]
+            suppressed = [r.suppressed for r in cycle.rule_executions]
+            self.cycles.append(cycle.cycle_number, cycle.readings, fired, suppressed)
+        else:
+            self.cycles.append(cycle)
+
+    def record_fired(self, cycle_number, readings, fired, suppressed=None) -> None:
+        self.cycles.append(cycle_number, readings, fired, suppressed)
+
+    def retained(self):
+        if self._segments:
+            return SegmentedStore(self._segments + [self.cycles])
+        return self.cycles
+
+
+class AggregateSink(ResultSink):
+    """Keeps no cycles; only the runner's totals survive the run."""
+
+    def record(self, cycle: CycleResult) -> None:
+        pass
+
+    def record_fired(self, cycle_number, readings, fired, suppressed=None) -> None:
+        pass
+
+
+class SampledSink(ResultSink):
+    """Keeps a uniform reservoir sample of `size` cycles."""
+
+    def __init__(self, size: int = DEFAULT_SAMPLE_SIZE, seed: Optional[int] = None) -> None:
+        if size < 1:
+            raise ValueError("Sample size must be at least 1")
+        self.size = size
+        self.seen = 0
+        self._rng = random.Random(seed)
+        self._sample: list[CycleResult] = []
+
+    def _slot(self) -> Optional[int]:
+        # Reservoir position for the next cycle, or None if it is not kept.
+        self.seen += 1
+        if len(self._sample) < self.size:
+            return len(self._sample)
+        slot = self._rng.randrange(self.seen)
+        return slot if slot < self.size else None
+
+    def _keep(self, slot: int, cycle: CycleResult) -> None:
+        if slot == len(self._sample):
+            self._sample.append(cycle)
+        else:
+            self._sample[slot] = cycle
+
+    def record(self, cycle: CycleResult) -> None:
+        slot = self._slot()
+        if slot is not None:
+            self._keep(slot, cycle)
+
+    def record_fired(self, cycle_number, readings, fired, suppressed=None) -> None:
+        # Most cycles of a long run are dropped, so objects are built only
+        # for the ones the reservoir keeps.
+        slot = self._slot()
+        if slot is not None:
+            self._keep(slot, self.table.cycle(cycle_number, readings, fired, suppressed))
+
+    def retained(self) -> list[CycleResult]:
+        return sorted(self._sample, key=lambda c: c.cycle_number)
+
+
+class StreamingFileSink(ResultSink):
+    """
+    Writes each cycle as one NDJSON line and keeps none in memory.
+
+    A file given by path is emptied before the first cycle, unless a
+    resumed run restores it: then it is cut back to where the checkpoint
+    was taken and the run appends from there.
+    """
+
+    def __init__(self, target) -> None:
+        if hasattr(target, "write"):
+            self._file = target
+            self._owned = False
+        else:
+            self.path = Path(target)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Opened without truncating; `_start` does that once the offset is known.
+            self._file = open(self.path, "a", encoding="utf-8")
+            self._owned = True
+        self._truncate_at: Optional[int] = 0 if self._owned else None
+
+    def _start(self) -> None:
+        if self._truncate_at is not None:
+            self._file.truncate(self._truncate_at)
+            self._truncate_at = None
+
+    def record(self, cycle: CycleResult) -> None:
+        self._start()
+        self._file.write(json.dumps(asdict(cycle), ensure_ascii=False))
+        self._file.write("\n")
+
+    def snapshot(self) -> Optional[dict]:
+        if not self._owned:
+            return None
+        self._start()
+        self._file.flush()
+        return {"offset": os.fstat(self._file.fileno()).st_size}
+
+    def restore(self, state: Optional[dict]) -> None:
+        if not self._owned or state is None:
+            return
+        offset = state["offset"]
+        size = os.fstat(self._file.fileno()).st_size
+        if size < offset:
+            raise ValueError(
+                f"Cannot continue '{self.path}': it has {size} bytes, "
+                f"but {offset} were written before the checkpoint"
+            )
+        self._truncate_at = offset
+
+    def close(self) -> None:
+        if self._owned:
+            self._start()
+            self._file.close()
+        else:
+            self._file.flush()
+
+
+class TeeSink(ResultSink):
+    """Forwards every cycle to several sinks; the first one's cycles are retained."""
+
+    def __init__(self, *sinks: ResultSink) -> None:
+        self.sinks = sinks
+        self.bounded = all(s.bounded for s in sinks)
+
+    @property
+    def pending(self) -> int:
+        return sum(sink.pending for sink in self.sinks)
+
+    def open(self, table: RuleTable) -> None:
+        super().open(table)
+        for sink in self.sinks:
+            sink.open(table)
+
+    def rebind(self, table: RuleTable) -> None:
+        super().rebind(table)
+        for sink in self.sinks:
+            sink.rebind(table)
+
+    def record(self, cycle: CycleResult) -> None:
+        for sink in self.sinks:
+            sink.record(cycle)
+
+    def record_fired(self, cycle_number, readings, fired, suppressed=None) -> None:
+        for sink in self.sinks:
+            sink.record_fired(cycle_number, readings, fired, suppressed)
+
+    def retained(self):
+        return self.sinks[0].retained()
+
+    def snapshot(self) -> Optional[dict]:
+        states = [sink.snapshot() for sink in self.sinks]
+        return {"sinks": states} if any(state is not None for state in states) else None
+
+    def restore(self, state: Optional[dict]) -> None:
+        if state is None:
+            return
+        for sink, sink_state in zip(self.sinks, state["sinks"]):
+            sink.restore(sink_state)
+
+    def close(self) -> None:
+        for sink in self.sinks:
+            sink.close()
+
+
+def make_sink(
+    kind: str,
+    output=None,
+    sample_size: int = DEFAULT_SAMPLE_SIZE,
+    seed: Optional[int] = None,
+) -> ResultSink:
+    if kind == "memory":
+        return InMemorySink()
+    if kind == "aggregate":
+        return AggregateSink()
+    if kind == "sampled":
+        return SampledSink(sample_size, seed)
+    if kind == "stream":
+        if output is None:
+            raise ValueError("The 'stream' sink needs an output file")
+        return StreamingFileSink(output)
+    raise ValueError(f"Unknown result sink '{kind}'. Supported: {list(SINK_KINDS)}")
@@ -0,0 +1,271 @@
+import csv
+import json
+import math
+import mmap
+import struct
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+TRACE_MAGIC = b"IOTFTRC1"
+TRACE_FORMATS = ("csv", "ndjson", "binary")
+MISSING_POLICIES = ("simulate", "hold")
+DEFAULT_CHUNK_SIZE = 1024
+
+_EXTENSIONS = {
+    ".csv": "csv",
+    ".ndjson": "ndjson",
+    ".jsonl": "ndjson",
+    ".iotb": "binary",
+}
+_MISSING_TOKENS = {"", "na", "nan", "null", "none"}
+_COUNT = struct.Struct("<H")
+
+
+def detect_format(path: Path) -> str:
+    fmt = _EXTENSIONS.get(path.suffix.lower())
+    if fmt is None:
+        raise ValueError(
+            f"Cannot detect trace format of '{path}'. "
+            f"Supported extensions: {sorted(_EXTENSIONS)}"
+        )
+    return fmt
+
+
+def _parse_value(raw, column: str, line_no: int) -> Optional[float]:
+    if raw is None:
+        return None
+    if isinstance(raw, bool):
+        return float(raw)
+    if isinstance(raw, (int, float)):
+        return None if math.isnan(raw) else float(raw)
+    text = str(raw).strip()
+    if text.lower() in _MISSING_TOKENS:
+        return None
+    try:
+        return float(text)
+    except ValueError:
+        raise ValueError(
+            f"Invalid reading '{text}' for column '{column}' at line {line_no}"
+        ) from None
+
+
+def _mapped_lines(path: Path) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        if path.stat().st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for line in iter(mm.readline, b""):
+                yield line
+
+
+@dataclass
+class Trace:
+    """
+    Streaming reader over a recorded sensor trace.
+
+    Rows are yielded as dicts of sensor name to reading; missing values are
+    left out of the row so the runner can apply its missing-value policy.
+    Files are memory-mapped and decoded one line (or record) at a time, so
+    memory use does not grow with the size of the trace.
+    """
+    path: Path
+    format: str
+    columns: dict[str, str] = field(default_factory=dict)
+    sensors: Optional[frozenset[str]] = None
+
+    def _target(self, column: str) -> Optional[str]:
+        name = self.columns.get(column, column)
+        if self.sensors is not None and name not in self.sensors:
+            return None
+        return name
+
+    def _iter_csv(self, start: int = 0) -> Iterator[dict[str, float]]:
+        lines = _mapped_lines(self.path)
+        header = None
+        for line_no, raw in enumerate(lines, 1):
+            if not raw.strip():
+                continue
+            if header is not None and start:
+                start -= 1
+                continue
+            text = raw.decode("utf-8").rstrip("\r\n")
+            cells = next(csv.reader([text]))
+            if header is None:
+                header = [(i, self._target(c.strip()), c.strip()) for i, c in enumerate(cells)]
+                header = [h for h in header if h[1] is not None]
+                continue
+            row: dict[str, float] = {}
+            for i, name, column in header:
+                raw_value = cells[i] if i < len(cells) else None
+                value = _parse_value(raw_value, column, line_no)
+                if value is not None:
+                    row[name] = value
+            yield row
+
+    def _iter_ndjson(self, start: int = 0) -> Iterator[dict[str, float]]:
+        for line_no, raw in enumerate(_mapped_lines(self.path), 1):
+            if not raw.strip():
+                continue
+            if start:
+                start -= 1
+                continue
+            record = json.loads(raw)
+            row: dict[str, float] = {}
+            for column, raw_value in record.items():
+                name = self._target(column)
+                if name is None:
+                    continue
+                value = _parse_value(raw_value, column, line_no)
+                if value is not None:
+                    row[name] = value
+            yield row
+
+    def _iter_binary(self, start: int = 0) -> Iterator[dict[str, float]]:
+        # An empty file holds no rows, as for empty CSV and NDJSON traces;
+        # mmap cannot map it.
+        if self.path.stat().st_size == 0:
+            return
+        with open(self.path, "rb") as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            names, offset = _read_binary_header(mm, self.path)
+            targets = [self._target(n) for n in names]
+            record = struct.Struct(f"<{len(names)}d")
+            usable = (len(mm) - offset) // record.size * record.size
+            # Fixed-size records: skipping rows is a seek.
+            skipped = min(start * record.size, usable)
+            body = memoryview(mm)[offset + skipped:offset + usable]
+            records = record.iter_unpack(body)
+            try:
+                for values in records:
+                    yield {
+                        name: value
+                        for name, value in zip(targets, values)
+                        if name is not None and not math.isnan(value)
+                    }
+            finally:
+                # The unpack iterator pins the mapping; drop it before unmapping.
+                del records
+                body.release()
+
+    def __iter__(self) -> Iterator[dict[str, float]]:
+        return self.rows()
+
+    def rows(self, start: int = 0) -> Iterator[dict[str, float]]:
+        """Rows from the `start`-th on; skipped rows are not decoded."""
+        if self.format == "csv":
+            return self._iter_csv(start)
+        if self.format == "ndjson":
+            return self._iter_ndjson(start)
+        return self._iter_binary(start)
+
+    def chunks(self, chunk_size: int = DEFAULT_CHUNK_SIZE, start: int = 0) -> Iterator[list[dict[str, float]]]:
+        chunk: list[dict[str, float]] = []
+        for row in self.rows(start):
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+def _read_binary_header(buf, path: Path) -> tuple[list[str], int]:
+    if buf[:len(TRACE_MAGIC)] != TRACE_MAGIC:
+        raise ValueError(f"'{path}' is not an IoTFlow binary trace")
+    offset = len(TRACE_MAGIC)
+    try:
+        (count,) = _COUNT.unpack_from(buf, offset)
+        offset += _COUNT.size
+        names: list[str] = []
+        for _ in range(count):
+            (length,) = _COUNT.unpack_from(buf, offset)
+            offset += _COUNT.size
+            if offset + length > len(buf):
+                raise struct.error("name past end of file")
+            names.append(bytes(buf[offset:offset + length]).decode("utf-8"))
+            offset += length
+    except struct.error:
+        raise ValueError(f"'{path}' has a truncated binary trace header") from None
+    return names, offset
+
+
+def open_trace(
+    path,
+    columns: Optional[dict[str, str]] = None,
+    sensors: Optional[Iterable[str]] = None,
+    format: Optional[str] = None,
+) -> Trace:
+    """
+    Open a recorded trace for replay.
+
+    `columns` maps trace column names to sensor names; columns that are not
+    mapped keep their own name. When `sensors` is given, columns that do not
+    resolve to one of those sensors are skipped without being parsed.
+    """
+    path = Path(path)
+    fmt = format or detect_format(path)
+    if fmt not in TRACE_FORMATS:
+        raise ValueError(f"Unknown trace format '{fmt}'. Supported: {list(TRACE_FORMATS)}")
+    return Trace(
+        path=path,
+        format=fmt,
+        columns=dict(columns or {}),
+        sensors=frozenset(sensors) if sensors is not None else None,
+    )
+
+
+def write_binary_trace(path, columns: list[str], rows: Iterable[dict[str, float]]) -> int:
+    """
+    Write rows to the compact binary trace format.
+
+    The file holds a magic header, the column names and then one
+    little-endian float64 per column per row, with NaN marking a missing
+    reading. Returns the number of rows written.
+    """
+    record = struct.Struct(f"<{len(columns)}d")
+    count = 0
+    with open(path, "wb") as f:
+        f.write(TRACE_MAGIC)
+        f.write(_COUNT.pack(len(columns)))
+        for name in columns:
+            encoded = name.encode("utf-8")
+            f.write(_COUNT.pack(len(encoded)))
+            f.write(encoded)
+        for row in rows:
+            f.write(record.pack(*(row.get(c, math.nan) for c in columns)))
+            count += 1
+    return count
+
+
+def replay_overrides(
+    trace: Trace,
+    sensor_overrides: Optional[dict[str, float]] = None,
+    missing: str = "simulate",
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    start: int = 0,
+    held: Optional[dict[str, float]] = None,
+) -> Iterator[dict[str, float]]:
+    """
+    Turn trace rows into per-cycle sensor overrides.
+
+    With `missing="simulate"` a sensor absent from a row gets a simulated
+    reading; with `missing="hold"` it keeps the last value seen in the trace.
+    Fixed `sensor_overrides` always win over trace values.
+
+    `start` skips that many rows (to resume a run); `held` then gives the
+    values the "hold" policy had reached before them.
+    """
+    if missing not in MISSING_POLICIES:
+        raise ValueError(f"Unknown missing-value policy '{missing}'. Supported: {list(MISSING_POLICIES)}")
+    held = dict(held or {})
+    for chunk in trace.chunks(chunk_size, start):
+        for row in chunk:
+            if missing == "hold":
+                held.update(row)
+                overrides = dict(held)
+            else:
+                overrides = row
+            if sensor_overrides:
+                overrides.update(sensor_overrides)
+            yield overrides
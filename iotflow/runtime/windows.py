@@ -0,0 +1,131 @@
+from collections import deque
+from typing import Optional
+
+AGGREGATES = ("avg", "max", "min", "delta")
+
+
+class SensorWindow:
+    """
+    Fixed-size ring buffer over the last `size` readings of one sensor.
+
+    Every aggregate is O(1) per pushed reading: the average comes from a
+    running sum, min and max from monotonic deques and delta from the ring
+    head and tail. Until the window has filled, aggregates cover the readings
+    seen so far.
+    """
+
+    def __init__(self, size: int) -> None:
+        if size < 1:
+            raise ValueError("Window size must be at least 1")
+        self.size = size
+        self._ring = [0.0] * size
+        self._head = 0
+        self.count = 0
+        self.pushed = 0
+        self._sum = 0.0
+        self._min: deque = deque()
+        self._max: deque = deque()
+
+    def push(self, value: float) -> None:
+        pos = self.pushed
+        if self.count == self.size:
+            self._sum -= self._ring[self._head]
+        else:
+            self.count += 1
+        self._ring[self._head] = value
+        self._head = (self._head + 1) % self.size
+        self._sum += value
+        self.pushed += 1
+        if self._head == 0:
+            # Re-derive the sum once per lap so float drift cannot accumulate.
+            self._sum = sum(self._ring[:self.count])
+
+        oldest = pos - self.size + 1
+        while self._min and self._min[-1][1] >= value:
+            self._min.pop()
+        self._min.append((pos, value))
+        while self._min[0][0] < oldest:
+            self._min.popleft()
+        while self._max and self._max[-1][1] <= value:
+            self._max.pop()
+        self._max.append((pos, value))
+        while self._max[0][0] < oldest:
+            self._max.popleft()
+
+    def snapshot(self) -> dict:
+        return {
+            "ring": list(self._ring),
+            "head": self._head,
+            "count": self.count,
+            "pushed": self.pushed,
+            "sum": self._sum,
+            "min": [list(entry) for entry in self._min],
+            "max": [list(entry) for entry in self._max],
+        }
+
+    def restore(self, state: dict) -> None:
+        self._ring = list(state["ring"])
+        self._head = state["head"]
+        self.count = state["count"]
+        self.pushed = state["pushed"]
+        self._sum = state["sum"]
+        self._min = deque(tuple(entry) for entry in state["min"])
+        self._max = deque(tuple(entry) for entry in state["max"])
+
+    def avg(self) -> Optional[float]:
+        return self._sum / self.count if self.count else None
+
+    def min(self) -> Optional[float]:
+        return self._min[0][1] if self.count else None
+
+    def max(self) -> Optional[float]:
+        return self._max[0][1] if self.count else None
+
+    def delta(self) -> Optional[float]:
+        if not self.count:
+            return None
+        newest = self._ring[self._head - 1]
+        oldest = self._ring[self._head if self.count == self.size else 0]
+        return newest - oldest
+
+
+class WindowBank:
+    """
+    The set of windows a rule base needs, keyed by (sensor, size).
+
+    Rules that aggregate the same sensor over the same window share one
+    `SensorWindow`, so each reading is pushed once per distinct window no
+    matter how many rules use it.
+
+    A bank built with `inherited` (the windows of a previous bank, on hot
+    reload) hands those windows out again, contents included, instead of
+    starting empty ones.
+    """
+
+    def __init__(self, inherited: Optional[dict[tuple[str, int], SensorWindow]] = None) -> None:
+        self.windows: dict[tuple[str, int], SensorWindow] = {}
+        self._inherited = inherited or {}
+
+    def __len__(self) -> int:
+        return len(self.windows)
+
+    def get(self, sensor_name: str, size: int) -> SensorWindow:
+        key = (sensor_name, size)
+        window = self.windows.get(key)
+        if window is None:
+            window = self._inherited.get(key) or SensorWindow(size)
+            self.windows[key] = window
+        return window
+
+    def snapshot(self) -> list:
+        return [[sensor_name, size, window.snapshot()] for (sensor_name, size), window in self.windows.items()]
+
+    def restore(self, state: list) -> None:
+        for sensor_name, size, window_state in state:
+            self.get(sensor_name, size).restore(window_state)
+
+    def push(self, readings: dict[str, float]) -> None:
+        for (sensor_name, _), window in self.windows.items():
+            value = readings.get(sensor_name)
+            if value is not None:
+                window.push(value)
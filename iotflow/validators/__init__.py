@@ -1,7 +1,21 @@
 # This file marks the validators package for IoTFlow DSL.
 
+from .errors import ModelValidationError, as_textx_processor
 from .device_reference_validator import validate_device_references, register_validators
-from .rule_validator import validate_rule_logic, register_rule_validators
+from .rule_validator import (
+    validate_rule_logic, validate_duplicate_rule_names, validate_conflicting_rules,
+    register_rule_validators,
+)
 
-__all__ = ["validate_device_references", "register_validators", 
-           "validate_rule_logic", "register_rule_validators"]
+# Semantic checks every model goes through, in the order they run.
+MODEL_VALIDATORS = (
+    validate_device_references,
+    validate_rule_logic,
+    validate_duplicate_rule_names,
+    validate_conflicting_rules,
+)
+
+__all__ = ["ModelValidationError", "as_textx_processor", "MODEL_VALIDATORS",
+           "validate_device_references", "register_validators",
+           "validate_rule_logic", "validate_duplicate_rule_names",
+           "validate_conflicting_rules", "register_rule_validators"]
@@ -2,22 +2,28 @@
 Device reference validator for IoTFlow DSL.
 
 This module implements semantic validation to ensure that rules reference
-only existing sensors and actuators defined in the model.
+only existing sensors and actuators, defined in the model or in a file it
+imports.
 """
 
-from textx import TextXSemanticError
+from iotflow.model import iter_conditions, iter_imported_devices
+from iotflow.validators.errors import ModelValidationError, as_textx_processor
 
 
 def validate_device_references(model, metamodel):
     """
     Validate that all device references in rules point to existing devices.
+
+    References resolve to the model's own devices first, then to those of
+    its imports. A model without rules is a device catalog, so its devices
+    are not reported as unused.
     
     Args:
         model: Parsed IoTFlow model object
         metamodel: The metamodel instance (required by textX processor interface)
         
     Raises:
-        TextXSemanticError: If a rule references a non-existing sensor or actuator
+        ModelValidationError: If a rule references a non-existing sensor or actuator
     """
     # Collect all defined sensor and actuator names, checking for duplicates
     sensor_names = set()
@@ -27,23 +33,48 @@ def validate_device_references(model, metamodel):
         element_type = element.__class__.__name__
         if element_type == 'Sensor':
             if element.name in sensor_names:
-                raise TextXSemanticError(
+                raise ModelValidationError(
                     f"Duplicate sensor name '{element.name}'. "
                     f"Each sensor must have a unique name."
                 )
             sensor_names.add(element.name)
         elif element_type == 'Actuator':
             if element.name in actuator_names:
-                raise TextXSemanticError(
+                raise ModelValidationError(
                     f"Duplicate actuator name '{element.name}'. "
                     f"Each actuator must have a unique name."
                 )
             actuator_names.add(element.name)
 
+    # Devices of imported files, by name; local definitions may not hide them
+    imported_sensors = {}
+    imported_actuators = {}
+    # Imported devices a processed model already links into its elements
+    linked = {id(element) for element in model.elements}
+    for imp, device in iter_imported_devices(model):
+        if id(device) in linked:
+            continue
+        kind = device.__class__.__name__
+        names, local = (
+            (imported_sensors, sensor_names) if kind == 'Sensor' else (imported_actuators, actuator_names)
+        )
+        if device.name in local:
+            raise ModelValidationError(
+                f"Duplicate {kind.lower()} name '{device.name}': also imported from '{imp.path}'. "
+                f"Each {kind.lower()} must have a unique name."
+            )
+        other = names.get(device.name)
+        if other is not None and other[1] is not device:
+            raise ModelValidationError(
+                f"Duplicate {kind.lower()} name '{device.name}': imported from both "
+                f"'{other[0].path}' and '{imp.path}'."
+            )
+        names[device.name] = (imp, device)
+
     # Check for name collisions between sensors and actuators
-    overlap = sensor_names & actuator_names
+    overlap = (sensor_names | set(imported_sensors)) & (actuator_names | set(imported_actuators))
     if overlap:
-        raise TextXSemanticError(
+        raise ModelValidationError(
             f"Name collision between sensor and actuator: {sorted(overlap)}. "
             f"Sensors and actuators must have distinct names."
         )
@@ -53,8 +84,8 @@ def validate_device_references(model, metamodel):
     referenced_actuators = set()
     for element in model.elements:
         if element.__class__.__name__ == 'Rule':
-            if hasattr(element, 'when_clause') and hasattr(element.when_clause, 'condition'):
-                condition = element.when_clause.condition
+            # Compound conditions may reference several sensors
+            for condition in iter_conditions(element.when_clause.condition):
                 if hasattr(condition, 'sensor_ref') and hasattr(condition.sensor_ref, 'sensor_name'):
                     referenced_sensors.add(condition.sensor_ref.sensor_name)
             if hasattr(element, 'then_clause') and hasattr(element.then_clause, 'action'):
@@ -62,8 +93,9 @@ def validate_device_references(model, metamodel):
                 if hasattr(action, 'actuator_ref') and hasattr(action.actuator_ref, 'actuator_name'):
                     referenced_actuators.add(action.actuator_ref.actuator_name)
 
-    unused_sensors = sensor_names - referenced_sensors
-    unused_actuators = actuator_names - referenced_actuators
+    has_rules = any(element.__class__.__name__ == 'Rule' for element in model.elements)
+    unused_sensors = sensor_names - referenced_sensors if has_rules else set()
+    unused_actuators = actuator_names - referenced_actuators if has_rules else set()
     if unused_sensors:
         import warnings
         warnings.warn(
@@ -79,14 +111,16 @@ def validate_device_references(model, metamodel):
             stacklevel=2,
         )
     
+    sensor_names |= set(imported_sensors)
+    actuator_names |= set(imported_actuators)
+
     # Validate references in rules
     for element in model.elements:
         if element.__class__.__name__ == 'Rule':
             rule_name = element.name
             
-            # Check sensor reference in when clause
-            if hasattr(element, 'when_clause') and hasattr(element.when_clause, 'condition'):
-                condition = element.when_clause.condition
+            # Check every sensor reference in the when clause
+            for condition in iter_conditions(element.when_clause.condition):
                 if hasattr(condition, 'sensor_ref') and hasattr(condition.sensor_ref, 'sensor_name'):
                     referenced_sensor = condition.sensor_ref.sensor_name
                     if referenced_sensor not in sensor_names:
@@ -96,7 +130,7 @@ def validate_device_references(model, metamodel):
                             pos = condition.sensor_ref._tx_position
                             pos_info = f" at position {pos}"
                         
-                        raise TextXSemanticError(
+                        raise ModelValidationError(
                             f"Unknown sensor '{referenced_sensor}' referenced in rule '{rule_name}'{pos_info}. "
                             f"Available sensors: {sorted(sensor_names) if sensor_names else 'none'}"
                         )
@@ -113,7 +147,7 @@ def validate_device_references(model, metamodel):
                             pos = action.actuator_ref._tx_position
                             pos_info = f" at position {pos}"
                         
-                        raise TextXSemanticError(
+                        raise ModelValidationError(
                             f"Unknown actuator '{referenced_actuator}' referenced in rule '{rule_name}'{pos_info}. "
                             f"Available actuators: {sorted(actuator_names) if actuator_names else 'none'}"
                         )
@@ -127,4 +161,4 @@ def register_validators(metamodel):
         metamodel: textX metamodel instance
     """
     # Register the device reference validator as a model processor
-    metamodel.register_model_processor(validate_device_references)
\ No newline at end of file
+    metamodel.register_model_processor(as_textx_processor(validate_device_references))
\ No newline at end of file
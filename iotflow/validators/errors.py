@@ -0,0 +1,34 @@
+"""
+Validation errors for IoTFlow DSL.
+
+Validators raise ModelValidationError so they can run on models that were
+not built by textX. When they run as textX model processors the error is
+re-raised as TextXSemanticError.
+"""
+
+from functools import wraps
+
+
+class ModelValidationError(ValueError):
+    """A model is structurally valid but semantically wrong."""
+
+
+def as_textx_processor(validator):
+    """
+    Wrap a validator so it reports errors the way textX model processors do.
+
+    Args:
+        validator: Function taking (model, metamodel) that may raise
+            ModelValidationError
+
+    Returns:
+        Model processor raising TextXSemanticError instead
+    """
+    @wraps(validator)
+    def processor(model, metamodel):
+        try:
+            validator(model, metamodel)
+        except ModelValidationError as e:
+            from textx import TextXSemanticError
+            raise TextXSemanticError(str(e)) from e
+    return processor
@@ -5,7 +5,11 @@ This module implements semantic validation to ensure rule conditions
 and actions are structurally correct and logically valid.
 """
 
-from textx import TextXSemanticError
+from bisect import bisect_right
+from collections import defaultdict
+
+from iotflow.model import iter_conditions
+from iotflow.validators.errors import ModelValidationError, as_textx_processor
 
 
 # Valid operators for condition comparisons
@@ -21,6 +25,9 @@ VALID_ACTIONS = {
 # Valid sensor attributes that can be accessed
 VALID_SENSOR_ATTRIBUTES = {"value"}
 
+# Valid windowed aggregate functions
+VALID_AGGREGATES = {"avg", "max", "min", "delta"}
+
 
 def validate_rule_logic(model, metamodel):
     """
@@ -32,15 +39,14 @@ def validate_rule_logic(model, metamodel):
         metamodel: The metamodel instance (required by textX processor interface)
         
     Raises:
-        TextXSemanticError: If a rule has invalid logic
+        ModelValidationError: If a rule has invalid logic
     """
     for element in model.elements:
         if element.__class__.__name__ == 'Rule':
             rule_name = element.name
             
-            # Validate condition in when clause
-            if hasattr(element, 'when_clause') and hasattr(element.when_clause, 'condition'):
-                condition = element.when_clause.condition
+            # Validate every comparison in when clause (compound conditions have several)
+            for condition in iter_conditions(element.when_clause.condition):
                 
                 # 1. Validate operator
                 if hasattr(condition, 'operator'):
@@ -54,7 +60,7 @@ def validate_rule_logic(model, metamodel):
                             pos = condition._tx_position
                             pos_info = f" at position {pos}"
                         
-                        raise TextXSemanticError(
+                        raise ModelValidationError(
                             f"Invalid operator '{operator}' in rule '{rule_name}'{pos_info}. "
                             f"Valid operators: {sorted(VALID_OPERATORS)}"
                         )
@@ -69,16 +75,40 @@ def validate_rule_logic(model, metamodel):
                             pos = condition._tx_position
                             pos_info = f" at position {pos}"
                         
-                        raise TextXSemanticError(
+                        raise ModelValidationError(
                             f"Condition value must be numeric in rule '{rule_name}'{pos_info}. "
                             f"Found: {type(value).__name__} '{value}'"
                         )
+
+                # 3. Validate windowed aggregate
+                aggregate = getattr(condition, 'aggregate', None)
+                if aggregate:
+                    pos_info = ""
+                    if hasattr(condition, '_tx_position'):
+                        pos = condition._tx_position
+                        pos_info = f" at position {pos}"
+
+                    if aggregate not in VALID_AGGREGATES:
+                        raise ModelValidationError(
+                            f"Invalid aggregate '{aggregate}' in rule '{rule_name}'{pos_info}. "
+                            f"Valid aggregates: {sorted(VALID_AGGREGATES)}"
+                        )
+                    if getattr(condition, 'window', 0) < 1:
+                        raise ModelValidationError(
+                            f"Window size must be at least 1 in rule '{rule_name}'{pos_info}. "
+                            f"Found: {condition.window}"
+                        )
+                    if aggregate == 'delta' and condition.window < 2:
+                        raise ModelValidationError(
+                            f"delta() needs a window of at least 2 readings in rule "
+                            f"'{rule_name}'{pos_info}."
+                        )
             
             # Validate action in then clause
             if hasattr(element, 'then_clause') and hasattr(element.then_clause, 'action'):
                 action = element.then_clause.action
                 
-                # 3. Validate action name
+                # 4. Validate action name
                 if hasattr(action, 'action_name'):
                     action_name = action.action_name
                     if action_name not in VALID_ACTIONS:
@@ -88,7 +118,7 @@ def validate_rule_logic(model, metamodel):
                             pos = action._tx_position
                             pos_info = f" at position {pos}"
                         
-                        raise TextXSemanticError(
+                        raise ModelValidationError(
                             f"Invalid actuator action '{action_name}' in rule '{rule_name}'{pos_info}. "
                             f"Valid actions: {sorted(VALID_ACTIONS)}"
                         )
@@ -110,11 +140,15 @@ def validate_conflicting_rules(model, metamodel):
     """
     Detect rules that may conflict: two rules targeting the same actuator
     with opposite actions where their conditions can overlap.
+
+    Only single-comparison rules are compared; compound conditions are
+    skipped.
     """
     rules = []
     for element in model.elements:
         if element.__class__.__name__ == 'Rule':
             if (hasattr(element, 'when_clause') and hasattr(element.when_clause, 'condition')
+                    and element.when_clause.condition.__class__.__name__ == 'Condition'
                     and hasattr(element, 'then_clause') and hasattr(element.then_clause, 'action')):
                 cond = element.when_clause.condition
                 act = element.then_clause.action
@@ -126,13 +160,18 @@ def validate_conflicting_rules(model, metamodel):
                 action_name = act.action_name if hasattr(act, 'action_name') else None
                 rules.append((element.name, sensor_name, op_str, value, actuator_name, action_name))
 
+    # Only rules on the same actuator and sensor with opposite actions can
+    # conflict, so each rule is paired with the later rules in that group
+    # instead of with every other rule.
+    groups = defaultdict(list)
+    for i, (_, sensor, _, _, actuator, action) in enumerate(rules):
+        groups[(actuator, sensor, action)].append(i)
+
     import warnings
     for i, (name_a, sensor_a, op_a, val_a, act_a, action_a) in enumerate(rules):
-        for name_b, sensor_b, op_b, val_b, act_b, action_b in rules[i + 1:]:
-            if act_a != act_b or sensor_a != sensor_b:
-                continue
-            if OPPOSITE_ACTIONS.get(action_a) != action_b:
-                continue
+        candidates = groups.get((act_a, sensor_a, OPPOSITE_ACTIONS.get(action_a)), [])
+        for j in candidates[bisect_right(candidates, i):]:
+            name_b, _, op_b, val_b, _, action_b = rules[j]
             if _conditions_can_overlap(op_a, val_a, op_b, val_b):
                 warnings.warn(
                     f"Potentially conflicting rules: '{name_a}' and '{name_b}' "
@@ -176,7 +215,7 @@ def validate_duplicate_rule_names(model, metamodel):
     for element in model.elements:
         if element.__class__.__name__ == 'Rule':
             if element.name in rule_names:
-                raise TextXSemanticError(
+                raise ModelValidationError(
                     f"Duplicate rule name '{element.name}'. "
                     f"Each rule must have a unique name."
                 )
@@ -190,6 +229,6 @@ def register_rule_validators(metamodel):
     Args:
         metamodel: textX metamodel instance
     """
-    metamodel.register_model_processor(validate_rule_logic)
-    metamodel.register_model_processor(validate_duplicate_rule_names)
-    metamodel.register_model_processor(validate_conflicting_rules)
\ No newline at end of file
+    metamodel.register_model_processor(as_textx_processor(validate_rule_logic))
+    metamodel.register_model_processor(as_textx_processor(validate_duplicate_rule_names))
+    metamodel.register_model_processor(as_textx_processor(validate_conflicting_rules))
\ No newline at end of file
@@ -0,0 +1,79 @@
+import pytest
+
+from iotflow.parser.parse import parse_str
+from iotflow.runtime.actuation import RulePolicy
+from iotflow.runtime.runner import run_simulation
+
+
+DSL = r'''
+sensor Temp { type: DHT22 unit: celsius }
+actuator Fan { type: relay }
+rule CoolDown { when Temp.value > 30 then Fan.turn_on }
+rule StopFan { when Temp.value < 20 then Fan.turn_off }
+'''
+
+
+def _run(tmp_path, values, **kwargs):
+    path = tmp_path / "trace.csv"
+    path.write_text("Temp\n" + "\n".join(str(v) for v in values) + "\n")
+    return run_simulation(parse_str(DSL), trace=path, edge_triggered=True, **kwargs)
+
+
+def test_sustained_condition_emits_once(tmp_path):
+    result = _run(tmp_path, [35, 36, 37, 38])
+    assert result.total_actions_triggered == 1
+    assert result.commands_suppressed == 3
+    assert result.rules_passed == 4
+    assert [c.actions_triggered for c in result.cycles] == [1, 0, 0, 0]
+    assert result.cycles[1].rule_executions[0].suppressed is True
+    assert result.index.actuator_command_count("Fan") == 1
+
+
+def test_opposite_action_and_new_edge_emit(tmp_path):
+    result = _run(tmp_path, [35, 15, 35, 25, 35])
+    assert [c.actions_triggered for c in result.cycles] == [1, 1, 1, 0, 1]
+
+
+def test_hysteresis_ignores_noise_around_threshold(tmp_path):
+    values = [31, 29.5, 31, 29.5, 31]
+    plain = _run(tmp_path, values)
+    assert plain.total_actions_triggered == 3
+
+    damped = _run(tmp_path, values, rule_policies={"CoolDown": RulePolicy(hysteresis=2.0)})
+    assert damped.total_actions_triggered == 1
+
+
+def test_min_hold_blocks_opposite_action(tmp_path):
+    result = _run(
+        tmp_path, [35, 15, 15, 15], rule_policies={"CoolDown": RulePolicy(min_hold=3)},
+    )
+    assert [c.actions_triggered for c in result.cycles] == [1, 0, 0, 1]
+
+
+def test_default_mode_emits_every_cycle(tmp_path):
+    path = tmp_path / "trace.csv"
+    path.write_text("Temp\n35\n36\n")
+    result = run_simulation(parse_str(DSL), trace=path)
+    assert result.total_actions_triggered == 2
+    assert result.commands_suppressed == 0
+
+
+def test_policy_for_unknown_rule_raises(tmp_path):
+    with pytest.raises(ValueError):
+        _run(tmp_path, [35], rule_policies={"Nope": RulePolicy()})
+
+
+def test_hysteresis_on_compound_rule_raises(tmp_path):
+    source = DSL + "rule Both { when Temp.value > 30 and Temp.value < 40 then Fan.turn_on }\n"
+    path = tmp_path / "trace.csv"
+    path.write_text("Temp\n35\n")
+    with pytest.raises(ValueError, match="single-comparison"):
+        run_simulation(
+            parse_str(source), trace=path, edge_triggered=True,
+            rule_policies={"Both": RulePolicy(hysteresis=1.0)},
+        )
+    result = run_simulation(
+        parse_str(source), trace=path, edge_triggered=True,
+        rule_policies={"Both": RulePolicy(min_hold=2)},
+    )
+    assert result.total_actions_triggered == 2
@@ -0,0 +1,94 @@
+import math
+import random
+
+import pytest
+
+from iotflow.parser.parse import parse_str
+from iotflow.runtime.analytic import FiringAnalysis, analyze_model
+from iotflow.runtime.runner import run_simulation
+from iotflow.runtime.sinks import AggregateSink
+
+
+DSL = r'''
+sensor Temp { type: DHT22 unit: celsius }
+sensor Hum { type: DHT22 unit: percent }
+sensor Door { type: reed unit: boolean }
+actuator Fan { type: relay }
+actuator Alarm { type: buzzer }
+actuator Lamp { type: relay }
+rule Hot { when Temp.value > 30 then Fan.turn_on }
+rule VeryHot { when Temp.value >= 42.5 then Fan.turn_on }
+rule Exactly { when Temp.value == 20 then Lamp.turn_on }
+rule Open { when Door.value == 1 then Alarm.turn_on }
+rule Closed { when Door.value != 1 then Alarm.turn_off }
+rule Muggy { when Temp.value > 30 and Hum.value > 70 then Fan.turn_on }
+rule Band { when Temp.value > 20 and Temp.value < 25 or Hum.value < 10 then Lamp.turn_on }
+rule Sustained { when Temp.value > 40 for 3 cycles then Alarm.turn_on }
+rule Peak { when max(Hum, 4) > 90 then Lamp.turn_off }
+rule Trend { when avg(Temp, 3) > 35 then Lamp.turn_off }
+'''
+
+
+def _analysis():
+    return FiringAnalysis(parse_str(DSL))
+
+
+def test_single_thresholds_are_exact():
+    analysis = _analysis()
+    # Celsius readings are uniform on 15..45 rounded to 0.01, so "> 30"
+    # means u >= 30.005.
+    assert analysis.rule("Hot").probability == pytest.approx((45 - 30.005) / 30)
+    assert analysis.rule("VeryHot").probability == pytest.approx((45 - 42.495) / 30)
+    assert analysis.rule("Exactly").probability == pytest.approx(0.01 / 30)
+    assert analysis.rule("Open").probability == 0.5
+    assert analysis.rule("Closed").probability == 0.5
+    assert analysis.rule("Hot").exact
+
+
+def test_combinations():
+    analysis = _analysis()
+    hot = analysis.rule("Hot").probability
+    humid = 1 - (70.005 - 0) / 100
+    assert analysis.rule("Muggy").probability == pytest.approx(hot * humid)
+    band = (24.995 - 20.005) / 30
+    dry = 9.995 / 100
+    assert analysis.rule("Band").probability == pytest.approx(1 - (1 - band) * (1 - dry))
+    assert analysis.rule("Sustained").probability == pytest.approx(((45 - 40.005) / 30) ** 3)
+    assert analysis.rule("Peak").probability == pytest.approx(1 - (90.005 / 100) ** 4)
+    # VeryHot implies Hot: conditioning on Temp keeps the union exact.
+    assert analysis.any_fires(["Hot", "VeryHot"]).probability == pytest.approx(hot)
+    assert analysis.all_fire(["Hot", "VeryHot"]).probability == pytest.approx(
+        analysis.rule("VeryHot").probability
+    )
+    assert analysis.all_fire(["Open", "Closed"]).probability == 0.0
+    assert analysis.any_fires(["Open", "Closed"]).probability == 1.0
+
+
+def test_approximations_are_flagged():
+    analysis = _analysis()
+    assert not analysis.rule("Trend").exact
+    # Sustained reads Temp over time, so it is not independent of Hot.
+    assert not analysis.any_fires(["Hot", "Sustained"]).exact
+    assert analysis.any_fires(["Hot", "Open"]).exact
+
+
+def test_matches_sampled_run():
+    model = parse_str(DSL)
+    cycles = 40_000
+    random.seed(1)
+    result = run_simulation(model, cycles=cycles, sink=AggregateSink())
+    report = analyze_model(model)
+    for row in report.rules:
+        sampled = result.index.fire_count(row.name) / cycles
+        # Streaks and windows make cycles correlated; allow for it.
+        sigma = math.sqrt(max(row.probability * (1 - row.probability), 1e-6) / cycles)
+        assert abs(sampled - row.probability) < 6 * sigma + 0.003, row.name
+
+
+def test_actuators_and_overrides():
+    report = analyze_model(parse_str(DSL), sensor_overrides={"Door": 1.0, "Temp": 31.0})
+    rules = {row.name: row.probability for row in report.rules}
+    actuators = {row.name: row.probability for row in report.actuators}
+    assert rules["Open"] == 1.0 and rules["Closed"] == 0.0
+    assert actuators["Fan"] == 1.0
+    assert actuators["Alarm"] == 1.0
@@ -0,0 +1,98 @@
+import json
+import os
+from dataclasses import replace
+
+import pytest
+
+from iotflow.generators import batch, model_to_json_string
+from iotflow.generators.batch import MANIFEST_NAME, generate_tree
+from iotflow.parser.parse import parse_str
+
+
+def _model(threshold):
+    return (
+        "sensor Temp { type: DHT22 unit: celsius }\n"
+        "actuator Fan { type: relay }\n"
+        f"rule Hot {{ when Temp.value > {threshold} then Fan.turn_on }}\n"
+    )
+
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / "models"
+    for i, rel in enumerate(["a.iot", "site/b.iot", "site/zone/c.iot"]):
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(_model(20 + i), encoding="utf-8")
+    return root
+
+
+def test_generates_tree_then_skips_unchanged(tree, tmp_path):
+    out = tmp_path / "out"
+    report = generate_tree(tree, out, targets=["json", "python"], workers=1)
+    assert report.ok and sorted(report.generated) == ["a.iot", "site/b.iot", "site/zone/c.iot"]
+    output = out / "site" / "zone" / "c.json"
+    assert output.read_text(encoding="utf-8") == model_to_json_string(parse_str(_model(22)))
+    assert (out / "site" / "zone" / "c_rules.py").exists()
+    manifest = json.loads((out / MANIFEST_NAME).read_text(encoding="utf-8"))
+    assert set(manifest["models"]) == {"a.iot", "site/b.iot", "site/zone/c.iot"}
+
+    mtime = output.stat().st_mtime_ns
+    report = generate_tree(tree, out, targets=["json", "python"], workers=1)
+    assert report.generated == [] and len(report.skipped) == 3
+    assert output.stat().st_mtime_ns == mtime
+    # Targets generated earlier stay valid for runs asking for fewer.
+    assert generate_tree(tree, out, targets=["json"], workers=1).generated == []
+
+
+def test_regenerates_only_what_changed(tree, tmp_path):
+    out = tmp_path / "out"
+    generate_tree(tree, out, workers=1)
+    (tree / "site" / "b.iot").write_text(_model(99), encoding="utf-8")
+    (out / "a.json").unlink()
+    touched = tree / "site" / "zone" / "c.iot"
+    os.utime(touched, ns=(touched.stat().st_atime_ns, touched.stat().st_mtime_ns + 10**9))
+
+    report = generate_tree(tree, out, workers=1)
+    assert sorted(report.generated) == ["a.iot", "site/b.iot"]
+    assert report.skipped == ["site/zone/c.iot"]
+    assert '"value": 99' in (out / "site" / "b.json").read_text(encoding="utf-8")
+    # The touched model's new stat was recorded, so it is not hashed again.
+    entry = json.loads((out / MANIFEST_NAME).read_text(encoding="utf-8"))["models"]["site/zone/c.iot"]
+    assert entry["mtime_ns"] == touched.stat().st_mtime_ns
+
+
+def test_generator_version_change_regenerates(tree, tmp_path, monkeypatch):
+    out = tmp_path / "out"
+    generate_tree(tree, out, workers=1)
+    monkeypatch.setitem(batch.TARGETS, "json", replace(batch.TARGETS["json"], version=99))
+    assert len(generate_tree(tree, out, workers=1).generated) == 3
+    assert len(generate_tree(tree, out, workers=1, force=True).generated) == 3
+
+
+def test_failed_model_keeps_previous_output(tree, tmp_path):
+    out = tmp_path / "out"
+    generate_tree(tree, out, workers=1)
+    before = (out / "a.json").read_text(encoding="utf-8")
+    (tree / "a.iot").write_text(_model(20).replace("Temp.value", "Ghost.value"), encoding="utf-8")
+
+    report = generate_tree(tree, out, workers=1)
+    assert list(report.failed) == ["a.iot"] and "Unknown sensor 'Ghost'" in report.failed["a.iot"]
+    assert (out / "a.json").read_text(encoding="utf-8") == before
+    assert not list(out.rglob("*.tmp"))
+    manifest = json.loads((out / MANIFEST_NAME).read_text(encoding="utf-8"))
+    assert "a.iot" not in manifest["models"]
+    assert list(generate_tree(tree, out, workers=1).failed) == ["a.iot"]
+
+
+def test_single_model_and_worker_pool(tree, tmp_path):
+    generate_tree(tree / "site" / "zone" / "c.iot", workers=1)
+    assert (tree / "site" / "zone" / "c.json").exists()
+    report = generate_tree(tree / "site" / "zone" / "c.iot", workers=1)
+    assert report.skipped == ["c.iot"]
+
+    out = tmp_path / "pooled"
+    report = generate_tree(tree, out, targets=["ndjson"], workers=2)
+    assert report.ok and len(report.generated) == 3
+    lines = (out / "site" / "b.ndjson").read_text(encoding="utf-8").splitlines()
+    assert json.loads(lines[-1])["condition"]["value"] == 21
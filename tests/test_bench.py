@@ -0,0 +1,63 @@
+import warnings
+
+import pytest
+
+from iotflow.bench import ModelShape, compare, generate_model, run_suite
+from iotflow.parser.parse import parse_str
+from iotflow.runtime.context import build_context
+
+
+def _parse(source):
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        model = parse_str(source)
+    return model, [str(w.message) for w in caught]
+
+
+def test_generated_model_has_requested_shape():
+    shape = ModelShape(sensors=7, actuators=3, rules=40, seed=5)
+    model, _ = _parse(generate_model(shape))
+    ctx = build_context(model)
+    assert (len(ctx.sensors), len(ctx.actuators), len(ctx.rules)) == (7, 3, 40)
+    assert generate_model(shape) == generate_model(ModelShape(sensors=7, actuators=3, rules=40, seed=5))
+
+
+def test_conflict_density_controls_conflict_warnings():
+    _, calm = _parse(generate_model(ModelShape(rules=60, conflict_density=0.0)))
+    _, tense = _parse(generate_model(ModelShape(rules=60, conflict_density=0.5)))
+    assert not [m for m in calm if "conflicting" in m]
+    assert len([m for m in tense if "conflicting" in m]) >= 15
+
+
+def test_repeated_thresholds_reuse_values():
+    source = generate_model(ModelShape(sensors=1, rules=200, thresholds="repeated"))
+    thresholds = {line.split()[-4] for line in source.splitlines() if line.startswith("rule")}
+    assert len(thresholds) <= 8
+
+
+def test_invalid_shape_rejected():
+    with pytest.raises(ValueError):
+        generate_model(ModelShape(thresholds="normal"))
+    with pytest.raises(ValueError):
+        generate_model(ModelShape(conflict_density=1.5))
+
+
+def test_suite_and_baseline_comparison():
+    shape = ModelShape(sensors=3, actuators=2, rules=10)
+    results = run_suite(shape, cycles=20, repeat=1)
+    names = set(results["benchmarks"])
+    assert {"parse", "load.json", "load.ndjson", "context", "evaluate.compiled", "evaluate.network", "render"} <= names
+    assert "validate.conflicting_rules" in names
+
+    rows = compare(results, results)
+    assert all(row["ratio"] == 1.0 and not row["regressed"] for row in rows)
+
+    slower = {**results, "benchmarks": {
+        name: {**entry, "seconds_per_op": entry["seconds_per_op"] * 2}
+        for name, entry in results["benchmarks"].items()
+    }}
+    assert all(row["regressed"] for row in compare(slower, results, tolerance=0.5))
+    assert not any(row["regressed"] for row in compare(slower, results, tolerance=1.5))
+
+    with pytest.raises(ValueError):
+        compare(run_suite(ModelShape(sensors=3, actuators=2, rules=11), cycles=20, repeat=1), results)
@@ -0,0 +1,155 @@
+import json
+import random
+
+import pytest
+
+from iotflow.parser.parse import parse_str
+from iotflow.runtime.checkpoint import Checkpoint
+from iotflow.runtime.runner import run_simulation
+from iotflow.runtime.sinks import AggregateSink, InMemorySink, StreamingFileSink
+from iotflow.runtime.trace import write_binary_trace
+
+
+DSL = r'''
+sensor Temp { type: DHT22 unit: celsius }
+sensor Light { type: BH1750 unit: lux }
+actuator Fan { type: relay }
+actuator Lamp { type: relay }
+rule Hot { when Temp.value > 35 for 3 cycles then Fan.turn_on }
+rule Cool { when avg(Temp, 5) < 25 then Fan.turn_off }
+rule Dark { when Light.value < 30000 and not Temp.value > 40 then Lamp.turn_on }
+rule Bright { when Light.value > 60000 or max(Light, 4) > 90000 then Lamp.turn_off }
+'''
+
+
+class CrashingSink(InMemorySink):
+    def __init__(self, at: int) -> None:
+        super().__init__()
+        self.at = at
+
+    def record_fired(self, cycle_number, readings, fired, suppressed=None) -> None:
+        if cycle_number == self.at:
+            raise RuntimeError("simulated crash")
+        super().record_fired(cycle_number, readings, fired, suppressed)
+
+
+def _summary(result):
+    index = result.index
+    return (
+        result.stats,
+        index.rule_fires,
+        index.first_fired,
+        index.last_fired,
+        index.actuator_commands,
+        index.sensors,
+    )
+
+
+def test_resumed_run_matches_uninterrupted(tmp_path):
+    model = parse_str(DSL)
+    options = dict(cycles=600, edge_triggered=True)
+    random.seed(11)
+    expected = run_simulation(model, **options)
+
+    checkpoint = tmp_path / "run.ckpt"
+    random.seed(11)
+    with pytest.raises(RuntimeError):
+        run_simulation(model, sink=CrashingSink(at=250), checkpoint=checkpoint, checkpoint_every=100, **options)
+    assert Checkpoint.load(checkpoint).cycle_number == 200
+
+    random.seed(99)  # Resuming restores the generator; this must not matter.
+    resumed = run_simulation(parse_str(DSL), resume_from=checkpoint, **options)
+    assert _summary(resumed) == _summary(expected)
+    # The sink and the cycle lists only saw the resumed cycles.
+    dark = expected.index.cycles_fired("Dark")
+    assert resumed.index.cycles_fired("Dark") == [n for n in dark if n > 200]
+    assert len(resumed.cycles) == 400
+    assert resumed.cycles[0].cycle_number == 201
+    assert resumed.cycles[0].readings == expected.cycles[200].readings
+
+
+def test_resume_trace_with_hold_policy(tmp_path):
+    trace = tmp_path / "trace.iotb"
+    rng = random.Random(3)
+    rows = []
+    for i in range(300):
+        row = {"Temp": rng.uniform(15, 45)}
+        if i % 7:
+            row["Light"] = rng.uniform(0, 100000)
+        rows.append(row)
+    write_binary_trace(trace, ["Temp", "Light"], rows)
+    model = parse_str(DSL)
+    options = dict(trace=trace, missing="hold", sink=AggregateSink())
+    random.seed(5)  # The first row has no Light reading, so it is simulated.
+    expected = run_simulation(model, **options)
+
+    checkpoint = tmp_path / "run.ckpt"
+    random.seed(5)
+    run_simulation(model, cycles=130, checkpoint=checkpoint, checkpoint_every=65, **options)
+    saved = Checkpoint.load(checkpoint)
+    assert saved.trace_offset == 130
+    assert set(saved.held) == {"Temp", "Light"}
+
+    resumed = run_simulation(model, resume_from=checkpoint, **options)
+    assert resumed.cycle_count == 300
+    assert _summary(resumed) == _summary(expected)
+
+
+def test_resume_rejects_other_model(tmp_path):
+    checkpoint = tmp_path / "run.ckpt"
+    run_simulation(parse_str(DSL), cycles=10, checkpoint=checkpoint, checkpoint_every=5)
+    other = parse_str(DSL.replace("> 35", "> 36"))
+    with pytest.raises(ValueError, match="different model"):
+        run_simulation(other, cycles=20, resume_from=checkpoint)
+    with pytest.raises(ValueError, match="edge-triggered"):
+        run_simulation(parse_str(DSL), cycles=20, edge_triggered=True, resume_from=checkpoint)
+
+
+def test_checkpoint_write_is_atomic(tmp_path):
+    checkpoint = tmp_path / "run.ckpt"
+    run_simulation(parse_str(DSL), cycles=10, checkpoint=checkpoint, checkpoint_every=1)
+    assert [p.name for p in tmp_path.iterdir()] == ["run.ckpt"]
+    assert Checkpoint.load(checkpoint).cycle_number == 10
+
+
+def test_resume_continues_stream_file(tmp_path):
+    model = parse_str(DSL)
+    out = tmp_path / "out.ndjson"
+    checkpoint = tmp_path / "run.ckpt"
+    random.seed(2)
+    expected = run_simulation(model, cycles=50)
+
+    random.seed(2)
+    run_simulation(model, cycles=35, sink=StreamingFileSink(out), checkpoint=checkpoint, checkpoint_every=10)
+    # Cycles 31-35 were written after the checkpoint and are written again.
+    assert len(out.read_text(encoding="utf-8").splitlines()) == 35
+    run_simulation(model, cycles=50, sink=StreamingFileSink(out), resume_from=checkpoint)
+    lines = [json.loads(line) for line in out.read_text(encoding="utf-8").splitlines()]
+    assert [line["cycle_number"] for line in lines] == list(range(1, 51))
+    assert [line["readings"] for line in lines] == [c.readings for c in expected.cycles]
+
+    out.write_text("", encoding="utf-8")
+    with pytest.raises(ValueError, match="before the checkpoint"):
+        run_simulation(model, cycles=50, sink=StreamingFileSink(out), resume_from=checkpoint)
+
+
+@pytest.mark.parametrize("suffix", [".npz", ".arrow", ".parquet"])
+def test_resume_continues_export(tmp_path, suffix):
+    pytest.importorskip("numpy" if suffix == ".npz" else "pyarrow")
+    model = parse_str(DSL)
+    out = tmp_path / f"run{suffix}"
+    checkpoint = tmp_path / "run.ckpt"
+    options = dict(sink=AggregateSink(), export=out)
+    random.seed(6)
+    run_simulation(model, cycles=25, checkpoint=checkpoint, checkpoint_every=20, **options)
+    run_simulation(model, cycles=40, resume_from=checkpoint, **options)
+    if suffix == ".npz":
+        import numpy as np
+        cycles = np.load(out)["cycles"].tolist()
+    elif suffix == ".parquet":
+        import pyarrow.parquet as pq
+        cycles = pq.read_table(str(out)).column("cycle").to_pylist()
+    else:
+        import pyarrow as pa
+        cycles = pa.ipc.open_file(str(out)).read_all().column("cycle").to_pylist()
+    assert cycles == list(range(1, 41))
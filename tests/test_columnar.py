@@ -0,0 +1,44 @@
+from iotflow.parser.parse import parse_str
+from iotflow.runtime.columnar import ColumnarStore, RuleTable
+from iotflow.runtime.context import build_context
+from iotflow.runtime.executor import execute_rules
+from iotflow.runtime.runner import run_simulation
+
+
+DSL = r'''
+sensor Temp { type: DHT22 unit: celsius }
+sensor Humidity { type: DHT22 unit: percent }
+actuator Fan { type: relay }
+actuator Dryer { type: relay }
+rule CoolDown { when Temp.value > 30 then Fan.turn_on }
+rule Dry { when Humidity.value > 80 then Dryer.turn_on }
+'''
+
+
+def test_materialized_cycles_match_execute_rules():
+    model = parse_str(DSL)
+    ctx = build_context(model)
+    table = RuleTable(ctx)
+    store = ColumnarStore(table)
+
+    samples = [{"Temp": 35.0, "Humidity": 50.0}, {"Temp": 20.0, "Humidity": 90.0}]
+    for i, readings in enumerate(samples, 1):
+        store.append(i, readings, table.evaluate(readings))
+
+    assert len(store) == 2
+    for cycle, readings in zip(store, samples):
+        assert cycle.readings == readings
+        assert cycle.rule_executions == execute_rules(ctx.rules, readings)
+        assert cycle.actions_triggered == 1
+    assert store[-1].cycle_number == 2
+    assert [c.cycle_number for c in store[0:1]] == [1]
+
+
+def test_fired_counts_from_bitset():
+    model = parse_str(DSL)
+    result = run_simulation(model, sensor_overrides={"Temp": 35.0, "Humidity": 10.0}, cycles=20)
+    store = result.cycles
+    assert isinstance(store, ColumnarStore)
+    assert store.fired_count() == 20
+    assert store.fired_count(0) == 20
+    assert store.fired_count(1) == 0
@@ -0,0 +1,125 @@
+import warnings
+
+import pytest
+
+from iotflow.generators import model_to_json_string
+from iotflow.model import AndCondition, Condition, NotCondition, OrCondition
+from iotflow.parser.parse import parse_str
+from iotflow.runtime.columnar import RuleTable
+from iotflow.runtime.compound import REORDER_INTERVAL, AllOf, Node
+from iotflow.runtime.context import build_context
+from iotflow.runtime.executor import execute_rules
+from iotflow.runtime.runner import run_simulation
+
+
+DSL = r'''
+sensor Temp { type: DHT22 unit: celsius }
+sensor Humidity { type: DHT22 unit: percent }
+sensor notifier { type: PIR unit: boolean }
+actuator Fan { type: relay }
+actuator Dryer { type: relay }
+actuator Alarm { type: buzzer }
+rule HotAndDry {
+    when Temp.value > 30 and Humidity.value < 40
+    then Fan.turn_on
+}
+rule Damp {
+    when Humidity.value > 80 OR (Temp.value < 10 AND NOT Humidity.value < 50)
+    then Dryer.turn_on
+}
+rule Quiet {
+    when not notifier.value == 1 and Temp.value > 30
+    then Alarm.activate
+}
+'''
+
+
+def _rules(model):
+    return [el for el in model.elements if el.__class__.__name__ == "Rule"]
+
+
+def test_parse_tree_shape():
+    hot, damp, quiet = _rules(parse_str(DSL))
+    assert isinstance(hot.when_clause.condition, AndCondition)
+    assert all(isinstance(op, Condition) for op in hot.when_clause.condition.operands)
+
+    cond = damp.when_clause.condition
+    assert isinstance(cond, OrCondition)
+    inner = cond.operands[1]
+    assert isinstance(inner, AndCondition)
+    assert isinstance(inner.operands[1], NotCondition)
+
+    first = quiet.when_clause.condition.operands[0]
+    assert isinstance(first, NotCondition)
+    assert first.operand.sensor_ref.sensor_name == "notifier"
+
+
+def test_simple_condition_stays_bare():
+    model = parse_str('''
+    sensor Temp { type: DHT22 unit: celsius }
+    actuator Fan { type: relay }
+    rule R { when Temp.value > 30 then Fan.turn_on }
+    ''')
+    condition = _rules(model)[0].when_clause.condition
+    assert isinstance(condition, Condition)
+    assert condition.parent is _rules(model)[0].when_clause
+
+
+@pytest.mark.parametrize("readings,expected", [
+    ({"Temp": 35.0, "Humidity": 20.0, "notifier": 0.0}, [True, False, True]),
+    ({"Temp": 35.0, "Humidity": 90.0, "notifier": 1.0}, [False, True, False]),
+    ({"Temp": 5.0, "Humidity": 60.0, "notifier": 0.0}, [False, True, False]),
+    ({"Temp": 5.0, "Humidity": 45.0, "notifier": 0.0}, [False, False, False]),
+])
+def test_runtime_matches_reference_evaluator(readings, expected):
+    model = parse_str(DSL)
+    result = run_simulation(model, sensor_overrides=readings)
+    assert [r.condition_met for r in result.cycles[0].rule_executions] == expected
+    reference = execute_rules(build_context(model).rules, readings)
+    assert [r.condition_met for r in reference] == expected
+
+
+def test_shared_terms_compile_once():
+    table = RuleTable(build_context(parse_str(DSL)))
+    terms = [key for key in table.compiler.nodes if key[0] == "term"]
+    # Temp > 30 appears in two rules but is a single node.
+    assert len(terms) == 6
+    assert table.rule_sensor_sets[1] == ("Humidity", "Temp")
+
+
+def test_conjunction_puts_most_often_false_term_first():
+    model = parse_str(DSL)
+    table = RuleTable(build_context(model))
+    node = table._nodes[0]
+    assert isinstance(node, AllOf)
+    # Temp > 30 always holds, Humidity < 40 never does.
+    for _ in range(REORDER_INTERVAL):
+        table.evaluate({"Temp": 35.0, "Humidity": 90.0, "notifier": 0.0})
+    assert node.operands[0].sensor_name == "Humidity"
+
+
+def test_unknown_sensor_in_compound_raises():
+    from textx.exceptions import TextXSemanticError
+    dsl = r'''
+    sensor Temp { type: DHT22 unit: celsius }
+    actuator Fan { type: relay }
+    rule R { when Temp.value > 30 and Ghost.value < 2 then Fan.turn_on }
+    '''
+    with pytest.raises(TextXSemanticError) as exc:
+        parse_str(dsl)
+    assert "Ghost" in str(exc.value)
+
+
+def test_json_output_for_compound_condition():
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        data = model_to_json_string(parse_str(DSL))
+    assert '"and"' in data and '"or"' in data and '"not"' in data
+
+
+def test_node_without_compute_cannot_be_created():
+    class Incomplete(Node):
+        pass
+
+    with pytest.raises(TypeError, match="_compute"):
+        Incomplete()
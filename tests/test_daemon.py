@@ -0,0 +1,156 @@
+import os
+import socket
+import threading
+
+import pytest
+
+from iotflow import cli, client
+from iotflow.daemon import DaemonServer, WarmState
+
+
+DSL = r'''
+sensor Temp { type: DHT22 unit: celsius }
+actuator Fan { type: relay }
+rule Hot { when Temp.value > 30 for 2 cycles then Fan.turn_on }
+rule Cold { when avg(Temp, 3) < 40 then Fan.turn_off }
+'''
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    (tmp_path / "model.iot").write_text(DSL, encoding="utf-8")
+    (tmp_path / "trace.csv").write_text("Temp\n35\n36\n20\n37\n38\n39\n", encoding="utf-8")
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def daemon(tmp_path, monkeypatch):
+    path = str(tmp_path / "iotflow.sock")
+    server = DaemonServer(path, WarmState(cache_size=2))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setenv(client.SOCKET_ENV, path)
+    monkeypatch.delenv(client.NO_DAEMON_ENV, raising=False)
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def _in_process(argv, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        cli.main(argv)
+    out, err = capsys.readouterr()
+    return exit_info.value.code, out, err
+
+
+def _without_duration(text):
+    return [line for line in text.splitlines() if not line.startswith("Duration:")]
+
+
+@pytest.mark.parametrize("argv", [
+    ["validate", "model.iot"],
+    ["parse", "model.iot"],
+    ["validate", "missing.iot"],
+    ["run", "model.iot", "--trace", "trace.csv", "--color", "never"],
+    ["run", "model.iot", "--engine", "network", "--trace", "trace.csv", "--fired-only"],
+    ["run", "--no-such-option", "model.iot"],
+])
+def test_forwarded_commands_match_in_process(workdir, daemon, capsys, argv):
+    expected = _in_process(argv, capsys)
+    for _ in range(2):
+        response = client.request(argv)
+        assert response["exit"] == expected[0]
+        assert _without_duration(response["stdout"]) == _without_duration(expected[1])
+        assert response["stderr"].count("conflicting") == expected[2].count("conflicting")
+
+
+def test_cache_reuses_models_and_tables_until_file_changes(workdir, daemon):
+    argv = ["run", "model.iot", "--trace", "trace.csv", "--summary-only"]
+    first = client.request(argv)["stdout"]
+    # The reused table starts from scratch: windows and streaks are reset.
+    assert _without_duration(client.request(argv)["stdout"]) == _without_duration(first)
+    state = daemon.state
+    assert (state.misses, state.hits) == (1, 1)
+
+    source = workdir / "model.iot"
+    source.write_text(DSL.replace("> 30", "> 36"), encoding="utf-8")
+    changed = client.request(argv)["stdout"]
+    assert state.misses == 2
+    assert _without_duration(changed) != _without_duration(first)
+
+    for name in ("a.iot", "b.iot"):
+        (workdir / name).write_text(DSL, encoding="utf-8")
+        client.request(["validate", name])
+    assert len(state._models) == 2 and source.resolve() not in state._models
+
+
+def test_main_falls_back_to_in_process_without_daemon(workdir, monkeypatch, capsys):
+    monkeypatch.setenv(client.SOCKET_ENV, str(workdir / "absent.sock"))
+    assert client.request(["validate", "model.iot"]) is None
+    with pytest.raises(SystemExit) as exit_info:
+        client.main(["validate", "model.iot"])
+    assert exit_info.value.code == 0
+    assert "Model parsed successfully" in capsys.readouterr().out
+
+
+def test_local_only_commands_are_not_forwarded():
+    assert client.forwardable(["run", "model.iot", "--cycles", "5"])
+    assert not client.forwardable(["run", "model.iot", "--watch"])
+    assert not client.forwardable(["run", "model.iot", "--metrics-port=9100"])
+    assert not client.forwardable(["validate", "model.iot", "--prof"])
+    assert not client.forwardable(["run", "model.iot", "--cycles", "6", "--period", "1"])
+    assert not client.forwardable(["run", "model.iot", "--trace", "big.csv"])
+    assert client.forwardable(["run", "model.iot", "--trace=big.csv", "--cycles=100"])
+    assert client.forwardable(["run", "model.iot", "--trace-column", "t=Temp", "--cycles", "5"])
+    assert client.forwardable(["validate", "model.iot", "--profile-top", "5"])
+    assert not client.forwardable(["generate", "models"])
+    assert not client.forwardable([])
+
+
+def test_server_replaces_stale_socket_and_refuses_live_one(tmp_path, daemon):
+    with pytest.raises(RuntimeError, match="already serving"):
+        DaemonServer(daemon.server_address, daemon.state)
+
+    stale = str(tmp_path / "stale.sock")
+    left_behind = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    left_behind.bind(stale)
+    left_behind.close()
+    server = DaemonServer(stale, daemon.state)
+    try:
+        assert os.stat(stale).st_mode & 0o777 == 0o600
+    finally:
+        server.server_close()
+    assert not os.path.exists(stale)
+
+
+def test_client_only_talks_to_own_socket(workdir, monkeypatch, capsys):
+    path = str(workdir / "squatted.sock")
+    monkeypatch.setenv(client.SOCKET_ENV, path)
+    monkeypatch.delenv(client.NO_DAEMON_ENV, raising=False)
+    (workdir / "squatted.sock").write_text("", encoding="utf-8")
+    with pytest.raises(PermissionError, match="not a socket"):
+        client.request(["validate", "model.iot"])
+    with pytest.raises(FileExistsError, match="not a socket"):
+        DaemonServer(path, WarmState())
+    os.unlink(path)
+
+    squatter = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    squatter.bind(path)
+    squatter.listen(1)
+    try:
+        if os.getuid() != 0:
+            pytest.skip("Needs root to hand the socket to another user")
+        os.chown(path, 12345, -1)
+        with pytest.raises(PermissionError, match="another user"):
+            client.request(["validate", "model.iot"])
+        with pytest.raises(SystemExit) as exit_info:
+            client.main(["validate", "model.iot"])
+        assert exit_info.value.code == 0
+        out, err = capsys.readouterr()
+        assert "Model parsed successfully" in out and "Not using the iotflow daemon" in err
+        with pytest.raises(FileExistsError, match="another user"):
+            DaemonServer(path, WarmState())
+    finally:
+        squatter.close()
@@ -0,0 +1,62 @@
+import json
+
+import pytest
+
+from iotflow.parser.parse import parse_str
+from iotflow.runtime.export import ColumnarExportSink
+from iotflow.runtime.runner import run_simulation
+
+
+DSL = r'''
+sensor Temp { type: DHT22 unit: celsius }
+sensor Humidity { type: DHT22 unit: percent }
+actuator Fan { type: relay }
+actuator Dryer { type: relay }
+rule CoolDown { when Temp.value > 30 then Fan.turn_on }
+rule Dry { when Humidity.value > 80 then Dryer.turn_on }
+'''
+
+
+def _trace(tmp_path):
+    path = tmp_path / "trace.csv"
+    path.write_text("Temp,Humidity\n35,50\n20,90\n25,10\n")
+    return path
+
+
+def test_npz_export(tmp_path):
+    np = pytest.importorskip("numpy")
+    out = tmp_path / "run.npz"
+    result = run_simulation(parse_str(DSL), trace=_trace(tmp_path), export=out)
+    assert len(result.cycles) == 3
+
+    data = np.load(out)
+    assert data["cycles"].tolist() == [1, 2, 3]
+    assert data["readings"].tolist() == [[35.0, 50.0], [20.0, 90.0], [25.0, 10.0]]
+    assert data["fired"].tolist() == [[True, False], [False, True], [False, False]]
+    assert data["rule_names"].tolist() == ["CoolDown", "Dry"]
+    assert data["actuator_names"].tolist() == ["Fan", "Dryer"]
+    assert json.loads(str(data["metadata"]))["rule_actions"] == ["turn_on", "turn_on"]
+
+
+@pytest.mark.parametrize("suffix", [".parquet", ".arrow"])
+def test_arrow_exports_in_chunks(tmp_path, suffix):
+    pa = pytest.importorskip("pyarrow")
+    out = tmp_path / f"run{suffix}"
+    sink = ColumnarExportSink(out, chunk_rows=2)
+    run_simulation(parse_str(DSL), trace=_trace(tmp_path), sink=sink)
+
+    if suffix == ".parquet":
+        import pyarrow.parquet as pq
+        table = pq.read_table(out)
+    else:
+        table = pa.ipc.open_file(str(out)).read_all()
+    assert table.column("cycle").to_pylist() == [1, 2, 3]
+    assert table.column("reading.Temp").to_pylist() == [35.0, 20.0, 25.0]
+    assert table.column("fired.Dry").to_pylist() == [False, True, False]
+    metadata = json.loads(table.schema.metadata[b"iotflow"])
+    assert metadata["sensors"] == ["Temp", "Humidity"]
+
+
+def test_unknown_export_extension_raises(tmp_path):
+    with pytest.raises(ValueError):
+        ColumnarExportSink(tmp_path / "run.xlsx")
@@ -0,0 +1,101 @@
+import time
+
+import pytest
+
+from iotflow.runtime.host import ModelHost, approximate_size
+from iotflow.runtime.sinks import AggregateSink, InMemorySink
+
+
+DSL = r'''
+sensor Temp { type: DHT22 unit: celsius }
+actuator Fan { type: relay }
+rule Hot { when Temp.value > 30 then Fan.turn_on }
+'''
+
+OTHER = r'''
+sensor Light { type: BH1750 unit: lux }
+actuator Lamp { type: relay }
+rule Dark { when Light.value < 100 then Lamp.turn_on }
+'''
+
+
+def test_identical_sources_share_the_parsed_model():
+    host = ModelHost()
+    host.add_model("a", DSL, cycles=5)
+    host.add_model("b", DSL, cycles=5)
+    host.add_model("c", OTHER, cycles=5)
+    host.run(rounds=1)
+    a, b, c = (host.tenants[name].simulation for name in "abc")
+    assert a.model is b.model
+    assert c.model is not a.model
+    assert a.table is not b.table
+    assert a.table.rule_names[0] is b.table.rule_names[0]
+
+
+def test_round_robin_is_fair_and_weighted():
+    host = ModelHost(quantum=2)
+    host.add_model("a", DSL)
+    host.add_model("b", OTHER, weight=3)
+    assert host.run(rounds=10) == 80
+    cycles = {row.name: row.cycles for row in host.report()}
+    assert cycles == {"a": 20, "b": 60}
+
+
+def test_finished_models_are_retired_with_results():
+    host = ModelHost()
+    host.add_model("short", DSL, sensor_overrides={"Temp": 35.0}, cycles=3)
+    host.add_model("feed", OTHER, readings=[{"Light": 50.0}, {"Light": 500.0}])
+    host.run()
+    assert len(host) == 0
+    assert host.results["short"].cycle_count == 3
+    assert host.results["short"].rules_passed == 3
+    assert host.results["feed"].cycle_count == 2
+    assert host.results["feed"].rules_passed == 1
+
+
+def test_add_and_remove_while_running():
+    host = ModelHost()
+    host.add_model("a", DSL, sink=AggregateSink())
+    host.start()
+    try:
+        time.sleep(0.02)
+        host.add_model("b", OTHER, sink=AggregateSink())
+        time.sleep(0.02)
+        host.remove_model("a")
+        time.sleep(0.02)
+        assert "a" in host.results
+        assert [row.name for row in host.report()] == ["b"]
+    finally:
+        results = host.close()
+    assert results["a"].cycle_count > 0
+    assert results["b"].cycle_count > 0
+
+
+def test_duplicate_and_unknown_names():
+    host = ModelHost()
+    host.add_model("a", DSL)
+    with pytest.raises(ValueError):
+        host.add_model("a", OTHER)
+    with pytest.raises(KeyError):
+        host.remove_model("missing")
+    with pytest.raises(ValueError):
+        host.add_model("b")
+    with pytest.raises(ValueError, match="run forever"):
+        host.add_model("b", DSL, sink=InMemorySink())
+
+
+def test_report_throughput_and_memory():
+    host = ModelHost()
+    host.add_model("a", DSL, sink=AggregateSink())
+    host.add_model("b", DSL, sink=InMemorySink(), cycles=1000)
+    host.run(rounds=200)
+    rows = {row.name: row for row in host.report()}
+    assert rows["a"].cycles == 200
+    assert rows["a"].throughput > 0
+    # "b" keeps every cycle in memory, "a" only totals.
+    assert rows["b"].memory_bytes > rows["a"].memory_bytes > 0
+
+
+def test_approximate_size_counts_containers_once():
+    shared = [0.0] * 100
+    assert approximate_size([shared, shared]) < 2 * approximate_size(shared)
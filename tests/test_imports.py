@@ -0,0 +1,212 @@
+import os
+import threading
+import time
+import warnings
+
+import pytest
+from textx import TextXSemanticError
+
+from iotflow import load_model
+from iotflow.daemon import WarmState
+from iotflow.generators.batch import generate_tree
+from iotflow.parser import imports
+from iotflow.parser.imports import ModuleCache
+from iotflow.parser.metamodel import build_metamodel
+from iotflow.parser.parse import parse_str
+from iotflow.runtime.context import build_context
+from iotflow.runtime.host import ModelHost
+from iotflow.runtime.montecarlo import run_monte_carlo
+from iotflow.runtime.runner import run_simulation
+
+
+CATALOG = r'''
+import "actuators.iot"
+sensor Temp { type: DHT22 unit: celsius }
+sensor Humidity { type: DHT22 unit: percent }
+sensor Light { type: BH1750 unit: lux }
+'''
+
+ACTUATORS = r'''
+actuator Fan { type: relay }
+actuator Lamp { type: relay }
+'''
+
+
+def _site(threshold=30):
+    return (
+        'import "../shared/catalog.iot"\n'
+        "sensor Door { type: PIR unit: boolean }\n"
+        f"rule Hot {{ when Temp.value > {threshold} then Fan.turn_on }}\n"
+        "rule Open { when Door.value == 1 and Humidity.value > 80 then Fan.turn_off }\n"
+    )
+
+
+@pytest.fixture
+def modules(monkeypatch):
+    cache = ModuleCache()
+    monkeypatch.setattr(imports, "MODULES", cache)
+    return cache
+
+
+@pytest.fixture
+def tree(tmp_path):
+    shared = tmp_path / "shared"
+    shared.mkdir()
+    (shared / "catalog.iot").write_text(CATALOG, encoding="utf-8")
+    (shared / "actuators.iot").write_text(ACTUATORS, encoding="utf-8")
+    sites = tmp_path / "sites"
+    sites.mkdir()
+    for i in range(3):
+        (sites / f"site{i}.iot").write_text(_site(30 + i), encoding="utf-8")
+    return tmp_path
+
+
+def _names(model):
+    return [element.name for element in model.elements]
+
+
+def test_site_links_the_imported_devices_it_uses(tree, modules):
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        model = load_model(str(tree / "sites" / "site0.iot"))
+    assert _names(model) == ["Temp", "Humidity", "Fan", "Door", "Hot", "Open"]
+    assert [imp.path for imp in model.imports] == ["../shared/catalog.iot"]
+    assert set(build_context(model).sensors) == {"Temp", "Humidity", "Door"}
+    assert len(run_simulation(model, cycles=20).cycles) == 20
+
+
+def test_each_module_is_parsed_once_per_process(tree, modules):
+    models = [load_model(str(path)) for path in sorted((tree / "sites").glob("*.iot"))]
+    assert modules.parsed == 2
+    assert models[0].elements[0] is models[2].elements[0]
+
+    catalog = tree / "shared" / "catalog.iot"
+    catalog.write_text(CATALOG.replace("Humidity", "Soil"), encoding="utf-8")
+    with pytest.raises(TextXSemanticError, match="Unknown sensor 'Humidity'.*Soil"):
+        load_model(str(tree / "sites" / "site0.iot"))
+    assert modules.parsed == 3
+
+    # A change two imports away reaches the site too.
+    catalog.write_text(CATALOG, encoding="utf-8")
+    (tree / "shared" / "actuators.iot").write_text(ACTUATORS.replace("Fan", "Blower"), encoding="utf-8")
+    with pytest.raises(TextXSemanticError, match="Unknown actuator 'Fan'"):
+        load_model(str(tree / "sites" / "site1.iot"))
+
+
+def test_disk_cache_skips_parsing_in_a_new_process(tree, tmp_path, monkeypatch):
+    cache_dir = tmp_path / "cache"
+    first = ModuleCache(cache_dir)
+    monkeypatch.setattr(imports, "MODULES", first)
+    expected = _names(load_model(str(tree / "sites" / "site0.iot")))
+    assert first.parsed == 2 and len(list(cache_dir.iterdir())) == 2
+
+    second = ModuleCache(cache_dir)
+    monkeypatch.setattr(imports, "MODULES", second)
+    assert _names(load_model(str(tree / "sites" / "site0.iot"))) == expected
+    assert (second.parsed, second.from_disk) == (0, 2)
+
+    # Changed content misses the cache; the old entry is simply not used.
+    (tree / "shared" / "actuators.iot").write_text(ACTUATORS + "actuator Pump { type: relay }\n", encoding="utf-8")
+    third = ModuleCache(cache_dir)
+    monkeypatch.setattr(imports, "MODULES", third)
+    load_model(str(tree / "sites" / "site0.iot"))
+    assert (third.parsed, third.from_disk) == (1, 1)
+
+
+def test_import_errors(tree, modules, monkeypatch):
+    monkeypatch.chdir(tree / "sites")
+    with pytest.raises(TextXSemanticError, match="Duplicate sensor name 'Temp': also imported"):
+        parse_str(_site() + "sensor Temp { type: DHT22 unit: celsius }\n")
+    with pytest.raises(TextXSemanticError, match="Imported file not found"):
+        parse_str('import "nope.iot"\n' + _site())
+
+    (tree / "sites" / "other.iot").write_text("sensor Temp { type: SHT30 unit: celsius }\n", encoding="utf-8")
+    with pytest.raises(TextXSemanticError, match="imported from both"):
+        parse_str('import "other.iot"\n' + _site())
+
+    with pytest.raises(TextXSemanticError, match="defines rules"):
+        parse_str('import "site1.iot"\n' + _site())
+
+    (tree / "shared" / "actuators.iot").write_text('import "catalog.iot"\n' + ACTUATORS, encoding="utf-8")
+    with pytest.raises(TextXSemanticError, match="Import cycle"):
+        parse_str(_site())
+
+
+def test_catalog_alone_validates_without_unused_warnings(tree, modules):
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        catalog = build_metamodel().model_from_file(str(tree / "shared" / "catalog.iot"))
+    assert _names(catalog) == ["Temp", "Humidity", "Light"]
+
+
+def test_batch_regenerates_models_whose_imports_changed(tree, tmp_path, modules):
+    out = tmp_path / "out"
+    report = generate_tree(tree / "sites", out, workers=1)
+    assert len(report.generated) == 3
+    assert generate_tree(tree / "sites", out, workers=1).generated == []
+
+    catalog = tree / "shared" / "catalog.iot"
+    catalog.write_text(CATALOG.replace("DHT22", "AM2302"), encoding="utf-8")
+    report = generate_tree(tree / "sites", out, workers=1)
+    assert len(report.generated) == 3
+    assert '"AM2302"' in (out / "site0.json").read_text(encoding="utf-8")
+
+    # Touching the catalog without changing it keeps the outputs.
+    os.utime(catalog, ns=(catalog.stat().st_atime_ns, catalog.stat().st_mtime_ns + 10**9))
+    assert generate_tree(tree / "sites", out, workers=1).generated == []
+
+
+def test_daemon_reloads_site_when_an_import_changes(tree, modules):
+    state = WarmState()
+    site = tree / "sites" / "site0.iot"
+    first = state.load(site)
+    assert state.load(site) is first
+    (tree / "shared" / "actuators.iot").write_text(ACTUATORS + "actuator Pump { type: relay }\n", encoding="utf-8")
+    assert state.load(site) is not first and state.misses == 2
+
+
+@pytest.fixture
+def elsewhere(tmp_path, monkeypatch):
+    # Imports must resolve relative to the model file, not the working directory.
+    away = tmp_path / "elsewhere" / "deeper"
+    away.mkdir(parents=True)
+    monkeypatch.chdir(away)
+
+
+def test_watched_model_reloads_with_its_imports(tree, modules, elsewhere):
+    site = tree / "sites" / "site0.iot"
+
+    def edit_later():
+        time.sleep(0.1)
+        site.write_text(_site(threshold=35), encoding="utf-8")
+
+    threading.Thread(target=edit_later, daemon=True).start()
+    result = run_simulation(load_model(str(site)), cycles=150, period=0.01, watch=site)
+    assert [report.error for report in result.reloads] == [None]
+    assert result.reloads[0].applied
+
+
+def test_watched_model_reloads_when_an_import_changes(tree, modules):
+    site = tree / "sites" / "site0.iot"
+    actuators = tree / "shared" / "actuators.iot"
+
+    def edit_later():
+        time.sleep(0.1)
+        actuators.write_text(ACTUATORS.replace("Fan { type: relay }", "Fan { type: contactor }"), encoding="utf-8")
+
+    threading.Thread(target=edit_later, daemon=True).start()
+    result = run_simulation(load_model(str(site)), cycles=150, period=0.01, watch=site)
+    assert [report.applied for report in result.reloads] == [True]
+    assert result.reloads[0].diff.actuators_changed == ["Fan"]
+
+
+def test_host_and_monte_carlo_resolve_imports_from_model_path(tree, modules, elsewhere):
+    site = tree / "sites" / "site0.iot"
+    host = ModelHost()
+    host.add_model("a", path=site, cycles=5)
+    host.run()
+    assert host.results["a"].cycle_count == 5
+
+    serial = run_monte_carlo(path=site, samples=400, batch_size=100, workers=1)
+    assert [e.name for e in serial.rules] == ["Hot", "Open"]
+    assert run_monte_carlo(path=site, samples=400, batch_size=100, workers=2) == serial
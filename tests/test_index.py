@@ -0,0 +1,58 @@
+import pytest
+
+from iotflow.parser.parse import parse_str
+from iotflow.runtime.runner import run_simulation
+from iotflow.runtime.sinks import AggregateSink
+
+
+DSL = r'''
+sensor Temp { type: DHT22 unit: celsius }
+sensor Humidity { type: DHT22 unit: percent }
+actuator Fan { type: relay }
+rule Warm { when Temp.value > 30 then Fan.turn_on }
+rule Hot { when Temp.value > 40 then Fan.activate }
+rule Humid { when Humidity.value > 80 then Fan.turn_on }
+'''
+
+
+def _write_trace(tmp_path):
+    path = tmp_path / "trace.csv"
+    path.write_text("Temp,Humidity\n20,50\n35,50\n45,90\n25,90\n")
+    return path
+
+
+def test_rule_queries(tmp_path):
+    result = run_simulation(parse_str(DSL), trace=_write_trace(tmp_path))
+    index = result.index
+
+    assert index.fire_count("Warm") == 2
+    assert index.fire_count("Hot") == 1
+    assert index.first_fired_cycle("Warm") == 2
+    assert index.last_fired_cycle("Humid") == 4
+    assert index.first_fired_cycle("Hot") == 3
+    assert index.cycles_fired("Warm") == [2, 3]
+
+
+def test_actuator_and_sensor_queries(tmp_path):
+    result = run_simulation(parse_str(DSL), trace=_write_trace(tmp_path))
+    index = result.index
+
+    assert index.actuator_cycles("Fan") == [2, 3, 4]
+    assert index.actuator_command_count("Fan") == 5
+    assert index.sensor_cycles("Humidity") == [3, 4]
+
+    summary = index.sensor_summary("Temp")
+    assert (summary.minimum, summary.maximum, summary.mean) == (20.0, 45.0, 31.25)
+
+
+def test_bounded_sink_keeps_counters_only(tmp_path):
+    result = run_simulation(parse_str(DSL), trace=_write_trace(tmp_path), sink=AggregateSink())
+    assert result.index.fire_count("Warm") == 2
+    with pytest.raises(ValueError):
+        result.index.cycles_fired("Warm")
+
+
+def test_unknown_rule_raises(tmp_path):
+    result = run_simulation(parse_str(DSL), trace=_write_trace(tmp_path))
+    with pytest.raises(KeyError):
+        result.index.fire_count("Missing")
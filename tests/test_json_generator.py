@@ -0,0 +1,62 @@
+import io
+import json
+
+from iotflow.generators import generate_json, model_to_json_string, write_json
+from iotflow.parser.parse import parse_str
+
+
+DSL = r'''
+actuator Fan { type: relay }
+sensor Temp { type: DHT22 unit: celsius }
+rule Hot { when Temp.value > 30 and not avg(Temp, 4) < 20 then Fan.turn_on }
+sensor Lumière { type: BH1750 unit: lux }
+rule Cold { when Temp.value < 10 then Fan.turn_off }
+'''
+
+
+class RecordingStream(io.StringIO):
+    def __init__(self) -> None:
+        super().__init__()
+        self.writes = 0
+
+    def write(self, text: str) -> int:
+        self.writes += 1
+        return super().write(text)
+
+
+def test_pretty_output_matches_whole_document_dump():
+    text = model_to_json_string(parse_str(DSL))
+    data = json.loads(text)
+    assert [s["name"] for s in data["sensors"]] == ["Temp", "Lumière"]
+    assert [r["name"] for r in data["rules"]] == ["Hot", "Cold"]
+    assert text == json.dumps(data, indent=4, ensure_ascii=False)
+
+
+def test_empty_sections_match_whole_document_dump():
+    text = model_to_json_string(parse_str("sensor Temp { type: DHT22 unit: celsius }"))
+    data = json.loads(text)
+    assert data["actuators"] == [] and data["rules"] == []
+    assert text == json.dumps(data, indent=4, ensure_ascii=False)
+
+
+def test_compact_output_is_one_element_per_line():
+    lines = model_to_json_string(parse_str(DSL), compact=True).splitlines()
+    records = [json.loads(line) for line in lines]
+    assert [(r["kind"], r["name"]) for r in records] == [
+        ("sensor", "Temp"), ("sensor", "Lumière"), ("actuator", "Fan"), ("rule", "Hot"), ("rule", "Cold"),
+    ]
+    pretty = json.loads(model_to_json_string(parse_str(DSL)))
+    assert {k: v for k, v in records[3].items() if k != "kind"} == pretty["rules"][0]
+
+
+def test_write_json_streams_elements():
+    model = parse_str(DSL)
+    out = RecordingStream()
+    write_json(model, out, compact=True)
+    assert out.writes == 2 * len(model.elements)
+
+
+def test_generate_json_writes_file(tmp_path):
+    path = tmp_path / "out" / "model.ndjson"
+    generate_json(parse_str(DSL), str(path), compact=True)
+    assert path.read_text(encoding="utf-8") == model_to_json_string(parse_str(DSL), compact=True)
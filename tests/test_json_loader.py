@@ -0,0 +1,140 @@
+import json
+import random
+import subprocess
+import sys
+import warnings
+from pathlib import Path
+
+import pytest
+
+from iotflow import load_model
+from iotflow.generators import generate_json, model_to_json_string
+from iotflow.parser.json_loader import load_json_file, load_json_str
+from iotflow.parser.parse import parse_str
+from iotflow.runtime.runner import run_simulation
+from iotflow.validators import ModelValidationError
+
+
+DSL = r'''
+sensor Temp { type: DHT22 unit: celsius }
+sensor Light { type: BH1750 unit: lux }
+actuator Fan { type: relay }
+actuator Lamp { type: relay }
+rule Hot { when Temp.value > 35 for 3 cycles then Fan.turn_on }
+rule Cool { when avg(Temp, 5) < 25.5 then Fan.turn_off }
+rule Dark { when Light.value < 30000 and not (Temp.value > 40 or delta(Temp, 3) > 2) then Lamp.turn_on }
+'''
+
+
+def _json(compact=False):
+    return model_to_json_string(parse_str(DSL), compact=compact)
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_loaded_model_runs_like_parsed_model(compact):
+    loaded = load_json_str(_json(compact))
+    assert model_to_json_string(loaded) == _json()
+    random.seed(4)
+    expected = run_simulation(parse_str(DSL), cycles=200)
+    random.seed(4)
+    result = run_simulation(loaded, cycles=200)
+    assert result.index.rule_fires == expected.index.rule_fires
+    assert result.cycles[-1].readings == expected.cycles[-1].readings
+
+
+@pytest.mark.parametrize("suffix", [".json", ".ndjson"])
+def test_load_model_from_generated_file(tmp_path, suffix):
+    path = tmp_path / f"model{suffix}"
+    generate_json(parse_str(DSL), str(path), compact=suffix == ".ndjson")
+    assert model_to_json_string(load_json_file(path)) == _json()
+    assert model_to_json_string(load_model(str(path))) == _json()
+
+
+def test_loader_runs_semantic_checks():
+    data = json.loads(_json())
+    data["rules"][0]["condition"]["sensor"] = "Ghost"
+    with pytest.raises(ModelValidationError, match="Unknown sensor 'Ghost'"):
+        load_json_str(json.dumps(data))
+
+    data = json.loads(_json())
+    data["rules"][1]["condition"]["operator"] = "=>"
+    with pytest.raises(ModelValidationError, match="Invalid operator '=>'"):
+        load_json_str(json.dumps(data))
+
+    data = json.loads(_json())
+    data["rules"][0]["condition"]["attribute"] = "battery"
+    with pytest.raises(ModelValidationError, match="Invalid sensor attribute"):
+        load_json_str(json.dumps(data))
+
+    lines = _json(compact=True).splitlines()
+    with pytest.raises(ModelValidationError, match="Duplicate sensor name"):
+        load_json_str("\n".join([lines[0], *lines]))
+    with pytest.raises(ModelValidationError, match="missing 'action'"):
+        load_json_str(lines[-1].replace('"action"', '"then"'))
+
+
+@pytest.mark.parametrize("path, value, message", [
+    (("rules", 1, "condition", "window"), 2.5, "'window' must be a whole number"),
+    (("rules", 0, "condition", "duration"), -1, "'duration' must be a whole number"),
+    (("rules", 0, "condition", "duration"), True, "'duration' must be a whole number"),
+    (("rules", 0, "condition", "value"), True, "'value' must be a number"),
+    (("rules", 0, "condition", "value"), "35", "'value' must be a number"),
+    (("sensors", 0, "name"), "1 2", "'name' must be an identifier"),
+    (("sensors", 0, "type"), 22, "'type' must be an identifier"),
+    (("rules", 0, "action", "command"), "turn on", "'command' must be an identifier"),
+    (("sensors",), 5, "'sensors' must be a list"),
+])
+def test_loader_checks_what_the_grammar_checks(path, value, message):
+    data = json.loads(_json())
+    target = data
+    for key in path[:-1]:
+        target = target[key]
+    target[path[-1]] = value
+    with pytest.raises(ModelValidationError, match=message):
+        load_json_str(json.dumps(data))
+
+
+def test_loader_warns_like_parser():
+    source = DSL + "rule Cold { when Temp.value < 40 then Fan.turn_off }\n"
+    with warnings.catch_warnings(record=True) as parsed:
+        warnings.simplefilter("always")
+        text = model_to_json_string(parse_str(source), compact=True)
+    with warnings.catch_warnings(record=True) as loaded:
+        warnings.simplefilter("always")
+        load_json_str(text)
+    assert [str(w.message) for w in loaded] == [str(w.message) for w in parsed]
+    assert any("conflicting" in str(w.message) for w in loaded)
+
+
+def test_loading_json_does_not_import_textx(tmp_path):
+    path = tmp_path / "model.ndjson"
+    generate_json(parse_str(DSL), str(path), compact=True)
+    script = (
+        "import sys, warnings\n"
+        "warnings.simplefilter('ignore')\n"
+        "from iotflow import load_model\n"
+        "from iotflow.runtime.runner import run_simulation\n"
+        f"run_simulation(load_model({str(path)!r}), cycles=10)\n"
+        "print(sorted(m for m in sys.modules if m.split('.')[0] in ('textx', 'arpeggio')))\n"
+    )
+    root = Path(__file__).resolve().parent.parent
+    out = subprocess.run([sys.executable, "-c", script], cwd=root, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "[]"
+
+
+def test_cli_run_from_json_does_not_import_textx(tmp_path):
+    path = tmp_path / "x.json"
+    generate_json(parse_str(DSL), str(path))
+    script = (
+        "import sys, warnings\n"
+        "warnings.simplefilter('ignore')\n"
+        "from iotflow import cli\n"
+        "try:\n"
+        f"    cli.main(['run', {str(path)!r}, '--cycles', '10', '--summary-only'])\n"
+        "except SystemExit as e:\n"
+        "    assert e.code == 0, e.code\n"
+        "print(sorted(m for m in sys.modules if m.split('.')[0] in ('textx', 'arpeggio')))\n"
+    )
+    root = Path(__file__).resolve().parent.parent
+    out = subprocess.run([sys.executable, "-c", script], cwd=root, capture_output=True, text=True, check=True)
+    assert out.stdout.strip().splitlines()[-1] == "[]"
@@ -0,0 +1,105 @@
+import json
+import urllib.request
+
+import pytest
+
+from iotflow.parser.parse import parse_str
+from iotflow.runtime import simulation
+from iotflow.runtime.metrics import Histogram, MetricsRegistry
+from iotflow.runtime.runner import run_simulation
+
+
+DSL = r'''
+sensor Temp { type: DHT22 unit: celsius }
+actuator Fan { type: relay }
+actuator Heater { type: relay }
+rule Hot { when Temp.value > 30 then Fan.turn_on }
+rule Cold { when Temp.value < 10 then Heater.turn_on }
+'''
+
+
+def test_histogram_buckets_are_cumulative():
+    hist = Histogram("latency", "help", buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 2.0):
+        hist.observe(value)
+    assert hist.cumulative() == [(0.1, 2), (1.0, 3), (float("inf"), 4)]
+    assert hist.count == 4
+    assert hist.sum == pytest.approx(2.65)
+
+
+def test_registry_reuses_and_checks_kinds():
+    registry = MetricsRegistry()
+    counter = registry.counter("hits", "Hits")
+    assert registry.counter("hits", "Hits") is counter
+    with pytest.raises(ValueError):
+        registry.gauge("hits", "Hits")
+
+
+def test_run_updates_instruments():
+    registry = MetricsRegistry()
+    model = parse_str(DSL)
+    run_simulation(model, sensor_overrides={"Temp": 35.0}, cycles=20, metrics=registry)
+    snapshot = registry.snapshot()
+    assert snapshot["iotflow_cycles_total"]["value"] == 20
+    assert snapshot["iotflow_rule_evaluations_total"]["value"] == 40
+    assert snapshot["iotflow_rule_fires_total"]["values"] == {"Hot": 20}
+    assert snapshot["iotflow_actuator_commands_total"]["values"] == {"Fan": 20}
+    assert snapshot["iotflow_cycle_seconds"]["count"] == 20
+    assert snapshot["iotflow_rule_evaluations_per_second"]["value"] > 0
+
+
+def test_evaluation_rate_is_live_during_a_run():
+    registry = MetricsRegistry()
+    sim = simulation.Simulation(parse_str(DSL), metrics=registry)
+    rate = registry.metrics["iotflow_rule_evaluations_per_second"]
+    sim.step({"Temp": 35.0})
+    # Set before the run is closed, so a scrape mid-run does not read 0.
+    assert rate.value() > 0
+    sim.close()
+
+
+def test_edge_triggered_run_counts_suppressed_commands():
+    registry = MetricsRegistry()
+    model = parse_str(DSL)
+    run_simulation(
+        model, sensor_overrides={"Temp": 35.0}, cycles=5, edge_triggered=True, metrics=registry,
+    )
+    assert registry.metrics["iotflow_actuator_commands_total"].value("Fan") == 1
+    assert registry.metrics["iotflow_commands_suppressed_total"].value() == 4
+
+
+def test_exporters(tmp_path):
+    registry = MetricsRegistry()
+    run_simulation(parse_str(DSL), sensor_overrides={"Temp": 5.0}, cycles=3, metrics=registry)
+
+    registry.write_json(tmp_path / "metrics.json")
+    data = json.loads((tmp_path / "metrics.json").read_text())
+    assert data["iotflow_rule_fires_total"]["values"] == {"Cold": 3}
+
+    registry.write_prometheus(tmp_path / "metrics.prom")
+    text = (tmp_path / "metrics.prom").read_text()
+    assert "# TYPE iotflow_cycle_seconds histogram" in text
+    assert 'iotflow_cycle_seconds_bucket{le="+Inf"} 3' in text
+    assert 'iotflow_actuator_commands_total{actuator="Heater"} 3' in text
+    assert "iotflow_cycles_total 3" in text
+
+
+def test_http_endpoint():
+    registry = MetricsRegistry()
+    registry.counter("iotflow_cycles_total", "Simulation cycles run").inc(7)
+    server = registry.serve(0)
+    try:
+        host, port = server.server_address[:2]
+        with urllib.request.urlopen(f"http://{host}:{port}/metrics") as response:
+            body = response.read().decode("utf-8")
+    finally:
+        server.shutdown()
+    assert "iotflow_cycles_total 7" in body
+
+
+def test_disabled_instrumentation_leaves_registry_empty(monkeypatch):
+    monkeypatch.setattr(simulation, "METRICS_ENABLED", False)
+    registry = MetricsRegistry()
+    result = run_simulation(parse_str(DSL), cycles=5, metrics=registry)
+    assert result.cycle_count == 5
+    assert registry.metrics == {}
@@ -0,0 +1,70 @@
+import random
+
+import pytest
+
+from iotflow.generators import generate_json
+from iotflow.parser.parse import parse_str
+from iotflow.runtime.montecarlo import run_monte_carlo
+
+
+DSL = r'''
+sensor Temp { type: DHT22 unit: celsius }
+sensor Door { type: reed unit: boolean }
+actuator Fan { type: relay }
+actuator Alarm { type: buzzer }
+rule Hot { when Temp.value > 30 then Fan.turn_on }
+rule VeryHot { when Temp.value > 42 then Fan.turn_on }
+rule Open { when Door.value == 1 then Alarm.turn_on }
+'''
+
+
+def _by_name(estimates):
+    return {e.name: e for e in estimates}
+
+
+def test_estimates_cover_known_probabilities():
+    result = run_monte_carlo(DSL, samples=20_000, workers=1, seed=3)
+    rules = _by_name(result.rules)
+    actuators = _by_name(result.actuators)
+    # Celsius readings are uniform on 15..45, booleans are fair coins.
+    for name, expected in (("Hot", 0.5), ("VeryHot", 0.1), ("Open", 0.5)):
+        assert rules[name].low <= expected <= rules[name].high
+    assert actuators["Fan"].low <= 0.5 <= actuators["Fan"].high
+    assert result.cycles == 20_000
+    assert result.batches == 20
+
+
+def test_same_seed_same_result_for_any_worker_count():
+    state = random.getstate()
+    serial = run_monte_carlo(DSL, samples=6000, batch_size=500, workers=1, seed=7)
+    assert random.getstate() == state
+    parallel = run_monte_carlo(DSL, samples=6000, batch_size=500, workers=2, seed=7)
+    assert parallel == serial
+    assert run_monte_carlo(DSL, samples=6000, batch_size=500, workers=1, seed=8) != serial
+
+
+def test_stops_early_at_target_precision():
+    result = run_monte_carlo(DSL, samples=1_000_000, batch_size=1000, precision=0.02, workers=1)
+    assert result.stopped_early
+    assert result.cycles < 1_000_000
+    assert result.max_half_width <= 0.02
+    parallel = run_monte_carlo(DSL, samples=1_000_000, batch_size=1000, precision=0.02, workers=2)
+    assert parallel.cycles == result.cycles
+
+
+def test_rejects_bad_arguments():
+    with pytest.raises(ValueError):
+        run_monte_carlo(DSL, samples=0)
+    with pytest.raises(ValueError):
+        run_monte_carlo()
+
+
+@pytest.mark.parametrize("suffix", [".iot", ".json", ".ndjson"])
+def test_model_file_of_any_format(tmp_path, suffix):
+    path = tmp_path / f"model{suffix}"
+    if suffix == ".iot":
+        path.write_text(DSL, encoding="utf-8")
+    else:
+        generate_json(parse_str(DSL), str(path), compact=suffix == ".ndjson")
+    expected = run_monte_carlo(DSL, samples=2000, batch_size=500, workers=1, seed=3)
+    assert run_monte_carlo(path=path, samples=2000, batch_size=500, workers=2, seed=3) == expected
@@ -0,0 +1,100 @@
+import pytest
+
+from iotflow.parser.parse import parse_str
+from iotflow.runtime.pacing import Pacer, PacingStats, percentile
+from iotflow.runtime.runner import run_simulation
+
+
+DSL = r'''
+sensor Temp { type: DHT22 unit: celsius }
+actuator Fan { type: relay }
+rule Hot { when Temp.value > 30 then Fan.turn_on }
+'''
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(round(seconds, 6))
+        self.now += seconds
+
+
+def test_percentile_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([], 50) == 0.0
+
+
+def test_schedule_does_not_drift():
+    clock = FakeClock()
+    pacer = Pacer(0.1, clock=clock, sleep=clock.sleep)
+    for i in range(5):
+        started = pacer.wait(i)
+        clock.now += 0.03
+        pacer.done(i, started)
+    # Each wait covers only what is left of the period after processing.
+    assert clock.slept == [0.07] * 4
+    assert clock.now == pytest.approx(100.0 + 4 * 0.1 + 0.03)
+    assert pacer.stats.deadline_misses == 0
+    assert all(s == pytest.approx(0.07) for s in pacer.stats.slack)
+
+
+def test_overrun_counts_a_miss_and_delays_the_next_cycle():
+    clock = FakeClock()
+    pacer = Pacer(0.1, clock=clock, sleep=clock.sleep)
+    for i, cost in enumerate([0.02, 0.15, 0.02, 0.02]):
+        started = pacer.wait(i)
+        clock.now += cost
+        pacer.done(i, started)
+    stats = pacer.stats
+    assert stats.deadline_misses == 1
+    assert stats.slack[1] == pytest.approx(-0.05)
+    # Cycle 2 was released at +0.2 but could only start at +0.25.
+    assert stats.jitter[2] == pytest.approx(0.05)
+    assert stats.slack[2] == pytest.approx(0.03)
+    assert stats.jitter[3] == 0.0
+    assert stats.miss_rate == 0.25
+
+
+def test_long_run_keeps_a_bounded_sample():
+    stats = PacingStats(0.1, sample_size=100, seed=1)
+    for i in range(10_000):
+        stats.record(jitter=0.0, processing=i / 10_000, slack=0.05 if i % 10 else -0.01)
+    assert stats.cycles == 10_000
+    assert stats.deadline_misses == 1000
+    assert stats.miss_rate == 0.1
+    assert len(stats.processing) == len(stats.jitter) == len(stats.slack) == 100
+    summary = stats.processing_percentiles()
+    assert summary["max"] == 0.9999
+    assert summary["p50"] == pytest.approx(0.5, abs=0.15)
+    # One reservoir slot holds all three timings of the same cycle.
+    for processing, slack in zip(stats.processing, stats.slack):
+        assert (slack < 0) == (round(processing * 10_000) % 10 == 0)
+
+
+def test_invalid_period():
+    with pytest.raises(ValueError):
+        Pacer(0)
+
+
+def test_paced_run_reports_timing():
+    result = run_simulation(parse_str(DSL), cycles=10, period=0.002)
+    pacing = result.pacing
+    assert isinstance(pacing, PacingStats)
+    assert pacing.cycles == 10
+    assert result.duration_seconds >= 9 * 0.002
+    assert set(pacing.jitter_percentiles()) == {"p50", "p90", "p99", "max"}
+    assert "deadline misses" in str(result)
+
+
+def test_unpaced_run_has_no_timing():
+    result = run_simulation(parse_str(DSL), cycles=3)
+    assert result.pacing is None
+    assert "deadline misses" not in str(result)
@@ -0,0 +1,69 @@
+import io
+import pstats
+import sys
+
+import pytest
+
+from iotflow import cli
+from iotflow.parser.parse import parse_str
+from iotflow.profiling import Profiler, element_sizes
+from iotflow.runtime.runner import run_simulation
+
+
+DSL = r'''
+sensor Temp { type: DHT22 unit: celsius }
+actuator Fan { type: relay }
+rule Hot { when Temp.value > 30 then Fan.turn_on }
+rule Mild { when Temp.value > 20 then Fan.turn_on }
+'''
+
+
+def test_element_sizes_groups_by_type():
+    sizes = element_sizes(parse_str(DSL))
+    assert sizes["Rule"][0] == 2
+    assert sizes["Sensor"][0] == 1
+    assert all(size > 0 for _, size in sizes.values())
+
+
+def test_profiler_writes_loadable_cpu_profile(tmp_path):
+    output = tmp_path / "run.prof"
+    with Profiler(cpu_output=output, top=5) as profiler:
+        run_simulation(parse_str(DSL), cycles=50)
+    stats = pstats.Stats(str(output))
+    assert stats.total_calls > 0
+    hot = profiler.hot_paths()
+    assert len(hot) == 5
+    assert any(function.startswith("iotflow/") for function, *_ in hot)
+
+    out = io.StringIO()
+    profiler.report(out)
+    assert "Top 5 functions by cumulative time" in out.getvalue()
+
+
+def test_profiler_reports_memory_by_element_and_site():
+    with Profiler(memory=True) as profiler:
+        model = parse_str(DSL)
+        profiler.watch(model)
+        profiler.watch(run_simulation(model, cycles=200))
+    out = io.StringIO()
+    profiler.report(out)
+    text = out.getvalue()
+    assert "By model element type:" in text
+    assert "Rule" in text
+    assert "iotflow/runtime/" in text
+
+
+def test_cli_profile_options(tmp_path, monkeypatch, capsys):
+    model = tmp_path / "model.iot"
+    model.write_text(DSL)
+    output = tmp_path / "validate.prof"
+    monkeypatch.setattr(sys, "argv", [
+        "iotflow-dsl", "validate", str(model), "--profile", str(output), "--profile-memory",
+    ])
+    with pytest.raises(SystemExit) as exit_info:
+        cli.main()
+    assert exit_info.value.code == 0
+    assert output.exists()
+    printed = capsys.readouterr().out
+    assert "CPU profile written to" in printed
+    assert "By allocation site:" in printed
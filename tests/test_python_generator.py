@@ -0,0 +1,105 @@
+import importlib.util
+import json
+import random
+import subprocess
+import sys
+import warnings
+
+import pytest
+
+from iotflow.bench import ModelShape, generate_model
+from iotflow.generators import generate_python, model_to_python_string
+from iotflow.parser.parse import parse_str
+from iotflow.runtime.columnar import RuleTable
+from iotflow.runtime.context import build_context
+
+
+DSL = r'''
+sensor Temp { type: DHT22 unit: celsius }
+sensor Humidity { type: DHT22 unit: percent }
+sensor Light { type: BH1750 unit: lux }
+sensor Spare { type: PIR unit: boolean }
+actuator Fan { type: relay }
+actuator Lamp { type: relay }
+actuator Alarm { type: buzzer }
+rule Hot { when Temp.value > 30 for 3 cycles then Fan.turn_on }
+rule Cool { when avg(Temp, 5) < 25.5 then Fan.turn_off }
+rule Swing { when delta(Temp, 4) > 3 or max(Humidity, 6) >= 80 then Alarm.alert }
+rule Dark { when Light.value < 300 and not (Temp.value > 35 or min(Humidity, 6) < 20) then Lamp.turn_on }
+rule Bright { when not Light.value < 300 then Lamp.turn_off }
+rule Muggy { when Temp.value > 30 and Humidity.value > 70 for 2 cycles then Fan.turn_on }
+rule Steady { when avg(Temp, 5) < 400 and Humidity.value == 50 then Alarm.reset }
+'''
+
+
+def _load(tmp_path, model, name="engine"):
+    path = tmp_path / f"{name}.py"
+    generate_python(model, str(path))
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _readings(sensors, rng, cycles, missing=0.1):
+    for _ in range(cycles):
+        # Coarse values make equality and threshold-boundary comparisons happen.
+        yield {
+            name: float(rng.randrange(0, 100)) if rng.random() < 0.5 else rng.uniform(0, 1000)
+            for name in sensors
+            if rng.random() >= missing
+        }
+
+
+@pytest.mark.parametrize("engine", ["compiled", "network"])
+def test_generated_engine_matches_runtime(tmp_path, engine):
+    model = parse_str(DSL)
+    module = _load(tmp_path, model)
+    ctx = build_context(model)
+    table = RuleTable(ctx, engine=engine)
+    assert list(module.RULES) == table.rule_names
+    assert list(module.SENSORS) == table.sensor_names
+
+    generated = module.RuleEngine()
+    fired_any = set()
+    for readings in _readings(table.sensor_names, random.Random(7), 3000):
+        expected = table.evaluate(readings)
+        assert generated.fired(readings) == expected
+        fired_any.update(name for name, met in zip(table.rule_names, expected) if met)
+    assert fired_any == set(table.rule_names)
+
+
+def test_generated_engine_matches_runtime_on_synthetic_model(tmp_path):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        model = parse_str(generate_model(ModelShape(sensors=8, actuators=4, rules=300, thresholds="repeated")))
+    module = _load(tmp_path, model, "synthetic")
+    table = RuleTable(build_context(model))
+    engine = module.RuleEngine()
+    for readings in _readings(table.sensor_names, random.Random(3), 500):
+        assert engine.fired(readings) == table.evaluate(readings)
+
+
+def test_evaluate_returns_actions_and_reset_clears_state(tmp_path):
+    module = _load(tmp_path, parse_str(DSL))
+    engine = module.RuleEngine()
+    hot = {"Temp": 32.0, "Humidity": 60.0, "Light": 500.0}
+    assert engine.evaluate(hot) == [("Lamp", "turn_off")]
+    engine.evaluate(hot)
+    assert ("Fan", "turn_on") in engine.evaluate(hot)
+    engine.reset()
+    assert ("Fan", "turn_on") not in engine.evaluate(hot)
+
+
+def test_generated_module_runs_standalone(tmp_path):
+    source = model_to_python_string(parse_str(DSL))
+    assert "iotflow" not in source.split('"""')[2] and "textx" not in source
+    path = tmp_path / "engine.py"
+    path.write_text(source, encoding="utf-8")
+    lines = "\n".join(json.dumps({"Temp": 40.0, "Light": 100.0}) for _ in range(3)) + "\n"
+    # Isolated mode: neither the repository nor site customizations are importable.
+    out = subprocess.run(
+        [sys.executable, "-I", str(path)], input=lines, cwd=tmp_path, capture_output=True, text=True, check=True,
+    )
+    actions = [json.loads(line) for line in out.stdout.splitlines()]
+    assert actions[0] == [] and actions[2] == [["Fan", "turn_on"]]
@@ -0,0 +1,147 @@
+import io
+import threading
+import time
+
+import pytest
+
+from iotflow.parser.parse import parse_str
+from iotflow.runtime.context import build_context
+from iotflow.runtime.export import ColumnarExportSink
+from iotflow.runtime import reload
+from iotflow.runtime.reload import HotReloader, diff_models
+from iotflow.runtime.runner import run_simulation
+from iotflow.runtime.simulation import Simulation
+
+
+DSL = r'''
+sensor Temp { type: DHT22 unit: celsius }
+sensor Light { type: BH1750 unit: lux }
+actuator Fan { type: relay }
+actuator Lamp { type: relay }
+rule Hot { when Temp.value > 30 for 3 cycles then Fan.turn_on }
+rule Warm { when avg(Temp, 4) > 25 then Fan.turn_on }
+rule Dark { when Light.value < 100 then Lamp.turn_on }
+'''
+
+# Dark changes threshold, Warm is removed, Bright is added.
+CHANGED = r'''
+sensor Temp { type: DHT22 unit: celsius }
+sensor Light { type: BH1750 unit: lux }
+sensor Humidity { type: DHT22 unit: percent }
+actuator Fan { type: relay }
+actuator Lamp { type: relay }
+rule Hot { when Temp.value > 30 for 3 cycles then Fan.turn_on }
+rule Dark { when Light.value < 50 then Lamp.turn_on }
+rule Bright { when Light.value > 800 then Lamp.turn_off }
+'''
+
+
+def test_diff_models_by_element():
+    diff = diff_models(build_context(parse_str(DSL)), build_context(parse_str(CHANGED)))
+    assert diff.rules_added == ["Bright"]
+    assert diff.rules_removed == ["Warm"]
+    assert diff.rules_changed == ["Dark"]
+    assert diff.sensors_added == ["Humidity"]
+    assert not diff.actuators_added and not diff.actuators_removed
+    assert diff.summary() == "+1 rule, -1 rule, ~1 rule, +1 sensor"
+    assert not diff_models(build_context(parse_str(DSL)), build_context(parse_str(DSL)))
+
+
+def test_reload_keeps_state_of_unchanged_rules():
+    simulation = Simulation(parse_str(DSL), edge_triggered=True)
+    reloader = HotReloader(simulation)
+    readings = {"Temp": 35.0, "Light": 70.0}
+    simulation.step(readings)
+    simulation.step(readings)
+    [hot_term] = simulation.table.compiler.stateful_terms
+
+    reloader.submit(CHANGED)
+    reloader.wait()
+    report = reloader.poll()
+    assert report.applied and report.cycle == 2
+    assert report.pause_seconds >= 0
+    assert simulation.table.rule_names == ["Hot", "Dark", "Bright"]
+    assert simulation.table.compiler.stateful_terms == [hot_term]
+
+    # The streak started before the reload completes on the third cycle.
+    assert simulation.step(readings) == [True, False, False]
+    # Lamp was switched on before the reload and stays on without re-emitting.
+    assert simulation.step({"Temp": 35.0, "Light": 10.0}) == [True, True, False]
+    assert simulation.tracker.actuator_state("Lamp") == "turn_on"
+    simulation.close()
+
+    result = simulation.result()
+    assert result.cycle_count == 4
+    assert len(result.cycles) == 4
+    assert [cycle.cycle_number for cycle in result.cycles] == [1, 2, 3, 4]
+    assert result.index.fire_count("Dark") == 3
+    assert result.index.fire_count("Hot") == 2
+
+
+def test_invalid_source_is_rejected_and_run_continues():
+    simulation = Simulation(parse_str(DSL))
+    reloader = HotReloader(simulation)
+    simulation.step()
+    reloader.submit(DSL.replace("Fan.turn_on }", "Heater.turn_on }"))
+    reloader.wait()
+    report = reloader.poll()
+    assert not report.applied
+    assert "Heater" in report.error
+    assert simulation.table.rule_names == ["Hot", "Warm", "Dark"]
+    simulation.step()
+    assert reloader.poll() is None
+
+
+def test_unexpected_prepare_error_is_rejected_and_reloading_continues(monkeypatch):
+    simulation = Simulation(parse_str(DSL))
+    reloader = HotReloader(simulation)
+
+    def failing_build(model):
+        raise OSError("disk went away")
+
+    monkeypatch.setattr(reload, "build_context", failing_build)
+    reloader.submit(CHANGED)
+    reloader.wait()
+    report = reloader.poll()
+    assert not report.applied and report.error == "OSError: disk went away"
+    assert reloader._worker is None
+
+    monkeypatch.undo()
+    reloader.submit(CHANGED)
+    reloader.wait()
+    assert reloader.poll().applied
+    assert simulation.table.rule_names == ["Hot", "Dark", "Bright"]
+
+
+def test_export_rolls_over_when_columns_change(tmp_path):
+    np = pytest.importorskip("numpy")
+    simulation = Simulation(parse_str(DSL), export=tmp_path / "run.npz")
+    simulation.step()
+    simulation.reload(parse_str(CHANGED))
+    simulation.step()
+    simulation.close()
+    first = np.load(tmp_path / "run.npz")
+    second = np.load(tmp_path / "run.1.npz")
+    assert first["fired"].shape == (1, 3)
+    assert second["cycles"].tolist() == [2]
+    assert isinstance(simulation.sink.sinks[1], ColumnarExportSink)
+
+
+def test_run_watches_model_file(tmp_path):
+    path = tmp_path / "model.iotflow"
+    path.write_text(DSL, encoding="utf-8")
+
+    def edit_later():
+        time.sleep(0.1)
+        path.write_text(CHANGED, encoding="utf-8")
+
+    threading.Thread(target=edit_later, daemon=True).start()
+    result = run_simulation(
+        parse_str(DSL), sensor_overrides={"Light": 70.0}, cycles=150, period=0.01, watch=path,
+    )
+    assert result.cycle_count == 150
+    assert len(result.reloads) == 1
+    assert result.reloads[0].applied
+    out = io.StringIO()
+    result.render(out, summary_only=True, color=False)
+    assert "Reloads: 1 applied" in out.getvalue()
@@ -0,0 +1,75 @@
+import io
+
+from iotflow.parser.parse import parse_str
+from iotflow.runtime.runner import run_simulation
+from iotflow.runtime.sinks import SampledSink
+
+
+DSL = r'''
+sensor TemperatureSensor {
+    type: DHT22
+    unit: celsius
+}
+
+actuator Fan {
+    type: relay
+}
+
+rule HighTemperature {
+    when TemperatureSensor.value > 30
+    then Fan.turn_on
+}
+'''
+
+
+def _run(tmp_path):
+    path = tmp_path / "trace.csv"
+    path.write_text("TemperatureSensor\n20\n35\n25\n40\n")
+    return run_simulation(parse_str(DSL), trace=path)
+
+
+def test_render_matches_str(tmp_path):
+    result = _run(tmp_path)
+    out = io.StringIO()
+    result.render(out, color=True)
+    assert out.getvalue() == str(result)
+
+
+def test_render_without_tty_has_no_ansi(tmp_path):
+    out = io.StringIO()
+    _run(tmp_path).render(out)
+    assert "\033[" not in out.getvalue()
+    assert "IoTFlow Simulation Report" in out.getvalue()
+
+
+def test_summary_only(tmp_path):
+    out = io.StringIO()
+    _run(tmp_path).render(out, summary_only=True)
+    text = out.getvalue()
+    assert "Cycle 1:" not in text
+    assert "Cycles: 4" in text
+
+
+def test_fired_only_and_max_cycles(tmp_path):
+    out = io.StringIO()
+    _run(tmp_path).render(out, fired_only=True, max_cycles=1)
+    text = out.getvalue()
+    assert "Cycle 2:" in text
+    assert "Cycle 1:" not in text
+    assert "Cycle 4:" not in text
+    assert "showing 1 of 4 cycles" in text
+
+
+def test_fired_only_keeps_suppressed_cycles_from_any_sink(tmp_path):
+    path = tmp_path / "trace.csv"
+    path.write_text("TemperatureSensor\n35\n36\n20\n")
+    reports = []
+    for sink in (None, SampledSink(10)):
+        out = io.StringIO()
+        result = run_simulation(parse_str(DSL), trace=path, edge_triggered=True, sink=sink)
+        result.render(out, fired_only=True)
+        reports.append(out.getvalue())
+    # Cycle 2 fired but its command was suppressed; it still counts as fired.
+    assert "Cycle 2:" in reports[1]
+    assert "showing 2 of 3 cycles" in reports[1]
+    assert reports[0] == reports[1]
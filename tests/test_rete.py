@@ -0,0 +1,134 @@
+import random
+
+import pytest
+
+from iotflow.parser.parse import parse_str
+from iotflow.runtime.columnar import RuleTable
+from iotflow.runtime.context import build_context
+from iotflow.runtime.executor import execute_rules
+from iotflow.runtime.network import RuleNetwork, compare_throughput
+from iotflow.runtime.runner import run_simulation
+from iotflow.runtime.sensor_sim import generate_readings
+
+
+# Generated rule bases repeat conditions on purpose, which the validators warn about.
+pytestmark = pytest.mark.filterwarnings("ignore::UserWarning")
+
+OPERATORS = [">", ">=", "<", "<=", "==", "!="]
+
+
+def _rule_base(rule_count, distinct=20, seed=1):
+    rng = random.Random(seed)
+    lines = [
+        "sensor Temp { type: DHT22 unit: celsius }",
+        "sensor Motion { type: PIR unit: boolean }",
+        "actuator Fan { type: relay }",
+        "actuator Light { type: relay }",
+    ]
+    conditions = []
+    for _ in range(distinct):
+        if rng.random() < 0.25:
+            conditions.append(f"Motion.value {rng.choice(['==', '!='])} {rng.choice([0, 1])}")
+        else:
+            conditions.append(f"Temp.value {rng.choice(OPERATORS)} {rng.randint(15, 35)}")
+    for i in range(rule_count):
+        action = rng.choice(["Fan.turn_on", "Fan.turn_off", "Light.turn_on"])
+        lines.append(f"rule R{i} {{ when {rng.choice(conditions)} then {action} }}")
+    return "\n".join(lines)
+
+
+def test_identical_conditions_share_nodes():
+    model = parse_str(_rule_base(200, distinct=10))
+    network = RuleNetwork()
+    for rule in build_context(model).rules:
+        network.add_rule(rule)
+    stats = network.stats()
+    assert stats.rules == 200
+    assert stats.nodes <= 10
+    assert stats.sharing_ratio >= 20
+
+
+def test_network_matches_executor():
+    model = parse_str(_rule_base(300, distinct=40))
+    ctx = build_context(model)
+    network = RuleNetwork()
+    for rule in ctx.rules:
+        network.add_rule(rule)
+    for _ in range(200):
+        readings = generate_readings(ctx.sensors)
+        readings["Temp"] = float(random.randint(10, 40))
+        expected = {i for i, ex in enumerate(execute_rules(ctx.rules, readings)) if ex.condition_met}
+        assert set(network.match(readings)) == expected
+
+
+def test_incremental_add_and_remove():
+    model = parse_str('''
+    sensor Temp { type: DHT22 unit: celsius }
+    actuator Fan { type: relay }
+    rule A { when Temp.value > 30 then Fan.turn_on }
+    rule B { when Temp.value > 30 then Fan.turn_off }
+    rule C { when Temp.value > 20 then Fan.turn_on }
+    ''')
+    a, b, c = build_context(model).rules
+    network = RuleNetwork()
+    assert [network.add_rule(r) for r in (a, b, c)] == [0, 1, 2]
+    assert network.stats().nodes == 2
+    assert sorted(network.match({"Temp": 35.0})) == [0, 1, 2]
+
+    network.remove_rule(0)
+    assert network.stats().nodes == 2
+    assert sorted(network.match({"Temp": 35.0})) == [1, 2]
+
+    network.remove_rule(1)
+    assert network.stats().nodes == 1
+    assert list(network.match({"Temp": 35.0})) == [2]
+
+    assert network.add_rule(a) == 3
+    assert sorted(network.match({"Temp": 35.0})) == [2, 3]
+    assert list(network.match({"Temp": 25.0})) == [2]
+    with pytest.raises(ValueError):
+        network.add_rule(b, slot=2)
+
+
+def test_compound_rule_rejected():
+    model = parse_str('''
+    sensor Temp { type: DHT22 unit: celsius }
+    actuator Fan { type: relay }
+    rule A { when Temp.value > 30 and Temp.value < 40 then Fan.turn_on }
+    ''')
+    with pytest.raises(ValueError):
+        RuleNetwork().add_rule(build_context(model).rules[0])
+
+
+def test_network_engine_matches_compiled_engine():
+    dsl = _rule_base(100) + '''
+    rule Window { when avg(Temp, 3) > 25 then Fan.turn_on }
+    rule Both { when Temp.value > 20 and Motion.value == 1 then Light.turn_on }
+    '''
+    ctx = build_context(parse_str(dsl))
+    compiled = RuleTable(ctx)
+    network = RuleTable(ctx, engine="network")
+    assert len(network.network) == 100
+    for _ in range(100):
+        readings = generate_readings(ctx.sensors)
+        assert network.evaluate(readings) == compiled.evaluate(readings)
+
+
+def test_run_with_network_engine():
+    model = parse_str(_rule_base(50))
+    random.seed(3)
+    expected = run_simulation(model, cycles=50)
+    random.seed(3)
+    result = run_simulation(model, cycles=50, engine="network")
+    assert result.rules_passed == expected.rules_passed
+    assert result.commands_emitted == expected.commands_emitted
+    with pytest.raises(ValueError):
+        run_simulation(model, engine="rete")
+
+
+def test_compare_throughput_reports_sharing():
+    report = compare_throughput(parse_str(_rule_base(500)), cycles=50)
+    assert report["rules"] == 500
+    assert report["sharing_ratio"] == report["rules"] / report["nodes"]
+    assert report["executor_rules_per_second"] > 0
+    assert report["network_rules_per_second"] > 0
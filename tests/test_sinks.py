@@ -0,0 +1,81 @@
+import json
+
+import pytest
+
+from iotflow.parser.parse import parse_str
+from iotflow.runtime.columnar import RuleTable
+from iotflow.runtime.runner import run_simulation
+from iotflow.runtime.sinks import AggregateSink, ResultSink, SampledSink, StreamingFileSink
+
+
+DSL = r'''
+sensor TemperatureSensor {
+    type: DHT22
+    unit: celsius
+}
+
+actuator Fan {
+    type: relay
+}
+
+rule HighTemperature {
+    when TemperatureSensor.value > 30
+    then Fan.turn_on
+}
+'''
+
+
+def test_aggregate_sink_keeps_totals_without_cycles():
+    model = parse_str(DSL)
+    result = run_simulation(
+        model, sensor_overrides={"TemperatureSensor": 35.0}, cycles=50, sink=AggregateSink(),
+    )
+    assert result.cycles == []
+    assert result.cycle_count == 50
+    assert result.total_rules_evaluated == 50
+    assert result.rules_passed == 50
+    assert result.total_actions_triggered == 50
+    assert "Cycles: 50" in str(result)
+
+
+def test_sampled_sink_is_bounded_and_ordered():
+    model = parse_str(DSL)
+    result = run_simulation(model, cycles=500, sink=SampledSink(size=10, seed=1))
+    numbers = [c.cycle_number for c in result.cycles]
+    assert len(numbers) == 10
+    assert numbers == sorted(numbers)
+    assert result.cycle_count == 500
+
+
+def test_sampled_sink_builds_only_kept_cycles(monkeypatch):
+    model = parse_str(DSL)
+    expected = run_simulation(model, cycles=2000, sink=SampledSink(size=10, seed=3))
+    built = []
+    original = RuleTable.cycle
+    monkeypatch.setattr(RuleTable, "cycle", lambda self, *args: built.append(args) or original(self, *args))
+    result = run_simulation(model, cycles=2000, sink=SampledSink(size=10, seed=3))
+    assert [c.cycle_number for c in result.cycles] == [c.cycle_number for c in expected.cycles]
+    assert 10 <= len(built) < 100
+
+
+def test_streaming_sink_writes_one_line_per_cycle(tmp_path):
+    path = tmp_path / "cycles.ndjson"
+    model = parse_str(DSL)
+    result = run_simulation(
+        model, sensor_overrides={"TemperatureSensor": 35.0}, cycles=3, sink=StreamingFileSink(path),
+    )
+    lines = path.read_text().splitlines()
+    assert len(lines) == 3
+    first = json.loads(lines[0])
+    assert first["cycle_number"] == 1
+    assert first["rule_executions"][0]["actuator_name"] == "Fan"
+    assert result.cycles == []
+    assert result.total_actions_triggered == 3
+
+
+def test_sink_without_record_cannot_be_created():
+    class Incomplete(ResultSink):
+        pass
+
+    with pytest.raises(TypeError, match="record"):
+        Incomplete()
@@ -0,0 +1,104 @@
+import json
+
+import pytest
+
+from iotflow.parser.parse import parse_str
+from iotflow.runtime.runner import run_simulation
+from iotflow.runtime.trace import TRACE_MAGIC, open_trace, write_binary_trace
+
+
+DSL = r'''
+sensor Temp {
+    type: DHT22
+    unit: celsius
+}
+
+sensor Humidity {
+    type: DHT22
+    unit: percent
+}
+
+actuator Fan { type: relay }
+actuator Dryer { type: relay }
+
+rule CoolDown {
+    when Temp.value > 30
+    then Fan.turn_on
+}
+
+rule Dry {
+    when Humidity.value > 80
+    then Dryer.turn_on
+}
+'''
+
+
+def test_csv_trace_runs_one_cycle_per_row(tmp_path):
+    path = tmp_path / "trace.csv"
+    path.write_text("timestamp,Temp,Humidity\n2024-01-01T00:00,35,50\n2024-01-01T00:01,25,90\n")
+    result = run_simulation(parse_str(DSL), trace=path)
+
+    assert len(result.cycles) == 2
+    assert result.cycles[0].readings == {"Temp": 35.0, "Humidity": 50.0}
+    assert [r.condition_met for r in result.cycles[0].rule_executions] == [True, False]
+    assert [r.condition_met for r in result.cycles[1].rule_executions] == [False, True]
+
+
+def test_ndjson_trace_with_column_mapping(tmp_path):
+    path = tmp_path / "trace.ndjson"
+    rows = [{"t_c": 31, "rh": 10}, {"t_c": 20, "rh": 85}]
+    path.write_text("\n".join(json.dumps(r) for r in rows) + "\n")
+    result = run_simulation(
+        parse_str(DSL), trace=path, trace_columns={"t_c": "Temp", "rh": "Humidity"},
+    )
+    assert [c.readings["Temp"] for c in result.cycles] == [31.0, 20.0]
+    assert [c.readings["Humidity"] for c in result.cycles] == [10.0, 85.0]
+
+
+def test_binary_trace_roundtrip(tmp_path):
+    path = tmp_path / "trace.iotb"
+    rows = [{"Temp": 40.0, "Humidity": 20.0}, {"Temp": 10.0}]
+    assert write_binary_trace(path, ["Temp", "Humidity"], rows) == 2
+
+    assert list(open_trace(path)) == rows
+
+
+def test_empty_binary_trace_has_no_rows(tmp_path):
+    path = tmp_path / "trace.iotb"
+    path.write_bytes(b"")
+    assert list(open_trace(path)) == []
+
+    path.write_bytes(TRACE_MAGIC + b"\x02\x00")
+    with pytest.raises(ValueError, match="truncated binary trace header"):
+        list(open_trace(path))
+
+
+def test_missing_values_hold_last_reading(tmp_path):
+    path = tmp_path / "trace.csv"
+    path.write_text("Temp,Humidity\n35,90\n,\n20,NA\n")
+    result = run_simulation(parse_str(DSL), trace=path, missing="hold")
+
+    assert [c.readings["Temp"] for c in result.cycles] == [35.0, 35.0, 20.0]
+    assert [c.readings["Humidity"] for c in result.cycles] == [90.0, 90.0, 90.0]
+
+
+def test_missing_values_are_simulated_by_default(tmp_path):
+    path = tmp_path / "trace.csv"
+    path.write_text("Temp\n35\n")
+    result = run_simulation(parse_str(DSL), trace=path)
+    assert 0.0 <= result.cycles[0].readings["Humidity"] <= 100.0
+
+
+def test_cycles_caps_trace_replay(tmp_path):
+    path = tmp_path / "trace.iotb"
+    write_binary_trace(path, ["Temp"], ({"Temp": float(i)} for i in range(100)))
+    result = run_simulation(parse_str(DSL), trace=path, cycles=3)
+    assert [c.readings["Temp"] for c in result.cycles] == [0.0, 1.0, 2.0]
+
+
+def test_invalid_trace_value_raises(tmp_path):
+    path = tmp_path / "trace.csv"
+    path.write_text("Temp\nhot\n")
+    with pytest.raises(ValueError) as exc:
+        run_simulation(parse_str(DSL), trace=path)
+    assert "line 2" in str(exc.value)
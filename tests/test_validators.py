@@ -1,3 +1,5 @@
+import random
+import re
 import warnings
 
 import pytest
@@ -182,3 +184,31 @@ def test_non_conflicting_rules_no_warning():
         parse_str(dsl)
         conflict_warnings = [x for x in w if "conflicting" in str(x.message).lower()]
         assert len(conflict_warnings) == 0
+
+
+def test_conflict_warnings_match_every_pair_in_order():
+    from iotflow.validators.rule_validator import OPPOSITE_ACTIONS, _conditions_can_overlap
+
+    rng = random.Random(7)
+    lines = ["sensor Temp { type: DHT22 unit: celsius }", "sensor Light { type: BH1750 unit: lux }",
+             "actuator Fan { type: relay }", "actuator Lamp { type: relay }"]
+    rules = []
+    for i in range(120):
+        rule = (f"R{i}", rng.choice(["Temp", "Light"]), rng.choice([">", "<", ">=", "<=", "=="]),
+                rng.randint(0, 40), rng.choice(["Fan", "Lamp"]),
+                rng.choice(["turn_on", "turn_off", "start", "stop"]))
+        rules.append(rule)
+        name, sensor, op, value, actuator, action = rule
+        lines.append(f"rule {name} {{ when {sensor}.value {op} {value} then {actuator}.{action} }}")
+
+    expected = [
+        (a[0], b[0]) for i, a in enumerate(rules) for b in rules[i + 1:]
+        if (a[1], a[4]) == (b[1], b[4]) and OPPOSITE_ACTIONS[a[5]] == b[5]
+        and _conditions_can_overlap(a[2], a[3], b[2], b[3])
+    ]
+    with warnings.catch_warnings(record=True) as w:
+        warnings.simplefilter("always")
+        parse_str("\n".join(lines))
+    found = [re.findall(r"'(R\d+)'", str(x.message)) for x in w if "conflicting" in str(x.message)]
+    assert len(expected) > 50
+    assert [tuple(pair) for pair in found] == expected
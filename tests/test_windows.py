@@ -0,0 +1,92 @@
+import random
+
+import pytest
+from textx.exceptions import TextXSemanticError
+
+from iotflow.parser.parse import parse_str
+from iotflow.runtime.columnar import RuleTable
+from iotflow.runtime.context import build_context
+from iotflow.runtime.runner import run_simulation
+from iotflow.runtime.windows import SensorWindow
+
+
+DSL = r'''
+sensor Temp { type: DHT22 unit: celsius }
+actuator Fan { type: relay }
+actuator Alarm { type: buzzer }
+rule Sustained { when avg(Temp, 3) > 30 then Fan.turn_on }
+rule Spike { when max(Temp, 3) > 40 then Alarm.alert }
+rule Rising { when delta(Temp, 3) >= 10 then Alarm.activate }
+rule Persistent { when Temp.value > 30 for 2 cycles then Fan.activate }
+'''
+
+
+def _run(tmp_path, values):
+    path = tmp_path / "trace.csv"
+    path.write_text("Temp\n" + "\n".join(str(v) for v in values) + "\n")
+    return run_simulation(parse_str(DSL), trace=path)
+
+
+def _fired(result, rule):
+    return [
+        next(r.condition_met for r in c.rule_executions if r.rule_name == rule)
+        for c in result.cycles
+    ]
+
+
+def test_window_matches_brute_force():
+    rng = random.Random(7)
+    window = SensorWindow(5)
+    history = []
+    for _ in range(200):
+        value = rng.uniform(-50, 50)
+        window.push(value)
+        history.append(value)
+        recent = history[-5:]
+        assert window.avg() == pytest.approx(sum(recent) / len(recent))
+        assert window.min() == min(recent)
+        assert window.max() == max(recent)
+        assert window.delta() == pytest.approx(recent[-1] - recent[0])
+
+
+def test_parse_windowed_condition():
+    model = parse_str(DSL)
+    condition = model.elements[3].when_clause.condition
+    assert condition.aggregate == "avg"
+    assert condition.window == 3
+    assert condition.sensor_ref.sensor_name == "Temp"
+    persistent = model.elements[6].when_clause.condition
+    assert persistent.aggregate is None
+    assert persistent.duration == 2
+
+
+def test_windowed_rules_fire_on_aggregates(tmp_path):
+    result = _run(tmp_path, [20, 35, 45, 20, 20, 20])
+    assert _fired(result, "Sustained") == [False, False, True, True, False, False]
+    assert _fired(result, "Spike") == [False, False, True, True, True, False]
+    assert _fired(result, "Rising") == [False, True, True, False, False, False]
+
+
+def test_for_n_cycles(tmp_path):
+    result = _run(tmp_path, [35, 20, 35, 35, 35])
+    assert _fired(result, "Persistent") == [False, False, False, True, True]
+
+
+def test_rules_share_one_window_per_sensor_and_size():
+    table = RuleTable(build_context(parse_str(DSL)))
+    assert len(table.windows) == 1
+
+
+@pytest.mark.parametrize("condition,message", [
+    ("avg(Temp, 0) > 30", "Window size"),
+    ("delta(Temp, 1) > 30", "delta()"),
+])
+def test_invalid_windows_raise(condition, message):
+    dsl = f'''
+    sensor Temp {{ type: DHT22 unit: celsius }}
+    actuator Fan {{ type: relay }}
+    rule R {{ when {condition} then Fan.turn_on }}
+    '''
+    with pytest.raises(TextXSemanticError) as exc:
+        parse_str(dsl)
+    assert message in str(exc.value)